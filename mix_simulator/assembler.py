@@ -1,154 +1,512 @@
 from collections import defaultdict
-from dataclasses import dataclass
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
 from re import match, split
 
-from mix_simulator.byte import BYTE_UPPER_LIMIT, Byte, int_to_bytes
-from mix_simulator.character_code import char_to_byte
-from mix_simulator.grammar import BINARY_OP, INSTRUCTION
-from mix_simulator.operator import Operator
+from mix_simulator.byte import BYTE_UPPER_LIMIT, Byte, bytes_to_int, int_to_bytes
+from mix_simulator.character_code import text_to_bytes
+from mix_simulator.grammar import BINARY_OP, INSTRUCTION, SYMBOL
+from mix_simulator.instruction_set import BY_MNEMONIC
 from mix_simulator.simulator import SimulatorState
 from mix_simulator.word import BYTES_IN_WORD, Word
 
 
+Tokens = tuple[str | None, str, str | None, str | None, str | None]
+
+# the parts of an instruction that an expression can be deferred for, and the literal
+# constant in its address
+ADDRESS = "address"
+INDEX = "index"
+FIELD = "field"
+LITERAL = "literal"
+
+
+def tokenize(line: str) -> Tokens:
+    """Split a line into its location, op, address, index and field parts."""
+    m = match(INSTRUCTION, line)
+    if m is None:
+        raise ValueError(f"{line} is not a valid MIXAL instruction.")
+
+    loc, op, addr, idx, field = m.groups()
+    return loc, op, addr, idx, field
+
+
 @dataclass
-class AssemblyInstruction:
-    loc: str | None
-    opcode: int
-    address: str
-    index: int
-    field: int
+class Deferred:
+    """An expression that refers to symbols which have not been defined yet.
+
+    loc:        the location of the word the expression is a part of
+    part:       which part of the word (ADDRESS, INDEX or FIELD) it is, or LITERAL
+                for the value of a literal constant the address refers to
+    expression: the expression itself
+    waiting:    the symbols (and local symbols "dF") that are still undefined
+    known:      the value of each symbol the expression was waiting on, and whether
+                it is a location, as it was defined at the time
+    """
+
+    loc: int
+    part: str
+    expression: str
+    waiting: set[str]
+    known: dict[str, tuple[int, bool]] = field(default_factory=dict)
 
 
 class Assembler:
+    """A single pass MIXAL assembler.
+
+    Words are written to memory as soon as their line is read. Instructions that refer
+    to a symbol (or a local "dF" symbol) that has not been defined yet are written with
+    an address of 0 and added to a fixup chain for that symbol. Once the symbol is
+    defined every word in its chain has its address patched. Any other expression that
+    refers to a symbol which is not defined yet ("BUF+1", or a field or index) is
+    deferred instead, and evaluated once the last symbol it waits on is defined.
+
+    Literal constants ("=W-VALUE=") are interned by value and placed in a pool after
+    the last assembled word when END is reached, as MIXAL specifies. A literal that
+    refers to a symbol which is not defined yet is deferred, and interned once it is.
+
+    With relocatable=True the program is assembled as an object module for the linker.
+    Locations are then relative to the start of the module, every word whose value
+    depends on a location is recorded so it can be relocated, and the ENTRY and EXTERN
+    directives export a symbol from the module or import one from another module. An
+    imported symbol can be used as an address, or offset by a number ("BUF+1").
+    """
+
     mix_file: str
     symbol_table: dict[str, int]
-    here: dict[int, list[int]]
+    here: dict[int, int]
+    fixups: dict[str, list[int]]
+    future_here: dict[int, list[int]]
+    pending: dict[str, list[Deferred]]
     state: SimulatorState
     word: int
-    w_value_index: int
-
-    def __init__(self, mix_file: str, state: SimulatorState) -> None:
+    literals: dict[int, list[int]]
+    relative_literals: dict[int, list[int]]
+    literal_pool: dict[int, int]
+    listing: list[tuple[int | None, str]] | None
+    relocatable: bool
+    relative_symbols: set[str]
+    relative_here: set[int]
+    relocations: list[int]
+    word_relocations: list[int]
+    entries: list[str]
+    externals: set[str]
+    assembled: list[int]
+    entry_point: int | None
+
+    def __init__(
+        self,
+        mix_file: str,
+        state: SimulatorState,
+        listing: bool = False,
+        relocatable: bool = False,
+    ) -> None:
         self.mix_file = mix_file
         self.symbol_table = {}
-        self.here = defaultdict(list)
+        # most recent definition of each local symbol "dH", so "dB" is an O(1) lookup
+        self.here = {}
+        # words waiting on a symbol (or the next local symbol "dH") to be defined
+        self.fixups = defaultdict(list)
+        self.future_here = defaultdict(list)
+        # expressions waiting on a symbol (or a local symbol "dF") to be defined
+        self.pending = defaultdict(list)
         self.state = state
         self.word = 0
-        # store w values in ascending memory location, starting with the last cell
-        self.w_value_index = state.memory.words - 1
-
-    def parse_program(self) -> list[tuple[int, AssemblyInstruction]]:
+        # words waiting on each literal constant, keyed by the literal's value
+        self.literals = defaultdict(list)
+        # the same for literal constants whose value is a location in the module, which
+        # are kept apart from numbers that happen to be equal to them
+        self.relative_literals = defaultdict(list)
+        # location of each literal constant (that is a number) once the pool is placed
+        self.literal_pool = {}
+        # (location, source) pairs, only kept when a listing is requested
+        self.listing = [] if listing else None
+
+        # bookkeeping for object modules, only used when relocatable=True
+        self.relocatable = relocatable
+        # symbols (and local symbols "dH") whose value is a location in the module
+        self.relative_symbols = set()
+        self.relative_here = set()
+        # words whose address (0:2) or whole value is a location in the module
+        self.relocations = []
+        self.word_relocations = []
+        self.entries = []
+        self.externals = set()
+        self.assembled = []
+        self.entry_point = None
+
+    def parse_program(self) -> None:
         """Read the assembly program, translate to machine code, and store in memory."""
-        instructions: list[tuple[int, AssemblyInstruction]] = []
-
-        # read in the assembly instructions
         with open(self.mix_file, "r") as f:
-            for line in f:
-                # ignore comments (start with *) and empty lines
-                if not line.strip() or line.startswith("*"):
-                    continue
+            self.parse_lines(f)
+
+    def parse_lines(self, lines: Iterable[str]) -> None:
+        """Like parse_program, but with the lines of the program given."""
+        for line in lines:
+            # ignore comments (start with *) and empty lines
+            if not line.strip() or line.startswith("*"):
+                continue
+
+            self.process_line(line.rstrip())
 
-                parsed = self.process_line(line.rstrip())
-                if parsed:
-                    instructions.append(parsed)
+        self.finish()
 
-        return instructions
+    def finish(self) -> None:
+        """Place literals that are still waiting on END and check all symbols resolved."""
+        # a program without an END line still needs its literals
+        if self.literals or self.relative_literals:
+            self._place_literals()
 
-    def process_line(self, line: str) -> tuple[int, AssemblyInstruction] | None:
-        m = match(INSTRUCTION, line)
-        if m is None:
-            raise ValueError(f"{line} is not a valid MIXAL instruction.")
+        self._check_deferred()
+        self._check_fixups()
 
-        loc, op, addr, idx, field = m.groups()
+    def process_line(self, line: str) -> None:
+        self.process_tokens(line, tokenize(line))
+
+    def process_tokens(self, line: str, tokens: Tokens) -> None:
+        loc, op, addr, idx, field = tokens
+        has_addr = addr is not None
         if addr is None:
             addr = "0"
 
-        # update the symbol table
-        if loc is not None:
-            # special "here" tag
-            if match(r"^[0-9]H$", loc):
-                i = int(loc[0])
-                self.here[i].append(self.word)
-            else:
-                self.symbol_table[loc] = self.word
+        # the value the location field is defined as, EQU is the only directive that
+        # defines it as something other than the current location
+        value = self.word
+        relative = self.relocatable
+
+        # take the chain of words waiting on a local symbol before the line is assembled,
+        # a "dF" on a line labelled "dH" refers to the _next_ definition of "dH", while
+        # any other symbol used on the line it labels refers to that line
+        local = loc is not None and match(r"^[0-9]H$", loc) is not None
+        chain = self._take_fixups(loc) if loc is not None and local else []
+        waiting = self._take_pending(loc) if loc is not None and local else []
+
+        if self.listing is not None:
+            assembles = op not in ("EQU", "ORIG", "END", "ENTRY", "EXTERN")
+            self.listing.append((self.word if assembles else None, line))
 
         # check for assembler directives
         match op:
             case "EQU":
                 # have the location field resolve to the address value in the symbol table
-                self.symbol_table[loc] = self._parse_address(addr, self.word)
-                self.word += 1
-                return None
+                value = self._parse_address(addr, self.word)
+                relative = self._is_relative(addr)
             case "ORIG":
                 # update where we are writing instructions in memory
                 self.word = self._parse_address(addr, self.word)
-                return None
             case "CON":
                 # store the addr as a word in the memory location of the directive
                 w_value = self._parse_address(addr, self.word)
+                if self._is_relative(addr):
+                    self.word_relocations.append(self.word)
+
                 sign, bs = int_to_bytes(w_value, padding=BYTES_IN_WORD)
-                self.state.memory[self.word] = Word(sign, *reversed(bs))
-                self.word += 1
-                return None
+                self._emit(Word(sign, *reversed(bs)))
             case "ALF":
                 # we use _ in place of space to make the language easier to parse
                 chars = addr.replace("_", " ")
-                bs = [char_to_byte(c) for c in chars]
                 # store the chars as a word in the memory location of the directive
-                self.state.memory[self.word] = Word(False, *bs)
-                self.word += 1
-                return None
+                self._emit(Word(False, *text_to_bytes(chars)))
             case "END":
                 # tells the program counter where the first instruction is
                 self.state.program_counter = self._parse_address(addr, self.word)
-                return None
+                if has_addr:
+                    self.entry_point = self.state.program_counter
+                self._place_literals()
+            case "ENTRY":
+                # export a symbol so other modules can refer to it
+                self.entries.append(addr)
+            case "EXTERN":
+                # a symbol defined by another module, resolved by the linker
+                self.externals.add(addr)
             case _:
-                operator = Operator(op)
-                code, dfield = operator.to_code_and_field()
+                spec = BY_MNEMONIC[op]
+                code, dfield = spec.code, spec.field
 
                 # set defaults
-                idx = 0 if idx is None else int(idx)
+                index = 0 if idx is None else self._resolve_part(idx, INDEX)
                 if field is None:
-                    field = dfield
+                    f = dfield
                 else:
                     # remove parens before parsing field value
-                    field = self._parse_address(field.strip("()"), self.word)
-
-                # return instruction and location in memory
-                result = (self.word, AssemblyInstruction(loc, code, addr, idx, field))
-                self.word += 1
-                return result
+                    f = self._resolve_part(field.strip("()"), FIELD)
+
+                address = self._resolve_instruction_address(addr)
+                ahi, alo = divmod(abs(address), BYTE_UPPER_LIMIT)
+                self._emit(
+                    Word(
+                        address < 0,
+                        Byte(ahi),
+                        Byte(alo),
+                        Byte(index),
+                        Byte(f),
+                        Byte(code),
+                    )
+                )
 
-    def write_program_to_memory(
-        self, instructions: list[tuple[int, AssemblyInstruction]]
+        # update the symbol table (after the line is assembled so that a "dB" on a line
+        # labelled "dH" refers to the _previous_ definition of "dH")
+        if loc is not None:
+            self._define(loc, value, relative)
+            if not local:
+                chain = self._take_fixups(loc)
+                waiting = self._take_pending(loc)
+            for i in chain:
+                self.patch_address(i, value)
+                if relative:
+                    self.relocations.append(i)
+
+            for deferred in waiting:
+                name = f"{loc[0]}F" if match(r"^[0-9]H$", loc) else loc
+                deferred.known[name] = (value, relative)
+                deferred.waiting.discard(name)
+                if not deferred.waiting:
+                    self._resolve_deferred(deferred)
+
+    def _take_fixups(self, symbol: str) -> list[int]:
+        # special "here" tag
+        if match(r"^[0-9]H$", symbol):
+            return self.future_here.pop(int(symbol[0]), [])
+
+        return self.fixups.pop(symbol, [])
+
+    def _take_pending(self, symbol: str) -> list[Deferred]:
+        # special "here" tag, expressions wait on it as "dF"
+        if match(r"^[0-9]H$", symbol):
+            return self.pending.pop(f"{symbol[0]}F", [])
+
+        return self.pending.pop(symbol, [])
+
+    def _define(self, symbol: str, value: int, relative: bool) -> None:
+        # special "here" tag
+        if match(r"^[0-9]H$", symbol):
+            self.here[int(symbol[0])] = value
+            if relative:
+                self.relative_here.add(int(symbol[0]))
+            else:
+                self.relative_here.discard(int(symbol[0]))
+        else:
+            self.symbol_table[symbol] = value
+            if relative:
+                self.relative_symbols.add(symbol)
+            else:
+                self.relative_symbols.discard(symbol)
+
+    def _emit(self, word: Word) -> None:
+        self.state.memory[self.word] = word
+        if self.relocatable:
+            self.assembled.append(self.word)
+        self.word += 1
+
+    def _resolve_instruction_address(self, address: str) -> int:
+        # future reference to a local symbol
+        if match(r"^[0-9]F$", address):
+            self.future_here[int(address[0])].append(self.word)
+            return 0
+
+        # future reference to a symbol, patched when the symbol is defined
+        if (
+            match(rf"^{SYMBOL}$", address)
+            and not match(r"^[0-9][BH]$", address)
+            and address not in self.symbol_table
+        ):
+            self.fixups[address].append(self.word)
+            return 0
+
+        # literal constant, patched when the literal pool is placed
+        if address.startswith("=") and address.endswith("="):
+            literal = address.strip("=")
+            if not self._defer(literal, LITERAL):
+                self._intern_literal(literal, self.word)
+            return 0
+
+        # expression with a future reference, patched when it can be evaluated
+        if self._defer(address, ADDRESS):
+            return 0
+
+        if self._is_relative(address):
+            self.relocations.append(self.word)
+        return self._parse_address(address, self.word)
+
+    def _intern_literal(
+        self,
+        expression: str,
+        loc: int,
+        known: Mapping[str, tuple[int, bool]] | None = None,
     ) -> None:
-        # sort the "here" locations so that we can do a linear search
-        for locs in self.here.values():
-            locs.sort()
-
-        for i, instruction in instructions:
-            # lookup a local symbol used as an address
-            if match(r"^[0-9]F$", instruction.address) or match(
-                r"^[0-9]B$", instruction.address
+        """Add the word at loc to the chain of the literal constant expression."""
+        value = self._parse_address(expression, loc, known)
+        if self._is_relative(expression, known):
+            self.relative_literals[value].append(loc)
+        else:
+            self.literals[value].append(loc)
+
+    def _resolve_part(self, expression: str, part: str) -> int:
+        # the index or field of an instruction
+        if self._defer(expression, part):
+            return 0
+
+        return self._parse_address(expression, self.word)
+
+    def _defer(self, expression: str, part: str) -> bool:
+        """Defer an expression for the current word if it has future references."""
+        atoms = self._atoms(expression)
+        waiting = {
+            atom
+            for atom in atoms
+            if str.isalnum(atom)
+            and not str.isdigit(atom)
+            and not match(r"^[0-9][BH]$", atom)
+            and atom not in self.symbol_table
+        }
+        if not waiting:
+            return False
+
+        deferred = Deferred(self.word, part, expression, waiting)
+        # "dB" refers to the definition before this word, not the one in effect once
+        # the expression is evaluated
+        for atom in atoms:
+            if match(r"^[0-9]B$", atom):
+                value = self._parse_address(atom, self.word)
+                deferred.known[atom] = (value, self._is_relative(atom))
+
+        for symbol in waiting:
+            self.pending[symbol].append(deferred)
+        return True
+
+    def _resolve_deferred(self, deferred: Deferred) -> None:
+        if deferred.part == LITERAL:
+            self._intern_literal(deferred.expression, deferred.loc, deferred.known)
+            return
+
+        value = self._parse_address(deferred.expression, deferred.loc, deferred.known)
+        if deferred.part == ADDRESS:
+            self.patch_address(deferred.loc, value)
+            if self._is_relative(deferred.expression, deferred.known):
+                self.relocations.append(deferred.loc)
+        elif deferred.part == INDEX:
+            self.state.memory[deferred.loc].b3 = Byte(value)
+        else:
+            self.state.memory[deferred.loc].b4 = Byte(value)
+
+    def _check_deferred(self) -> None:
+        # an expression still waiting is in the chain of every symbol it waits on
+        remaining = {
+            id(deferred): deferred
+            for chain in self.pending.values()
+            for deferred in chain
+        }
+        for deferred in remaining.values():
+            undefined = deferred.waiting - self.externals
+            if undefined:
+                raise ValueError(
+                    f"{min(undefined)} used for word at index {deferred.loc}, but was never defined."
+                )
+
+            # the address can still be an external symbol plus or minus a number, the
+            # linker then adds the symbol to it
+            expression = deferred.expression
+            symbol = min(deferred.waiting)
+            parts = self._split(expression)
+            if (
+                deferred.part != ADDRESS
+                or len(deferred.waiting) > 1
+                or expression.startswith("-")
+                or parts is None
+                or not (
+                    (parts[0] == symbol and parts[1] in "+-")
+                    or (parts[2] == symbol and parts[1] == "+")
+                )
             ):
-                address = self._resolve_here_ref(instruction.address, i)
-            # resolve all other addresses
-            else:
-                address = self._parse_address(instruction.address, i)
-
-            ahi, alo = divmod(abs(address), BYTE_UPPER_LIMIT)
-            sign = address < 0
-
-            word = Word(
-                sign,
-                Byte(ahi),
-                Byte(alo),
-                Byte(instruction.index),
-                Byte(instruction.field),
-                Byte(instruction.opcode),
+                raise ValueError(
+                    f"EXTERN {symbol} can only be offset by a number, not used in {expression}."
+                )
+
+            deferred.known[symbol] = (0, False)
+            if self._is_relative(expression, deferred.known):
+                raise ValueError(f"{expression} cannot be relocated.")
+
+            offset = self._parse_address(expression, deferred.loc, deferred.known)
+            self.patch_address(deferred.loc, offset)
+            self.fixups[symbol].append(deferred.loc)
+
+        self.pending.clear()
+
+    def _place_literals(self) -> None:
+        # each distinct literal gets one word, following the last assembled word
+        for value, chain in self.literals.items():
+            self.literal_pool[value] = self.word
+            self._place_literal(value, chain)
+
+        # a literal that is a location is relocated like a CON of that location
+        for value, chain in self.relative_literals.items():
+            self.word_relocations.append(self.word)
+            self._place_literal(value, chain)
+
+        self.literals.clear()
+        self.relative_literals.clear()
+
+    def _place_literal(self, value: int, chain: list[int]) -> None:
+        if self.listing is not None:
+            self.listing.append((self.word, f"={value}="))
+
+        for i in chain:
+            self.patch_address(i, self.word)
+            if self.relocatable:
+                self.relocations.append(i)
+
+        sign, bs = int_to_bytes(value, padding=BYTES_IN_WORD)
+        self._emit(Word(sign, *reversed(bs)))
+
+    def format_listing(self) -> list[str]:
+        """Render the assembled program, one line per source line and literal."""
+        if self.listing is None:
+            raise ValueError("The assembler was not created with listing=True.")
+
+        lines = []
+        for loc, source in self.listing:
+            if loc is None:
+                lines.append(f"{'':24}{source}")
+                continue
+
+            word = self.state.memory[loc]
+            sign = "-" if word.sign else "+"
+            address = bytes_to_int((word.b1, word.b2))
+            lines.append(
+                f"{loc:04d}: {sign} {address:04d} {word.b3.val:02d} "
+                f"{word.b4.val:02d} {word.b5.val:02d}  {source}"
+            )
+
+        return lines
+
+    def patch_address(self, loc: int, address: int) -> None:
+        ahi, alo = divmod(abs(address), BYTE_UPPER_LIMIT)
+        word = self.state.memory[loc]
+        word.sign = address < 0
+        word.b1 = Byte(ahi)
+        word.b2 = Byte(alo)
+
+    def _check_fixups(self) -> None:
+        # any chain that is still open refers to a symbol that was never defined, unless
+        # the symbol is an external one that the linker will resolve
+        unresolved = {s: c for s, c in self.fixups.items() if s not in self.externals}
+        if unresolved:
+            symbol, locs = next(iter(unresolved.items()))
+            raise ValueError(
+                f"{symbol} used for word at index {locs[0]}, but was never defined."
+            )
+        if self.future_here:
+            i, locs = next(iter(self.future_here.items()))
+            raise ValueError(
+                f"{i}F used for word at index {locs[0]}, but there are no relevant local symbols after this address."
             )
-            self.state.memory[i] = word
 
-    def _parse_address(self, address: str, i: int) -> int:
+    def _parse_address(
+        self,
+        address: str,
+        i: int,
+        known: Mapping[str, tuple[int, bool]] | None = None,
+    ) -> int:
         # handle sign
         negative = False
         if address[0] == "-":
@@ -158,14 +516,27 @@ class Assembler:
             address = address[1:]
 
         result: int
+        # value of a symbol at the time a deferred expression was waiting on it
+        if known is not None and address in known:
+            result = known[address][0]
+
         # reference to current instruction line
-        if address == "*":
+        elif address == "*":
             result = i
 
         # number literal
         elif str.isdigit(address):
             result = int(address)
 
+        # most recent definition of a local symbol
+        elif match(r"^[0-9]B$", address):
+            d = int(address[0])
+            if d not in self.here:
+                raise ValueError(
+                    f"{address} used for word at index {i}, but there are no relevant local symbols before this address."
+                )
+            result = self.here[d]
+
         # symbol reference
         elif str.isalnum(address):
             if address in self.symbol_table:
@@ -175,33 +546,13 @@ class Assembler:
                     f"{address} is was not found in the symbol table during parsing."
                 )
 
-        # w-value
-        elif address.startswith("=") and address.endswith("="):
-            address = address.strip("=")
-            value = self._parse_address(address, i)
-
-            # convert the expression to a word and store the word
-            sign, bs = int_to_bytes(value, padding=BYTES_IN_WORD)
-            word = Word(sign, *reversed(bs))
-            self.state.memory[self.w_value_index] = word
-
-            # returning the address where the word was stored
-            result = self.w_value_index
-            negative = False
-            self.w_value_index -= 1
-
         # binary operator expression
         else:
-            # disambiguate leftmost * as an address not an op
-            if address[0] == "*":
-                left = "*"
-                _, op, right = split(rf"({BINARY_OP})", address[1:], maxsplit=1)
-            else:
-                left, op, right = split(rf"({BINARY_OP})", address, maxsplit=1)
+            left, op, right = self._split_binary(address)
 
             # parse recursively to support nested expressions
-            lval = self._parse_address(left, i)
-            rval = self._parse_address(right, i)
+            lval = self._parse_address(left, i, known)
+            rval = self._parse_address(right, i, known)
 
             match op:
                 # ":" needs to be interpreted in a nonstandard way
@@ -213,25 +564,86 @@ class Assembler:
         # apply sign
         return -result if negative else result
 
-    def _resolve_here_ref(self, address: str, cur: int) -> int:
-        # This uses a O(n) linear search. O(log n) search is possible, but the lists
-        # are not long enough for it to matter much and linear is more succinct.
-        i = int(address[0])
-        back = address[1] == "B"
+    def _is_relative(
+        self, address: str, known: Mapping[str, tuple[int, bool]] | None = None
+    ) -> bool:
+        """Whether the value of an expression moves when its module is relocated.
 
-        if back:
-            for addr in reversed(self.here[i]):
-                if addr < cur:
-                    return addr
-            else:
-                raise ValueError(
-                    f"{address} used for word at index {cur}, but there are no relevant local symbols before this address."
-                )
+        This mirrors _parse_address, and is only meaningful for relocatable programs.
+        """
+        if not self.relocatable:
+            return False
+
+        negative = address[0] == "-"
+        if address[0] in "+-":
+            address = address[1:]
+
+        relative: bool
+        if known is not None and address in known:
+            relative = known[address][1]
+        elif address == "*":
+            relative = True
+        elif str.isdigit(address):
+            relative = False
+        elif match(r"^[0-9][BF]$", address):
+            relative = int(address[0]) in self.relative_here
+        elif str.isalnum(address):
+            relative = address in self.relative_symbols
+        elif address.startswith("=") and address.endswith("="):
+            relative = True
         else:
-            for addr in self.here[i]:
-                if addr > cur:
-                    return addr
-            else:
-                raise ValueError(
-                    f"{address} used for word at index {cur}, but there are no relevant local symbols after this address."
-                )
+            left, op, right = self._split_binary(address)
+
+            lrel = self._is_relative(left, known)
+            rrel = self._is_relative(right, known)
+
+            match op:
+                # location + number or number + location is a location
+                case "+" if not (lrel and rrel):
+                    relative = lrel or rrel
+                # location - number is a location, location - location is a number
+                case "-" if lrel or not rrel:
+                    relative = lrel and not rrel
+                case _ if not (lrel or rrel):
+                    relative = False
+                case _:
+                    raise ValueError(f"{address} cannot be relocated.")
+
+        if negative and relative:
+            raise ValueError(f"-{address} cannot be relocated.")
+
+        return relative
+
+    def _split(self, address: str) -> tuple[str, str, str] | None:
+        """Split an expression into its left operand, operator and right operand, or
+        return None if it is atomic."""
+        if address[0] in "+-":
+            address = address[1:]
+
+        if (
+            address == "*"
+            or str.isalnum(address)
+            or (address.startswith("=") and address.endswith("="))
+        ):
+            return None
+
+        return self._split_binary(address)
+
+    def _split_binary(self, address: str) -> tuple[str, str, str]:
+        # disambiguate leftmost * as an address not an op
+        if address[0] == "*":
+            left = "*"
+            _, op, right = split(rf"({BINARY_OP})", address[1:], maxsplit=1)
+        else:
+            left, op, right = split(rf"({BINARY_OP})", address, maxsplit=1)
+
+        return left, op, right
+
+    def _atoms(self, address: str) -> list[str]:
+        """The atomic expressions (without their sign) an expression is made of."""
+        parts = self._split(address)
+        if parts is None:
+            return [address.lstrip("+-")]
+
+        left, _, right = parts
+        return self._atoms(left) + self._atoms(right)
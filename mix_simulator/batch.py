@@ -0,0 +1,235 @@
+from __future__ import annotations
+import json
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from functools import cache
+from glob import glob
+from io import StringIO
+from typing import TYPE_CHECKING
+
+from mix_simulator.assembler import Assembler
+from mix_simulator.card import CardPunch, CardReader
+from mix_simulator.device import Device
+from mix_simulator.devices import (
+    CARD_PUNCH,
+    CARD_READER,
+    DISKS,
+    PAPER_TAPE,
+    PRINTER,
+    TAPES,
+    TYPEWRITER,
+    Devices,
+)
+from mix_simulator.disk import Disk
+from mix_simulator.image import Image
+from mix_simulator.printer import LinePrinter
+from mix_simulator.simulator import (
+    DEFAULT_SLICE,
+    IMAGE_SUFFIX,
+    Simulator,
+    SimulatorState,
+)
+from mix_simulator.sink import DEFAULT_ALGORITHM, DigestSink
+from mix_simulator.tape import Tape
+from mix_simulator.typewriter import PaperTape, Typewriter
+
+if TYPE_CHECKING:
+    from mix_simulator.sweep import RunResult
+
+
+class QuotaExceeded(Exception):
+    """A job took more instructions or time than its quota allows."""
+
+
+@dataclass
+class Quota:
+    """How many instructions a job may execute and how much time in u it may take,
+    None for no limit. The time is checked at the end of each turn (or slice) of the
+    job."""
+
+    instructions: int | None = None
+    time: int | None = None
+
+    def run(self, simulator: Simulator, slice_size: int = DEFAULT_SLICE) -> None:
+        """Run until a HLT instruction, like Simulator.resume, but raise QuotaExceeded
+        once the quota is used up (the time is checked every slice_size instructions).
+        """
+        state = simulator.state
+        try:
+            while not simulator.run_slice(self.limit(state, slice_size)):
+                self.check(state)
+        finally:
+            # output is written out even if the program fails
+            state.devices.flush()
+
+    def limit(self, state: SimulatorState, limit: int) -> int:
+        """How many of the next limit instructions the quota lets a job execute."""
+        if self.instructions is None:
+            return limit
+        return max(0, min(limit, self.instructions - state.instructions))
+
+    def check(self, state: SimulatorState) -> None:
+        """Raise QuotaExceeded if the job has used up its quota."""
+        if self.instructions is not None and state.instructions >= self.instructions:
+            raise QuotaExceeded(f"More than {self.instructions} instructions")
+        if self.time is not None and state.clock > self.time:
+            raise QuotaExceeded(f"More than {self.time}u")
+
+
+@dataclass
+class Job:
+    """A program (MIXAL or a linked image) to run, with the file the card reader reads
+    from, if it reads any cards."""
+
+    program: str
+    cards: str | None = None
+
+
+@dataclass
+class Result:
+    """What running a job came to: "ok" if it reached HLT, otherwise "error" with the
+    error. digests are those of Devices.digests, by unit."""
+
+    program: str
+    cards: str | None
+    status: str
+    instructions: int
+    time: int
+    digests: dict[int, str] = field(default_factory=dict)
+    error: str | None = None
+
+    @staticmethod
+    def of(job: Job, run: RunResult) -> Result:
+        """The result of running job, as the run came out."""
+        return Result(
+            job.program,
+            job.cards,
+            run.status,
+            run.instructions,
+            run.time,
+            run.digests,
+            run.error,
+        )
+
+    @staticmethod
+    def from_json(line: str) -> Result:
+        data = json.loads(line)
+        # json object keys are always strings
+        data["digests"] = {
+            int(unit): digest for unit, digest in data["digests"].items()
+        }
+        return Result(**data)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+def find_jobs(patterns: Iterable[str]) -> list[Job]:
+    """A job for every program matching the glob patterns, without cards."""
+    jobs: list[Job] = []
+    for pattern in patterns:
+        filenames = sorted(glob(pattern))
+        if not filenames:
+            raise ValueError(f"No programs match {pattern}")
+        jobs.extend(Job(filename) for filename in filenames)
+
+    return jobs
+
+
+def read_manifest(filename: str) -> list[Job]:
+    """The jobs in a JSON lines manifest, one {"program": ..., "cards": ...} object per
+    line ("cards" is optional). Paths are relative to the manifest."""
+    directory = os.path.dirname(filename)
+    jobs: list[Job] = []
+    with open(filename, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+
+            data = json.loads(line)
+            cards = data.get("cards")
+            jobs.append(
+                Job(
+                    os.path.join(directory, data["program"]),
+                    None if cards is None else os.path.join(directory, cards),
+                )
+            )
+
+    return jobs
+
+
+def digest_devices(algorithm: str = DEFAULT_ALGORITHM) -> Devices:
+    """The standard units, with the output of every one digested rather than kept and
+    nothing to read from stdin."""
+    units: dict[int, Device] = {}
+    for unit in TAPES:
+        units[unit] = Tape()
+    for unit in DISKS:
+        units[unit] = Disk()
+    units[CARD_READER] = CardReader([])
+    units[CARD_PUNCH] = CardPunch(sink=DigestSink(algorithm))
+    units[PRINTER] = LinePrinter(DigestSink(algorithm))
+    units[TYPEWRITER] = Typewriter(StringIO(), DigestSink(algorithm))
+    units[PAPER_TAPE] = PaperTape(StringIO(), DigestSink(algorithm))
+
+    return Devices(units)
+
+
+@cache
+def program_image(program: str) -> Image:
+    """The image of a program, which each process only assembles (or reads) once."""
+    if program.endswith(IMAGE_SUFFIX):
+        return Image.read(program)
+
+    state = SimulatorState.initial_state()
+    Assembler(program, state).parse_program()
+    return Image.from_state(state)
+
+
+def run_job(
+    job: Job, algorithm: str = DEFAULT_ALGORITHM, quota: Quota | None = None
+) -> Result:
+    """Run a job on digest_devices, with the cards of the job if it has any. A job that
+    goes over quota fails with QuotaExceeded."""
+    quota = Quota() if quota is None else quota
+    devices = digest_devices(algorithm)
+    simulator = Simulator(devices=devices)
+    state = simulator.state
+
+    try:
+        if job.cards is not None:
+            devices[CARD_READER] = CardReader(open(job.cards))
+        program_image(job.program).load(state)
+        quota.run(simulator)
+        digests = devices.digests(algorithm)
+    except Exception as e:
+        return Result(
+            job.program,
+            job.cards,
+            "error",
+            state.instructions,
+            state.clock,
+            error=f"{type(e).__name__}: {e}",
+        )
+    finally:
+        devices.close()
+
+    return Result(
+        job.program, job.cards, "ok", state.instructions, state.clock, digests
+    )
+
+
+def run_batch(
+    jobs: Iterable[Job],
+    workers: int | None = None,
+    algorithm: str = DEFAULT_ALGORITHM,
+    quota: Quota | None = None,
+) -> Iterator[Result]:
+    """Run jobs on a pool of workers (one per core by default), yielding their results
+    as they complete."""
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(run_job, job, algorithm, quota) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
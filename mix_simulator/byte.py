@@ -29,8 +29,12 @@ class Byte:
 
 
 @cache
-def int_to_bytes(val: int, padding: int = 0) -> Tuple[bool, List[Byte]]:
-    """Returns the passed integer in _little endian_ (0 index is lowest byte) representation."""
+def int_to_bytes(val: int, padding: int = 0) -> Tuple[bool, Tuple[Byte, ...]]:
+    """Returns the passed integer in _little endian_ (0 index is lowest byte) representation.
+
+    The results are cached and shared, so they are immutable: a tuple of bytes, which
+    (like all bytes) are never changed in place.
+    """
     absval = abs(val)
     result: List[Byte] = []
 
@@ -44,7 +48,7 @@ def int_to_bytes(val: int, padding: int = 0) -> Tuple[bool, List[Byte]]:
         result.append(Byte(0))
         padding -= 1
 
-    return val < 0, result
+    return val < 0, tuple(result)
 
 
 def bytes_to_int(bs: Reversible[Byte], sign: bool = False) -> int:
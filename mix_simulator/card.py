@@ -0,0 +1,132 @@
+from __future__ import annotations
+import sys
+from collections.abc import Iterable
+from io import IOBase
+from queue import Empty, Queue
+from threading import Event, Thread
+from typing import TYPE_CHECKING
+
+from mix_simulator.character_code import text_to_words
+from mix_simulator.device import CharacterDevice, Device
+from mix_simulator.word import Word
+
+if TYPE_CHECKING:
+    from mix_simulator.simulator import SimulatorState
+
+DEFAULT_READ_AHEAD = 64
+
+# what the read ahead thread hands over: a card, the error it ran into, or None once
+# there are no more cards
+Card = list[Word] | Exception | None
+
+
+class CardReader(Device):
+    """The card reader (unit 16), which reads a card of 16 words (80 characters).
+
+    Cards are lines of text from source, which may be a file or any iterable of
+    strings (sys.stdin when None); shorter lines are padded with blanks. The first IN
+    starts a thread that reads and decodes up to read_ahead cards ahead of the program,
+    so the source is read lazily, in constant memory, and mostly while the program
+    runs. A source that is a file is closed along with the reader.
+    """
+
+    BLOCK_SIZE = 16
+
+    source: Iterable[str] | None
+    read_ahead: int
+    cards: Queue[Card] | None
+    # a card that wait took from cards ahead of the next IN
+    ahead: list[Card]
+    exhausted: bool
+
+    def __init__(
+        self, source: Iterable[str] | None = None, read_ahead: int = DEFAULT_READ_AHEAD
+    ) -> None:
+        self.source = source
+        self.read_ahead = read_ahead
+        self.cards = None
+        self.ahead = []
+        self.exhausted = False
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def read(self, state: SimulatorState, address: int) -> None:
+        cards = self._start()
+        if self.exhausted:
+            card = None
+        else:
+            card = self.ahead.pop() if self.ahead else cards.get()
+        if card is None:
+            self.exhausted = True
+            raise ValueError("CardReader has no more cards")
+        if isinstance(card, Exception):
+            self.exhausted = True
+            raise card
+
+        state.memory.write_block(address, card)
+
+    def ready(self, output: bool) -> bool:
+        return output or self.exhausted or bool(self.ahead) or not self._start().empty()
+
+    def wait(self, output: bool) -> None:
+        if not self.ready(output):
+            self.ahead.append(self._start().get())
+
+    def close(self) -> None:
+        self._stop.set()
+        # make room for a card the thread may be waiting to hand over, so it can stop
+        if self.cards is not None:
+            try:
+                while True:
+                    self.cards.get_nowait()
+            except Empty:
+                pass
+
+        if isinstance(self.source, IOBase):
+            # the thread stops at the next line, it must not read from a closed file
+            if self._thread is not None:
+                self._thread.join()
+            self.source.close()
+
+    def reset(self) -> None:
+        """Stop reading and start over from the first card at the next IN, which
+        needs a source that can be iterated again (not a file, which is closed)."""
+        self.close()
+        super().reset()
+        self.cards = None
+        self.ahead = []
+        self.exhausted = False
+        self._stop = Event()
+        self._thread = None
+
+    def _start(self) -> Queue[Card]:
+        """The queue of cards, starting the read ahead thread the first time."""
+        if self.cards is None:
+            self.cards = Queue(self.read_ahead)
+            source = sys.stdin if self.source is None else self.source
+            self._thread = Thread(
+                target=self._read_ahead, args=(source, self.cards), daemon=True
+            )
+            self._thread.start()
+
+        return self.cards
+
+    def _read_ahead(self, source: Iterable[str], cards: Queue[Card]) -> None:
+        try:
+            for line in source:
+                if self._stop.is_set():
+                    return
+                cards.put(text_to_words(line.rstrip("\n"), self.BLOCK_SIZE))
+            cards.put(None)
+        except Exception as e:
+            cards.put(e)
+
+
+class CardPunch(CharacterDevice):
+    """The card punch (unit 17), which punches a card of 16 words (80 characters).
+
+    Cards are batched by the sink, which writes them out in large chunks.
+    """
+
+    BLOCK_SIZE = 16
+    OUTPUT = True
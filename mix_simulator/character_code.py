@@ -1,9 +1,20 @@
-from mix_simulator.byte import Byte
+from collections.abc import Iterable
 
+from mix_simulator.byte import BYTE_UPPER_LIMIT, Byte
+from mix_simulator.word import BYTES_IN_WORD, Word
 
-alphabet = " ABCDEFGHI" "ΔJKLMNOPQR" "ΣΠSTUVWXYZ" "0123456789" ".,()+-*/=$" "<>@;:'"
+
+alphabet = " ABCDEFGHIΔJKLMNOPQRΣΠSTUVWXYZ0123456789.,()+-*/=$<>@;:'"
 lookup = {c: i for (i, c) in enumerate(alphabet)}
 
+# every character code as a Byte, to share between words (bytes are never changed)
+BYTES = tuple(Byte(i) for i in range(BYTE_UPPER_LIMIT))
+# str.translate tables from a character to the character with its code as ordinal, and
+# back again
+TO_CODES = str.maketrans({c: chr(i) for (i, c) in enumerate(alphabet)})
+FROM_CODES = str.maketrans({chr(i): c for (i, c) in enumerate(alphabet)})
+CHARACTERS = frozenset(alphabet)
+
 
 def byte_to_char(b: Byte) -> str:
     return alphabet[b.val]
@@ -11,3 +22,64 @@ def byte_to_char(b: Byte) -> str:
 
 def char_to_byte(c: str) -> Byte:
     return Byte(lookup[c])
+
+
+def text_to_codes(text: str) -> bytes:
+    """The character code of every character of text, translated in one go."""
+    if not CHARACTERS.issuperset(text):
+        c = next(c for c in text if c not in CHARACTERS)
+        raise ValueError(f"{c!r} has no MIX character code")
+
+    return text.translate(TO_CODES).encode("latin-1")
+
+
+def codes_to_text(codes: bytes) -> str:
+    """The characters with the given character codes, translated in one go."""
+    if codes and max(codes) >= len(alphabet):
+        code = next(code for code in codes if code >= len(alphabet))
+        raise ValueError(f"{code} is not a MIX character code")
+
+    return codes.decode("latin-1").translate(FROM_CODES)
+
+
+def text_to_bytes(text: str) -> list[Byte]:
+    """A Byte for every character of text."""
+    return [BYTES[code] for code in text_to_codes(text)]
+
+
+def bytes_to_text(bs: Iterable[Byte]) -> str:
+    """The characters held in bs."""
+    return codes_to_text(bytes([b.val for b in bs]))
+
+
+def words_to_text(words: list[Word]) -> str:
+    """The characters held in a block of words, five per word."""
+    return codes_to_text(
+        bytes(
+            [
+                b.val
+                for word in words
+                for b in (word.b1, word.b2, word.b3, word.b4, word.b5)
+            ]
+        )
+    )
+
+
+def text_to_words(text: str, count: int) -> list[Word]:
+    """A block of count words holding text, padded with blanks."""
+    size = count * BYTES_IN_WORD
+    if len(text) > size:
+        raise ValueError(f"{text!r} does not fit in {count} words")
+
+    codes = text_to_codes(text.ljust(size))
+    return [
+        Word(
+            False,
+            BYTES[codes[i]],
+            BYTES[codes[i + 1]],
+            BYTES[codes[i + 2]],
+            BYTES[codes[i + 3]],
+            BYTES[codes[i + 4]],
+        )
+        for i in range(0, size, BYTES_IN_WORD)
+    ]
@@ -0,0 +1,495 @@
+import json
+import sys
+from argparse import ArgumentParser, ArgumentTypeError
+from collections.abc import Callable, Iterator
+from typing import TypeVar
+
+from mix_simulator.card import CardPunch, CardReader
+from mix_simulator.device import CharacterDevice
+from mix_simulator.devices import (
+    CARD_PUNCH,
+    CARD_READER,
+    DISKS,
+    PRINTER,
+    TAPES,
+    UNITS,
+)
+from mix_simulator.disk import FileDisk
+from mix_simulator.printer import LinePrinter
+from mix_simulator.simulator import IMAGE_SUFFIX, Simulator, SimulatorState
+from mix_simulator.sink import DEFAULT_ALGORITHM, DigestSink, open_sink
+from mix_simulator.tape import FileTape
+
+# the other commands import what they need when they run, so that running a program
+# does not wait on importing the batch, sweep, service and queue machinery (their
+# defaults below are those of workqueue and service)
+DEFAULT_SHARD_SIZE = 64
+DEFAULT_LEASE = 60.0
+DEFAULT_PROGRAMS = 256
+
+OBJECT_SUFFIX = ".mixo"
+COMMANDS = (
+    "run",
+    "assemble",
+    "link",
+    "watch",
+    "batch",
+    "sweep",
+    "serve",
+    "worker",
+    "reduce",
+)
+
+T = TypeVar("T")
+
+
+def execute(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    # "mixsim program.mix" is shorthand for "mixsim run program.mix"
+    if not argv or argv[0] not in (*COMMANDS, "-h", "--help"):
+        argv = ["run", *argv]
+
+    parser = ArgumentParser(prog="mixsim")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run a MIXAL program or image")
+    run_parser.add_argument("filename", type=str)
+    run_parser.add_argument(
+        "--listing",
+        action="store_true",
+        help="print the assembled program (including the literal pool) and exit",
+    )
+    run_parser.add_argument(
+        "--printer",
+        type=str,
+        default="-",
+        help='where line printer output goes: "-" for stdout, "null" or a file name',
+    )
+    run_parser.add_argument(
+        "--tape",
+        type=_unit_value(TAPES, _filename),
+        action="append",
+        default=[],
+        metavar="UNIT=FILE",
+        help="back tape unit UNIT (0-7) with a file, which is created if missing",
+    )
+    run_parser.add_argument(
+        "--disk",
+        type=_unit_value(DISKS, _filename),
+        action="append",
+        default=[],
+        metavar="UNIT=FILE",
+        help="back disk unit UNIT (8-15) with a file, which is created if missing",
+    )
+    run_parser.add_argument(
+        "--timing",
+        type=_unit_value(range(UNITS), _timing),
+        action="append",
+        default=[],
+        metavar="UNIT=LATENCY,TRANSFER",
+        help="keep unit UNIT busy for LATENCY u after IN, OUT and IOC, plus TRANSFER u "
+        "after IN and OUT",
+    )
+    run_parser.add_argument(
+        "--no-fast-forward",
+        action="store_true",
+        help="execute every iteration of loops that wait for a busy unit with JBUS or "
+        "JRED, instead of skipping to when the unit is done",
+    )
+    run_parser.add_argument(
+        "--digest",
+        nargs="?",
+        const=DEFAULT_ALGORITHM,
+        metavar="ALGORITHM",
+        help="instead of the output of the line printer and card punch, report a hash "
+        f"of it (by default {DEFAULT_ALGORITHM}), and of every tape that is not empty",
+    )
+    run_parser.add_argument(
+        "--keep-lines",
+        type=int,
+        default=0,
+        metavar="N",
+        help="with --digest, also print the first N lines of output of each unit",
+    )
+    run_parser.add_argument(
+        "--cards",
+        type=str,
+        help="file the card reader reads from, one card per line (default: stdin)",
+    )
+
+    assemble_parser = commands.add_parser(
+        "assemble",
+        help=f"assemble a MIXAL program into an object module ({OBJECT_SUFFIX})",
+    )
+    assemble_parser.add_argument("filename", type=str)
+    assemble_parser.add_argument("-o", "--output", type=str)
+
+    link_parser = commands.add_parser(
+        "link", help=f"link object modules into an executable image ({IMAGE_SUFFIX})"
+    )
+    link_parser.add_argument("modules", type=str, nargs="+")
+    link_parser.add_argument("-o", "--output", type=str, required=True)
+    link_parser.add_argument(
+        "--origin", type=int, default=0, help="location of the first module"
+    )
+
+    watch_parser = commands.add_parser(
+        "watch", help="reassemble and rerun a MIXAL program every time it is saved"
+    )
+    watch_parser.add_argument("filename", type=str)
+    watch_parser.add_argument(
+        "--interval", type=float, default=0.5, help="seconds between checks"
+    )
+    watch_parser.add_argument(
+        "--no-run", action="store_true", help="only reassemble the program"
+    )
+
+    batch_parser = commands.add_parser(
+        "batch",
+        help="run many programs on a pool of processes, printing a JSON line with the "
+        "result of each as it completes",
+    )
+    batch_parser.add_argument(
+        "programs", type=str, nargs="*", help="glob patterns of programs to run"
+    )
+    batch_parser.add_argument(
+        "--manifest",
+        type=str,
+        help='JSON lines file of {"program": FILE, "cards": FILE} jobs to run',
+    )
+    batch_parser.add_argument(
+        "--workers", type=int, help="number of processes (default: one per core)"
+    )
+    batch_parser.add_argument(
+        "--fork",
+        action="store_true",
+        help="fork a process per job from one that has assembled every program "
+        "(Unix only)",
+    )
+    batch_parser.add_argument(
+        "--queue",
+        type=str,
+        metavar="DIR",
+        help="rather than run the jobs, queue them in shards in DIR for "
+        "mixsim worker to run",
+    )
+    batch_parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        help=f"jobs per shard with --queue (default: {DEFAULT_SHARD_SIZE})",
+    )
+    _add_quota_arguments(batch_parser)
+    batch_parser.add_argument(
+        "--digest",
+        type=str,
+        default=DEFAULT_ALGORITHM,
+        metavar="ALGORITHM",
+        help=f"hash algorithm for the output digests (default: {DEFAULT_ALGORITHM})",
+    )
+
+    sweep_parser = commands.add_parser(
+        "sweep",
+        help="run a program once for each of many changes to its initial state, and "
+        "summarize the instruction counts and times",
+    )
+    sweep_parser.add_argument("filename", type=str)
+    sweep_parser.add_argument(
+        "--patches",
+        type=str,
+        default="-",
+        help='JSON lines file of {"memory": {LOCATION: VALUE}, "registers": '
+        "{NAME: VALUE}} changes, one per run (default: stdin)",
+    )
+    sweep_parser.add_argument(
+        "--workers", type=int, help="number of processes (default: one per core)"
+    )
+    sweep_parser.add_argument(
+        "--runs",
+        action="store_true",
+        help="print a JSON line with the result of every run before the summary",
+    )
+    sweep_parser.add_argument(
+        "--digest",
+        type=str,
+        default=DEFAULT_ALGORITHM,
+        metavar="ALGORITHM",
+        help=f"hash algorithm for the output digests (default: {DEFAULT_ALGORITHM})",
+    )
+    sweep_parser.add_argument(
+        "--lockstep",
+        type=int,
+        nargs="?",
+        const=1024,
+        metavar="LANES",
+        help="run LANES patches at a time in lockstep with numpy (default: 1024) "
+        "rather than on a pool of workers, for programs without I/O",
+    )
+
+    worker_parser = commands.add_parser(
+        "worker",
+        help="run the jobs queued in a directory by mixsim batch --queue, until they "
+        "are all done",
+    )
+    worker_parser.add_argument("queue", type=str, metavar="DIR")
+    worker_parser.add_argument(
+        "--workers", type=int, default=1, help="number of processes (default: 1)"
+    )
+    worker_parser.add_argument(
+        "--lease",
+        type=float,
+        default=DEFAULT_LEASE,
+        metavar="SECONDS",
+        help="how long a shard is held without a sign of life from its worker, "
+        f"before it is run again (default: {DEFAULT_LEASE:g})",
+    )
+    _add_quota_arguments(worker_parser)
+    worker_parser.add_argument(
+        "--digest",
+        type=str,
+        default=DEFAULT_ALGORITHM,
+        metavar="ALGORITHM",
+        help=f"hash algorithm for the output digests (default: {DEFAULT_ALGORITHM})",
+    )
+
+    reduce_parser = commands.add_parser(
+        "reduce",
+        help="summarize the results of the jobs queued in a directory",
+    )
+    reduce_parser.add_argument("queue", type=str, metavar="DIR")
+    reduce_parser.add_argument(
+        "--runs",
+        action="store_true",
+        help="print a JSON line with the result of every job before the summary",
+    )
+
+    serve_parser = commands.add_parser(
+        "serve",
+        help="answer JSON-RPC requests to register and run programs, one per line, on "
+        "stdin and stdout or a Unix socket",
+    )
+    serve_parser.add_argument(
+        "--socket", type=str, metavar="PATH", help="listen on a Unix socket at PATH"
+    )
+    serve_parser.add_argument(
+        "--workers", type=int, help="number of processes (default: one per core)"
+    )
+    serve_parser.add_argument(
+        "--programs",
+        type=int,
+        default=DEFAULT_PROGRAMS,
+        help=f"how many programs to keep registered (default: {DEFAULT_PROGRAMS})",
+    )
+    serve_parser.add_argument(
+        "--digest",
+        type=str,
+        default=DEFAULT_ALGORITHM,
+        metavar="ALGORITHM",
+        help=f"hash algorithm for the output digests (default: {DEFAULT_ALGORITHM})",
+    )
+
+    args = parser.parse_args(argv)
+
+    match args.command:
+        case "run":
+            if args.listing:
+                from mix_simulator.assembler import Assembler
+
+                assembler = Assembler(
+                    args.filename, SimulatorState.initial_state(), True
+                )
+                assembler.parse_program()
+                print("\n".join(assembler.format_listing()))
+            else:
+                simulator = Simulator(fast_forward=not args.no_fast_forward)
+                devices = simulator.state.devices
+                if args.digest is None:
+                    devices[PRINTER] = LinePrinter(open_sink(args.printer))
+                else:
+                    devices[PRINTER] = LinePrinter(
+                        DigestSink(args.digest, args.keep_lines)
+                    )
+                    devices[CARD_PUNCH] = CardPunch(
+                        sink=DigestSink(args.digest, args.keep_lines)
+                    )
+                for unit, filename in args.tape:
+                    devices[unit] = FileTape(filename)
+                for unit, filename in args.disk:
+                    devices[unit] = FileDisk(filename)
+                for unit, (latency, transfer) in args.timing:
+                    devices[unit].latency = latency
+                    devices[unit].transfer = transfer
+                if args.cards is not None:
+                    devices[CARD_READER] = CardReader(open(args.cards, "r"))
+                try:
+                    simulator.run(args.filename)
+                    if args.digest is not None:
+                        _report_digests(simulator, args.digest)
+                finally:
+                    devices.close()
+        case "assemble":
+            from mix_simulator.linker import ObjectModule
+
+            output = args.output
+            if output is None:
+                output = args.filename.removesuffix(".mix") + OBJECT_SUFFIX
+            ObjectModule.assemble(args.filename).write(output)
+        case "link":
+            from mix_simulator.linker import ObjectModule, link
+
+            modules = [ObjectModule.read(filename) for filename in args.modules]
+            link(modules, args.origin).write(args.output)
+        case "batch":
+            from mix_simulator.batch import Quota, find_jobs, read_manifest, run_batch
+
+            jobs = find_jobs(args.programs)
+            if args.manifest is not None:
+                jobs.extend(read_manifest(args.manifest))
+            if args.queue is not None:
+                from mix_simulator.workqueue import WorkQueue
+
+                shards = WorkQueue(args.queue).submit(jobs, args.shard_size)
+                print(json.dumps({"jobs": len(jobs), "shards": shards}))
+            else:
+                quota = Quota(args.max_instructions, args.max_time)
+                run_jobs = run_batch
+                if args.fork:
+                    from mix_simulator.fork import fork_batch
+
+                    run_jobs = fork_batch
+                for result in run_jobs(jobs, args.workers, args.digest, quota):
+                    print(result.to_json(), flush=True)
+        case "worker":
+            from concurrent.futures import ProcessPoolExecutor
+
+            from mix_simulator.batch import Quota
+            from mix_simulator.workqueue import WorkQueue, work
+
+            queue = WorkQueue(args.queue, args.lease)
+            quota = Quota(args.max_instructions, args.max_time)
+            with ProcessPoolExecutor(args.workers) as pool:
+                futures = [
+                    pool.submit(work, queue, args.digest, quota=quota)
+                    for _ in range(args.workers)
+                ]
+                shards = sum(future.result() for future in futures)
+            print(json.dumps({"shards": shards}))
+        case "reduce":
+            from mix_simulator.sweep import summarize
+            from mix_simulator.workqueue import WorkQueue
+
+            done = []
+            for result in WorkQueue(args.queue).results():
+                if args.runs:
+                    print(result.to_json(), flush=True)
+                done.append(result)
+            print(json.dumps(summarize(done)))
+        case "sweep":
+            from mix_simulator.batch import program_image
+            from mix_simulator.sweep import Patch, RunResult, summarize, sweep
+
+            patches_file = sys.stdin if args.patches == "-" else open(args.patches)
+            with patches_file:
+                patches = (
+                    Patch.from_json(line) for line in patches_file if line.strip()
+                )
+                image = program_image(args.filename)
+                results: Iterator[RunResult]
+                if args.lockstep is None:
+                    results = sweep(image, patches, args.workers, args.digest)
+                else:
+                    # numpy is optional, so only import it when it is asked for
+                    from mix_simulator.lockstep import lockstep_sweep
+
+                    results = lockstep_sweep(image, patches, args.lockstep, args.digest)
+                runs = []
+                for run in results:
+                    if args.runs:
+                        print(run.to_json(), flush=True)
+                    runs.append(run)
+            print(json.dumps(summarize(runs)))
+        case "serve":
+            import asyncio
+
+            from mix_simulator.service import Service
+
+            service = Service(args.workers, args.programs, args.digest)
+            try:
+                if args.socket is None:
+                    asyncio.run(service.serve_stdio())
+                else:
+                    asyncio.run(service.serve_socket(args.socket))
+            except KeyboardInterrupt:
+                pass
+            finally:
+                service.close()
+        case "watch":
+            from mix_simulator.watch import watch
+
+            try:
+                watch(args.filename, args.interval, run=not args.no_run)
+            except KeyboardInterrupt:
+                pass
+
+    return 0
+
+
+def _add_quota_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--max-instructions",
+        type=int,
+        metavar="N",
+        help="fail a job once it has executed N instructions without a HLT",
+    )
+    parser.add_argument(
+        "--max-time",
+        type=int,
+        metavar="U",
+        help="fail a job once it has taken more than U units of time",
+    )
+
+
+def _report_digests(simulator: Simulator, algorithm: str) -> None:
+    """Print the digests of the printer and punch output, and of the tapes."""
+    devices = simulator.state.devices
+    for unit, digest in devices.digests(algorithm).items():
+        print(f"unit {unit}: {digest}")
+        device = devices[unit]
+        if isinstance(device, CharacterDevice) and isinstance(device.sink, DigestSink):
+            for line in device.sink.lines:
+                print(f"  {line}")
+
+
+def _unit_value(
+    units: range, value: Callable[[str], T]
+) -> Callable[[str], tuple[int, T]]:
+    """An argument type for UNIT=VALUE, where UNIT must be one of units and value
+    parses VALUE (raising ValueError if it can't)."""
+
+    def parse(argument: str) -> tuple[int, T]:
+        unit, _, text = argument.partition("=")
+        try:
+            if not unit.isdigit() or int(unit) not in units:
+                raise ValueError(
+                    f"UNIT should be from {units.start} to {units.stop - 1}"
+                )
+            return int(unit), value(text)
+        except ValueError as e:
+            raise ArgumentTypeError(f"{argument!r}: {e}") from e
+
+    return parse
+
+
+def _filename(text: str) -> str:
+    if not text:
+        raise ValueError("no file name")
+    return text
+
+
+def _timing(text: str) -> tuple[int, int]:
+    latency, _, transfer = text.partition(",")
+    return int(latency), int(transfer or 0)
+
+
+if __name__ == "__main__":
+    execute()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+import sys
+from typing import TYPE_CHECKING, TextIO
+
+from mix_simulator.character_code import text_to_words, words_to_text
+from mix_simulator.sink import Sink, StreamSink
+
+if TYPE_CHECKING:
+    from mix_simulator.simulator import SimulatorState
+
+
+class Device:
+    """An I/O unit, which transfers BLOCK_SIZE words at a time.
+
+    IN, OUT and IOC are handed to read, write and control along with the address M of
+    the instruction. A unit that does not support an operation raises ValueError.
+
+    The data is transferred straight away, but the unit then stays busy for latency u
+    (after IN, OUT and IOC) plus transfer u (after IN and OUT) of simulated time, which
+    is what JBUS and JRED see. By default both are 0, so a unit is never busy.
+    """
+
+    BLOCK_SIZE: int = 1
+
+    latency: int = 0
+    transfer: int = 0
+    busy: bool = False
+    # the clock time at which the unit stops being busy
+    ready_at: int = 0
+
+    def read(self, state: SimulatorState, address: int) -> None:
+        raise ValueError(f"{type(self).__name__} does not support IN")
+
+    def write(self, state: SimulatorState, address: int) -> None:
+        raise ValueError(f"{type(self).__name__} does not support OUT")
+
+    def control(self, state: SimulatorState, m: int) -> None:
+        raise ValueError(f"{type(self).__name__} does not support IOC {m}")
+
+    def ready(self, output: bool) -> bool:
+        """Whether an IN (or OUT, if output) can start without waiting on the host."""
+        return True
+
+    def wait(self, output: bool) -> None:
+        """Wait on the host until the unit is ready for an IN (or OUT, if output).
+
+        This may be called from another thread, while the simulator is not running.
+        """
+
+    def flush(self) -> None:
+        """Hand any buffered output to the host."""
+
+    def close(self) -> None:
+        """Flush the unit and release whatever it holds on the host."""
+        self.flush()
+
+    def reset(self) -> None:
+        """Put the unit back the way it was before its first operation, so it can be
+        used for another run. Output that was not flushed is discarded, and units that
+        keep their data in a file on the host keep what is in the file."""
+        self.busy = False
+        self.ready_at = 0
+
+
+class CharacterDevice(Device):
+    """A unit that transfers a line of text per block, five characters to a word.
+
+    Input lines are read from source (sys.stdin when None), output lines are written to
+    sink. INPUT and OUTPUT say which of the two the unit supports. Only sys.stdin is
+    taken to make IN wait on the host, files are read straight away.
+    """
+
+    INPUT: bool = False
+    OUTPUT: bool = False
+
+    source: TextIO | None
+    sink: Sink
+    # a line that wait read ahead of the next IN
+    ahead: list[str]
+
+    def __init__(self, source: TextIO | None = None, sink: Sink | None = None) -> None:
+        self.source = source
+        self.sink = StreamSink() if sink is None else sink
+        self.ahead = []
+
+    def read(self, state: SimulatorState, address: int) -> None:
+        if not self.INPUT:
+            super().read(state, address)
+
+        if self.ahead:
+            line = self.ahead.pop()
+        else:
+            source = sys.stdin if self.source is None else self.source
+            line = source.readline()
+        if not line:
+            raise ValueError(f"{type(self).__name__} has no more input")
+
+        words = text_to_words(line.rstrip("\n"), self.BLOCK_SIZE)
+        state.memory.write_block(address, words)
+
+    def write(self, state: SimulatorState, address: int) -> None:
+        if not self.OUTPUT:
+            super().write(state, address)
+
+        words = state.memory.read_block(address, self.BLOCK_SIZE)
+        self.sink.write(words_to_text(words) + "\n")
+
+    def ready(self, output: bool) -> bool:
+        if output:
+            return self.sink.ready()
+        return self.source is not None or bool(self.ahead) or not self.INPUT
+
+    def wait(self, output: bool) -> None:
+        if output:
+            self.sink.wait()
+        elif not self.ready(output):
+            self.ahead.append(sys.stdin.readline())
+
+    def flush(self) -> None:
+        self.sink.flush()
+
+    def close(self) -> None:
+        self.sink.close()
+
+    def reset(self) -> None:
+        super().reset()
+        self.ahead = []
+        self.sink.reset()
+        # the input is read again from the start, where it can be, and only close
+        # closes the source
+        if self.source is not None and self.source.seekable():
+            self.source.seek(0)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+from heapq import heappop, heappush
+from typing import TYPE_CHECKING
+
+from mix_simulator.card import CardPunch, CardReader
+from mix_simulator.device import CharacterDevice, Device
+from mix_simulator.disk import Disk
+from mix_simulator.printer import LinePrinter
+from mix_simulator.sink import DigestSink
+from mix_simulator.tape import BLOCK, Tape
+from mix_simulator.typewriter import PaperTape, Typewriter
+
+if TYPE_CHECKING:
+    from mix_simulator.simulator import SimulatorState
+
+TAPES = range(0, 8)
+DISKS = range(8, 16)
+CARD_READER = 16
+CARD_PUNCH = 17
+PRINTER = 18
+TYPEWRITER = 19
+PAPER_TAPE = 20
+UNITS = 21
+# the next_event when no unit is busy
+NEVER = 1 << 62
+
+
+class Devices:
+    """The I/O units attached to a simulator, by unit number (the F of IN, OUT, IOC,
+    JBUS and JRED).
+
+    Any unit can be swapped for another Device, e.g. to read cards from a file.
+
+    Units that are busy have an event in a heap, keyed by the clock time they are done,
+    so the simulator only has to compare the clock with next_event after each
+    instruction.
+    """
+
+    units: dict[int, Device]
+    events: list[tuple[int, int]]
+    next_event: int
+
+    def __init__(self, units: dict[int, Device] | None = None) -> None:
+        self.units = {} if units is None else units
+        self.events = []
+        self.next_event = NEVER
+
+    @staticmethod
+    def standard() -> Devices:
+        """Every unit of a standard MIX installation, with empty tapes and disks."""
+        units: dict[int, Device] = {}
+        for unit in TAPES:
+            units[unit] = Tape()
+        for unit in DISKS:
+            units[unit] = Disk()
+        units[CARD_READER] = CardReader()
+        units[CARD_PUNCH] = CardPunch()
+        units[PRINTER] = LinePrinter()
+        units[TYPEWRITER] = Typewriter()
+        units[PAPER_TAPE] = PaperTape()
+
+        return Devices(units)
+
+    def __getitem__(self, unit: int) -> Device:
+        if unit not in self.units:
+            raise ValueError(f"No device is attached as unit {unit}")
+
+        return self.units[unit]
+
+    def __setitem__(self, unit: int, device: Device) -> None:
+        if not 0 <= unit < UNITS:
+            raise ValueError(f"Unit {unit} is not between 0 and {UNITS - 1}")
+
+        self.units[unit] = device
+
+    def start(self, unit: int, state: SimulatorState, transfer: bool = True) -> Device:
+        """The device for unit, about to start an operation (with a transfer of data,
+        unless it is IOC). If the unit is still busy, the clock first skips ahead to
+        when it is done, like MIX waits for it."""
+        device = self[unit]
+        if device.busy:
+            state.clock = max(state.clock, device.ready_at)
+            self.complete(state.clock)
+
+        duration = device.latency + (device.transfer if transfer else 0)
+        if duration:
+            device.busy = True
+            device.ready_at = state.clock + duration
+            heappush(self.events, (device.ready_at, unit))
+            self.next_event = self.events[0][0]
+
+        return device
+
+    def complete(self, clock: int) -> None:
+        """Mark the units that are done by clock as ready."""
+        while self.events and self.events[0][0] <= clock:
+            _, unit = heappop(self.events)
+            self.units[unit].busy = False
+
+        self.next_event = self.events[0][0] if self.events else NEVER
+
+    def digests(self, algorithm: str) -> dict[int, str]:
+        """The digest and size of the output of every unit that writes to a DigestSink,
+        and of every tape that is not empty, by unit."""
+        digests = {}
+        for unit, device in sorted(self.units.items()):
+            if isinstance(device, CharacterDevice) and isinstance(
+                device.sink, DigestSink
+            ):
+                digests[unit] = device.sink.report()
+            elif isinstance(device, Tape) and device.length:
+                digest = device.digest(algorithm)
+                size = device.length * BLOCK.size
+                digests[unit] = f"{digest.name}:{digest.hexdigest()} {size} bytes"
+
+        return digests
+
+    def flush(self) -> None:
+        for device in self.units.values():
+            device.flush()
+
+    def close(self) -> None:
+        for device in self.units.values():
+            device.close()
+
+    def reset(self) -> None:
+        """Reset every unit (see Device.reset), none of which is busy any more."""
+        self.events.clear()
+        self.next_event = NEVER
+        for device in self.units.values():
+            device.reset()
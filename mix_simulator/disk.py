@@ -0,0 +1,169 @@
+from __future__ import annotations
+import os
+from collections import OrderedDict
+from io import BufferedRandom
+from mmap import mmap
+from typing import TYPE_CHECKING
+
+from mix_simulator.device import Device
+from mix_simulator.tape import BLOCK
+from mix_simulator.word import Word, pack_word, unpack_word
+
+if TYPE_CHECKING:
+    from mix_simulator.simulator import SimulatorState
+
+EMPTY_BLOCK = (0,) * 100
+DEFAULT_CACHE_BLOCKS = 256
+
+
+class Disk(Device):
+    """A disk or drum unit (units 8-15), which reads and writes blocks of 100 words.
+
+    The block that IN and OUT transfer is the one numbered by rX. Blocks that were
+    never written hold +0. IOC 0 positions the unit on block rX, which takes no time.
+    """
+
+    BLOCK_SIZE = 100
+
+    blocks: dict[int, tuple[int, ...]]
+
+    def __init__(self) -> None:
+        self.blocks = {}
+
+    def read(self, state: SimulatorState, address: int) -> None:
+        block = self.blocks.get(self._block(state), EMPTY_BLOCK)
+        state.memory.write_block(address, [unpack_word(packed) for packed in block])
+
+    def write(self, state: SimulatorState, address: int) -> None:
+        words = state.memory.read_block(address, self.BLOCK_SIZE)
+        self.blocks[self._block(state)] = tuple(pack_word(word) for word in words)
+
+    def control(self, state: SimulatorState, m: int) -> None:
+        if m != 0:
+            super().control(state, m)
+        self._block(state)
+
+    def reset(self) -> None:
+        super().reset()
+        self.blocks = {}
+
+    def _block(self, state: SimulatorState) -> int:
+        block = int(state.rX)
+        if block < 0:
+            raise ValueError(f"{block} is not a valid block number")
+        return block
+
+
+class BlockCache:
+    """The most recently used blocks of a disk, decoded into words.
+
+    The words in the cache are never handed out (memory changes words in place), only
+    copies of them, which share their bytes.
+    """
+
+    capacity: int
+    blocks: OrderedDict[int, list[Word]]
+
+    def __init__(self, capacity: int = DEFAULT_CACHE_BLOCKS) -> None:
+        self.capacity = capacity
+        self.blocks = OrderedDict()
+
+    def get(self, block: int) -> list[Word] | None:
+        words = self.blocks.get(block)
+        if words is None:
+            return None
+
+        self.blocks.move_to_end(block)
+        return [Word(w.sign, w.b1, w.b2, w.b3, w.b4, w.b5) for w in words]
+
+    def put(self, block: int, words: list[Word]) -> None:
+        if self.capacity <= 0:
+            return
+
+        self.blocks[block] = [Word(w.sign, w.b1, w.b2, w.b3, w.b4, w.b5) for w in words]
+        self.blocks.move_to_end(block)
+        if len(self.blocks) > self.capacity:
+            self.blocks.popitem(last=False)
+
+    def discard(self, block: int) -> None:
+        self.blocks.pop(block, None)
+
+
+class FileDisk(Disk):
+    """A disk unit whose blocks are kept in a memory mapped file on the host, in the
+    same layout as a tape file.
+
+    IN and OUT copy a block straight out of, or into, the mapped file, so several
+    simulations of the same disk share the page cache of the host. Decoded blocks are
+    kept in a BlockCache. Writing past the end of the file extends it, the blocks in
+    between hold +0. Missing files are created as an empty disk.
+
+    The file is extended to at least twice its size at a time, so that writing block
+    after block past the end only remaps it now and then. The blocks it is extended
+    by hold +0 like any other block that was never written.
+    """
+
+    file: BufferedRandom
+    map: mmap | None
+    blocks_on_disk: int
+    cache: BlockCache
+
+    def __init__(self, filename: str, cache_blocks: int = DEFAULT_CACHE_BLOCKS) -> None:
+        self.file = open(filename, "r+b" if os.path.exists(filename) else "w+b")
+        size = os.fstat(self.file.fileno()).st_size
+        if size % BLOCK.size:
+            self.file.close()
+            raise ValueError(
+                f"{filename} is not a disk, its size is not a multiple of {BLOCK.size}"
+            )
+
+        self.map = None
+        self.blocks_on_disk = 0
+        # an empty file can not be mapped, so it is mapped on the first write
+        if size:
+            self._extend(size // BLOCK.size)
+        self.cache = BlockCache(cache_blocks)
+
+    def read(self, state: SimulatorState, address: int) -> None:
+        block = self._block(state)
+        words = self.cache.get(block)
+        if words is None:
+            if self.map is not None and block < self.blocks_on_disk:
+                packed = BLOCK.unpack_from(self.map, block * BLOCK.size)
+            else:
+                packed = EMPTY_BLOCK
+            words = [unpack_word(p) for p in packed]
+            self.cache.put(block, words)
+
+        state.memory.write_block(address, words)
+
+    def write(self, state: SimulatorState, address: int) -> None:
+        block = self._block(state)
+        words = state.memory.read_block(address, self.BLOCK_SIZE)
+        mapped = self.map
+        if mapped is None or block >= self.blocks_on_disk:
+            mapped = self._extend(block + 1)
+
+        BLOCK.pack_into(mapped, block * BLOCK.size, *[pack_word(w) for w in words])
+        self.cache.discard(block)
+
+    def flush(self) -> None:
+        if self.map is not None:
+            self.map.flush()
+
+    def close(self) -> None:
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def _extend(self, blocks: int) -> mmap:
+        if self.map is not None:
+            self.map.close()
+        if blocks > self.blocks_on_disk:
+            blocks = max(blocks, 2 * self.blocks_on_disk)
+            os.ftruncate(self.file.fileno(), blocks * BLOCK.size)
+
+        self.map = mmap(self.file.fileno(), blocks * BLOCK.size)
+        self.blocks_on_disk = blocks
+        return self.map
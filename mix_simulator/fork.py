@@ -0,0 +1,127 @@
+from __future__ import annotations
+import os
+import selectors
+from collections import deque
+from collections.abc import Generator, Iterable
+from typing import NoReturn
+
+# the simulator imports instructions on first use, so import them here rather than
+# in every child
+import mix_simulator.instruction  # noqa: F401
+from mix_simulator.batch import Job, Quota, Result, program_image
+from mix_simulator.card import CardReader
+from mix_simulator.devices import CARD_READER
+from mix_simulator.image import Image
+from mix_simulator.sink import DEFAULT_ALGORITHM
+from mix_simulator.sweep import Machine, Patch, RunResult
+
+
+def _run_on(machine: Machine, job: Job, quota: Quota) -> Result:
+    state = machine.simulator.state
+    try:
+        machine.start(Patch())
+        if job.cards is not None:
+            state.devices[CARD_READER] = CardReader(open(job.cards))
+        quota.run(machine.simulator)
+        run = machine.result()
+    except Exception as e:
+        run = machine.result(e)
+    finally:
+        state.devices.close()
+
+    return Result.of(job, run)
+
+
+def _child(
+    machine: Machine,
+    images: dict[str, Image | Exception],
+    job: Job,
+    quota: Quota,
+    output: int,
+) -> NoReturn:
+    """Run job in a forked child, writing its result to output, and exit."""
+    try:
+        image = images[job.program]
+        if isinstance(image, Exception):
+            error = f"{type(image).__name__}: {image}"
+            result = Result.of(job, RunResult("error", 0, 0, error=error))
+        else:
+            machine.load(image)
+            result = _run_on(machine, job, quota)
+        data = (result.to_json() + "\n").encode()
+        while data:
+            data = data[os.write(output, data) :]
+    finally:
+        # skip the cleanup of the parent's state, the parent does that
+        os._exit(0)
+
+
+def fork_batch(
+    jobs: Iterable[Job],
+    workers: int | None = None,
+    algorithm: str = DEFAULT_ALGORITHM,
+    quota: Quota | None = None,
+) -> Generator[Result, None, None]:
+    """Like run_batch, but fork a child per job (up to workers at a time, one per core
+    by default) from this process, which serves as the zygote.
+
+    Before forking, every program is assembled and loaded into a template machine,
+    so a child starts out with its machine ready (sharing the memory of the template
+    until it writes to it) and only resets and runs it. This saves a worker the
+    startup, imports and assembly that run_batch pays for, which matter for short
+    jobs. Only for Unix, and only from a process without other threads.
+    """
+    quota = Quota() if quota is None else quota
+    jobs = list(jobs)
+    images: dict[str, Image | Exception] = {}
+    for job in jobs:
+        if job.program not in images:
+            try:
+                images[job.program] = program_image(job.program)
+            except Exception as e:
+                images[job.program] = e
+    # the template that children load the image of their job into, which starts out
+    # with the first image so that a batch of one program does not even do that
+    first = next((image for image in images.values() if isinstance(image, Image)), None)
+    machine = Machine(Image({}, 0) if first is None else first, algorithm)
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    waiting = deque(jobs)
+    # the job, pid and output so far of each child, by the pipe it writes to
+    children: dict[int, tuple[Job, int, list[bytes]]] = {}
+    with selectors.DefaultSelector() as selector:
+        try:
+            while waiting or children:
+                while waiting and len(children) < workers:
+                    job = waiting.popleft()
+                    read, write = os.pipe()
+                    pid = os.fork()
+                    if pid == 0:
+                        os.close(read)
+                        _child(machine, images, job, quota, write)
+                    os.close(write)
+                    selector.register(read, selectors.EVENT_READ)
+                    children[read] = (job, pid, [])
+
+                for key, _ in selector.select():
+                    fd = key.fd
+                    data = os.read(fd, 1 << 16)
+                    job, pid, chunks = children[fd]
+                    if data:
+                        chunks.append(data)
+                        continue
+
+                    selector.unregister(fd)
+                    os.close(fd)
+                    del children[fd]
+                    _, status = os.waitpid(pid, 0)
+                    if chunks:
+                        yield Result.from_json(b"".join(chunks).decode())
+                    else:
+                        error = f"ChildProcessError: Exited with status {status}"
+                        yield Result.of(job, RunResult("error", 0, 0, error=error))
+        finally:
+            # the results were not all wanted, reap the children that are left
+            for fd, (_, pid, _) in children.items():
+                os.close(fd)
+                os.waitpid(pid, 0)
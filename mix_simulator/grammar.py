@@ -11,8 +11,8 @@ to parse programs written in MIXAL.
 <SIGN>          -> + | -
 <BINARY-OP>     -> + | - | * | / | // | :
 <LOC-COUNTER>   -> *
-<MIX-OP>        -> NOP | ADD | SUB | MUL | DIV | NUM | CHAR | HLT | SLA | SRA | SLAX | SRAX | SLC | SRC | MOVE | LDA | LD1 | LD2 | LD3 | LD4 | LD5 | LD6 | LDX | LDAN | LD1N | LD2N | LD3N | LD4N | LD5N | LD6N | LDXN | STA | ST1 | ST2 | ST3 | ST4 | ST5 | ST6 | STX | STJ | STZ | JBUS | IOC | IN | OUT | JRED | JMP | JSJ | JOV | JNOV | JL | JE | JG | JGE | JNE | JLE | JAN | JAZ | JAP | JANN | JANZ | JANP | J1N | J1Z | J1P | J1NN | J1NZ | J1NP | J2N | J2Z | J2P | J2NN | J2NZ | J2NP | J3N | J3Z | J3P | J3NN | J3NZ | J3NP | J4N | J4Z | J4P | J4NN | J4NZ | J4NP | J5N | J5Z | J5P | J5NN | J5NZ | J5NP | J6N | J6Z | J6P | J6NN | J6NZ | J6NP | JXN | JXZ | JXP | JXNN | JXNZ | JXNP | INCA | DECA | ENTA | ENNA | INC1 | DEC1 | ENT1 | ENN1 | INC2 | DEC2 | ENT2 | ENN2 | INC3 | DEC3 | ENT3 | ENN3 | INC4 | DEC4 | ENT4 | ENN4 | INC5 | DEC5 | ENT5 | ENN5 | INC6 | DEC6 | ENT6 | ENN6 | INCX | DECX | ENTX | ENNX | CMPA | CMP1 | CMP2 | CMP3 | CMP4 | CMP5 | CMP6 | CMPX
-<OP>            -> <MIX-OP> | EQU | ORIG | CON | ALF | END
+<MIX-OP>        -> any mnemonic in instruction_set.INSTRUCTION_SET
+<OP>            -> <MIX-OP> | EQU | ORIG | CON | ALF | END | ENTRY | EXTERN
 
 <SYMBOL>        -> (<DIGIT> | <LETTER>)* <LETTER> (<DIGIT> | <LETTER>)*
 <NUMBER>        -> <DIGIT>+
@@ -29,14 +29,16 @@ to parse programs written in MIXAL.
 <INSTRUCTION>   -> <SYMBOL>?<SPACE>+<OP><SPACE>+<INDEX-PART><F-PART>
 """
 
+from mix_simulator.instruction_set import INSTRUCTION_SET
+
 DIGIT = r"[0-9]"
 LETTER = r"[A-Z\_]"  # add an underscore to represent spaces in ALF strings/literals
 SPACE = r"[ \t]"
 SIGN = r"[\+\-]"
 BINARY_OP = r"(?:[\+\-\*\/\:]|\/\/)"
 LOC_COUNTER = r"\*"
-MIX_OP = r"NOP|ADD|SUB|MUL|DIV|NUM|CHAR|HLT|SLA|SRA|SLAX|SRAX|SLC|SRC|MOVE|LDA|LD1|LD2|LD3|LD4|LD5|LD6|LDX|LDAN|LD1N|LD2N|LD3N|LD4N|LD5N|LD6N|LDXN|STA|ST1|ST2|ST3|ST4|ST5|ST6|STX|STJ|STZ|JBUS|IOC|IN|OUT|JRED|JMP|JSJ|JOV|JNOV|JL|JE|JG|JGE|JNE|JLE|JAN|JAZ|JAP|JANN|JANZ|JANP|J1N|J1Z|J1P|J1NN|J1NZ|J1NP|J2N|J2Z|J2P|J2NN|J2NZ|J2NP|J3N|J3Z|J3P|J3NN|J3NZ|J3NP|J4N|J4Z|J4P|J4NN|J4NZ|J4NP|J5N|J5Z|J5P|J5NN|J5NZ|J5NP|J6N|J6Z|J6P|J6NN|J6NZ|J6NP|JXN|JXZ|JXP|JXNN|JXNZ|JXNP|INCA|DECA|ENTA|ENNA|INC1|DEC1|ENT1|ENN1|INC2|DEC2|ENT2|ENN2|INC3|DEC3|ENT3|ENN3|INC4|DEC4|ENT4|ENN4|INC5|DEC5|ENT5|ENN5|INC6|DEC6|ENT6|ENN6|INCX|DECX|ENTX|ENNX|CMPA|CMP1|CMP2|CMP3|CMP4|CMP5|CMP6|CMPX"
-OP = rf"(?:{MIX_OP}|EQU|ORIG|CON|ALF|END)"
+MIX_OP = "|".join(spec.mnemonic for spec in INSTRUCTION_SET)
+OP = rf"(?:{MIX_OP}|EQU|ORIG|CON|ALF|END|ENTRY|EXTERN)"
 
 SYMBOL = rf"(?:{DIGIT}|{LETTER})*{LETTER}(?:{DIGIT}|{LETTER})*"
 NUMBER = rf"{DIGIT}+"
@@ -0,0 +1,49 @@
+from __future__ import annotations
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from mix_simulator.simulator import SimulatorState
+from mix_simulator.word import pack_word, unpack_word
+
+
+@dataclass
+class Image:
+    """An executable program, ready to be loaded into a simulator.
+
+    Only the words that are not +0 are kept (memory starts out as +0), each packed into
+    a single integer with pack_word. words may be any mapping, such as SharedWords.
+    """
+
+    words: Mapping[int, int]
+    start: int
+
+    @staticmethod
+    def from_state(state: SimulatorState) -> Image:
+        words = {}
+        for i, word in enumerate(state.memory.cells):
+            packed = pack_word(word)
+            if packed:
+                words[i] = packed
+
+        return Image(words, state.program_counter)
+
+    @staticmethod
+    def read(filename: str) -> Image:
+        with open(filename, "r") as f:
+            data = json.load(f)
+
+        # json object keys are always strings
+        words = {int(loc): packed for loc, packed in data["words"].items()}
+        return Image(words, data["start"])
+
+    def write(self, filename: str) -> None:
+        with open(filename, "w") as f:
+            json.dump({"start": self.start, "words": dict(self.words)}, f)
+
+    def load(self, state: SimulatorState) -> None:
+        """Copy the image into memory and point the program counter at its start."""
+        for loc, packed in self.words.items():
+            state.memory[loc] = unpack_word(packed)
+
+        state.program_counter = self.start
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import List, Tuple
+from collections.abc import Sequence
+from dataclasses import replace
+from typing import Tuple
 
 from mix_simulator.byte import (
     BITS_IN_BYTE,
@@ -8,10 +10,10 @@ from mix_simulator.byte import (
     bytes_to_int,
     int_to_bytes,
 )
-from mix_simulator.character_code import byte_to_char, char_to_byte
+from mix_simulator.character_code import text_to_bytes
 from mix_simulator.comparison_indicator import ComparisonIndicator
 from mix_simulator.opcode import OpCode
-from mix_simulator.operator import Operator
+from mix_simulator.instruction_set import BY_CODE_AND_FIELD, CODES, TIMES
 from mix_simulator.register import (
     ZERO_REGISTER,
     IndexRegister,
@@ -21,7 +23,8 @@ from mix_simulator.register import (
 from mix_simulator.simulator import SimulatorState
 from mix_simulator.word import BYTES_IN_WORD, Word
 
-INSTRUCTION_CACHE: dict[Word, Instruction] = {}
+# decoding the C byte with a lookup is quicker than calling OpCode(c)
+OPCODES = tuple(OpCode)
 
 
 class Instruction:
@@ -33,6 +36,8 @@ class Instruction:
     modification: Tuple[int, int]
     opcode: OpCode
     state: SimulatorState
+    # how long the instruction takes in u, not counting any wait for an I/O unit
+    time: int
 
     def __init__(
         self,
@@ -48,23 +53,31 @@ class Instruction:
         self.modification = divmod(self.field, 8)
         self.opcode = opcode
         self.state = state
+        self.time = TIMES[self.opcode * CODES + self.field]
 
     def __repr__(self) -> str:
-        op = Operator.from_code_and_field(self.opcode, self.field)
+        spec = BY_CODE_AND_FIELD[self.opcode * CODES + self.field]
+        op = spec.mnemonic if spec is not None else f"C{self.opcode.value}"
         addr = self.address
         idx = f",{self.index}" if self.index else ""
         left, right = self.modification
         lr = f"({left}:{right})" if self.field != 5 else ""
 
-        return f"{op.name} {addr}{idx}{lr}"
+        return f"{op} {addr}{idx}{lr}"
 
     @staticmethod
     def from_word(word: Word, state: SimulatorState) -> Instruction:
-        global INSTRUCTION_CACHE
-
-        if word in INSTRUCTION_CACHE:
-            instruction = INSTRUCTION_CACHE[word]
-            instruction.state = state
+        """The instruction in word, decoded once per state (see SimulatorState.decoded)."""
+        key = (
+            word.sign,
+            word.b1.val,
+            word.b2.val,
+            word.b3.val,
+            word.b4.val,
+            word.b5.val,
+        )
+        instruction = state.decoded.get(key)
+        if instruction is not None:
             return instruction
 
         address = bytes_to_int((word.b1, word.b2))
@@ -73,10 +86,10 @@ class Instruction:
 
         index = word.b3.val
         field = word.b4.val
-        opcode = OpCode(word.b5.val)
+        opcode = OPCODES[word.b5.val]
 
         instruction = Instruction(address, index, field, opcode, state)
-        INSTRUCTION_CACHE[word] = instruction
+        state.decoded[key] = instruction
         return instruction
 
     def execute(self) -> None:
@@ -218,11 +231,17 @@ class Instruction:
                 pass
 
             # I/O
+            case OpCode.JBUS | OpCode.JRED:
+                self._jump(None)
             case OpCode.IOC:
-                # we assume the device is ready
-                pass
+                device = self.state.devices.start(self.field, self.state, False)
+                device.control(self.state, self._get_address())
+            case OpCode.IN:
+                device = self.state.devices.start(self.field, self.state)
+                device.read(self.state, self._get_address())
             case OpCode.OUT:
-                self._out()
+                device = self.state.devices.start(self.field, self.state)
+                device.write(self.state, self._get_address())
 
             # CONV
             case OpCode.CONV:
@@ -282,6 +301,8 @@ class Instruction:
         indices = range(max(lo, 1), hi + 1)
         for i, d in zip(indices, data):
             word.update(i, d)
+        # assign the word back, so that the cell is seen as dirty
+        self.state.memory[m] = word
 
     def _add(self, negative: bool = False) -> None:
         # load the value in the instruction as an integer
@@ -426,7 +447,11 @@ class Instruction:
         criteria_met = False
 
         # evaluate the jump criteria
-        if self.opcode == OpCode.JMP:
+        if self.opcode == OpCode.JBUS:
+            criteria_met = self.state.devices[self.field].busy
+        elif self.opcode == OpCode.JRED:
+            criteria_met = not self.state.devices[self.field].busy
+        elif self.opcode == OpCode.JMP:
             # JMP and JSP
             if self.field == 0 or self.field == 1:
                 criteria_met = True
@@ -521,12 +546,14 @@ class Instruction:
         if m == 0:
             return
         bits_to_shift = BITS_IN_BYTE * m
+        # little endian bytes of the register(s)
+        data: Sequence[Byte]
 
         # SLA and SRA
         if self.field == 0 or self.field == 1:
             if m >= self.state.rA.BYTES:
                 # all bytes were shifted out of A
-                data = [Byte(0), Byte(0), Byte(0), Byte(0), Byte(0)]
+                data = (Byte(0), Byte(0), Byte(0), Byte(0), Byte(0))
             else:
                 a = abs(int(self.state.rA))
                 new_value = (
@@ -540,7 +567,7 @@ class Instruction:
         elif self.field == 2 or self.field == 3:
             if m >= self.state.rA.BYTES + self.state.rX.BYTES:
                 # all bytes were shifted out of A and X
-                data = [
+                data = (
                     Byte(0),
                     Byte(0),
                     Byte(0),
@@ -551,7 +578,7 @@ class Instruction:
                     Byte(0),
                     Byte(0),
                     Byte(0),
-                ]
+                )
             else:
                 ax = (
                     abs(int(self.state.rA)) << (BITS_IN_BYTE * self.state.rA.BYTES)
@@ -608,29 +635,9 @@ class Instruction:
         # if src < dst, start at the end so we don't overwrite later src indices
         indices = range(words - 1, -1, -1) if src < dst else range(words)
 
-        # move the data
+        # copy the data, so that changing a word later does not change the other
         for i in indices:
-            self.state.memory[dst + i] = self.state.memory[src + i]
-
-    def _out(self) -> None:
-        match self.field:
-            # line printer
-            case 18:
-                block_size = 24
-                for i in range(block_size):
-                    m = self._get_address()
-                    word = self.state.memory[m + i]
-
-                    for byte in (word.b1, word.b2, word.b3, word.b4, word.b5):
-                        char = byte_to_char(byte)
-                        print(char, end="")
-
-                # newline
-                print("")
-            case _:
-                raise NotImplementedError(
-                    "Only the line print (field=18) is supported for I/O"
-                )
+            self.state.memory[dst + i] = replace(self.state.memory[src + i])
 
     def _num(self) -> None:
         a = self.state.rA
@@ -652,23 +659,13 @@ class Instruction:
     def _char(self) -> None:
         a = self.state.rA
         x = self.state.rX
-        num = abs(int(a))
-        # little endian base 10 byte representation of the value in A
-        char_bytes: List[Byte] = []
-
-        # convert int to char bytes
-        while num:
-            char = str(num % 10)
-            char_bytes.append(char_to_byte(char))
-            num //= 10
-
-        # pad with "0" char to fill A and X
-        while len(char_bytes) < a.BYTES + x.BYTES:
-            char_bytes.append(char_to_byte("0"))
+        # the value in A as 10 decimal digit characters, most significant first
+        digits = str(abs(int(a))).rjust(a.BYTES + x.BYTES, "0")
+        char_bytes = text_to_bytes(digits)
 
         # store back into A and X
-        x.update(x.sign, *char_bytes[: x.BYTES])
-        a.update(a.sign, *char_bytes[x.BYTES :])
+        a.update(a.sign, *reversed(char_bytes[: a.BYTES]))
+        x.update(x.sign, *reversed(char_bytes[a.BYTES :]))
 
     def _get_address(self) -> int:
         match self.index:
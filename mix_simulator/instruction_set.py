@@ -0,0 +1,221 @@
+from typing import NamedTuple
+
+# what the F (op variant) byte of an instruction means
+FIELD = "field"  # a field specification (L:R) of the word at M
+UNIT = "unit"  # an I/O unit number
+COUNT = "count"  # the number of words to move
+VARIANT = "variant"  # which instruction of the C code this is, e.g. JMP vs JSJ
+NONE = "none"  # ignored
+
+# the value of a flat lookup table is at index C * CODES + F
+CODES = 64
+
+
+class Spec(NamedTuple):
+    """One instruction of the MIX instruction set.
+
+    mnemonic: the name of the instruction in MIXAL
+    code:     the C (op code) byte
+    field:    the default F (op variant) byte
+    time:     how long the instruction takes to execute in units (u), MOVE also takes
+              an extra 2u for every word moved
+    register: the register the instruction works on, if it names one (A, X, 1-6 or J)
+    operand:  what the F byte means (FIELD, UNIT, COUNT, VARIANT or NONE)
+    """
+
+    mnemonic: str
+    code: int
+    field: int
+    time: int
+    register: str | None
+    operand: str
+
+
+INSTRUCTION_SET = (
+    # No operation (C 0)
+    Spec("NOP", 0, 0, 1, None, NONE),
+    # Arithmetic operators (C 1-4)
+    Spec("ADD", 1, 5, 2, "A", FIELD),
+    Spec("SUB", 2, 5, 2, "A", FIELD),
+    Spec("MUL", 3, 5, 10, "A", FIELD),
+    Spec("DIV", 4, 5, 12, "A", FIELD),
+    # Conversion operators (C 5)
+    Spec("NUM", 5, 0, 10, None, VARIANT),
+    Spec("CHAR", 5, 1, 10, None, VARIANT),
+    Spec("HLT", 5, 2, 10, None, VARIANT),
+    # Miscellaneous operators (C 6-7)
+    Spec("SLA", 6, 0, 2, None, VARIANT),
+    Spec("SRA", 6, 1, 2, None, VARIANT),
+    Spec("SLAX", 6, 2, 2, None, VARIANT),
+    Spec("SRAX", 6, 3, 2, None, VARIANT),
+    Spec("SLC", 6, 4, 2, None, VARIANT),
+    Spec("SRC", 6, 5, 2, None, VARIANT),
+    Spec("MOVE", 7, 0, 1, None, COUNT),
+    # Loading operators (C 8-23)
+    Spec("LDA", 8, 5, 2, "A", FIELD),
+    Spec("LD1", 9, 5, 2, "1", FIELD),
+    Spec("LD2", 10, 5, 2, "2", FIELD),
+    Spec("LD3", 11, 5, 2, "3", FIELD),
+    Spec("LD4", 12, 5, 2, "4", FIELD),
+    Spec("LD5", 13, 5, 2, "5", FIELD),
+    Spec("LD6", 14, 5, 2, "6", FIELD),
+    Spec("LDX", 15, 5, 2, "X", FIELD),
+    Spec("LDAN", 16, 5, 2, "A", FIELD),
+    Spec("LD1N", 17, 5, 2, "1", FIELD),
+    Spec("LD2N", 18, 5, 2, "2", FIELD),
+    Spec("LD3N", 19, 5, 2, "3", FIELD),
+    Spec("LD4N", 20, 5, 2, "4", FIELD),
+    Spec("LD5N", 21, 5, 2, "5", FIELD),
+    Spec("LD6N", 22, 5, 2, "6", FIELD),
+    Spec("LDXN", 23, 5, 2, "X", FIELD),
+    # Storing operators (C 24-33)
+    Spec("STA", 24, 5, 2, "A", FIELD),
+    Spec("ST1", 25, 5, 2, "1", FIELD),
+    Spec("ST2", 26, 5, 2, "2", FIELD),
+    Spec("ST3", 27, 5, 2, "3", FIELD),
+    Spec("ST4", 28, 5, 2, "4", FIELD),
+    Spec("ST5", 29, 5, 2, "5", FIELD),
+    Spec("ST6", 30, 5, 2, "6", FIELD),
+    Spec("STX", 31, 5, 2, "X", FIELD),
+    Spec("STJ", 32, 2, 2, "J", FIELD),
+    Spec("STZ", 33, 5, 2, None, FIELD),
+    # Input-output operators (C 34-38)
+    Spec("JBUS", 34, 18, 1, None, UNIT),
+    Spec("IOC", 35, 18, 1, None, UNIT),
+    Spec("IN", 36, 18, 1, None, UNIT),
+    Spec("OUT", 37, 18, 1, None, UNIT),
+    Spec("JRED", 38, 18, 1, None, UNIT),
+    # Jump operators (C 39-47)
+    Spec("JMP", 39, 0, 1, None, VARIANT),
+    Spec("JSJ", 39, 1, 1, None, VARIANT),
+    Spec("JOV", 39, 2, 1, None, VARIANT),
+    Spec("JNOV", 39, 3, 1, None, VARIANT),
+    Spec("JL", 39, 4, 1, None, VARIANT),
+    Spec("JE", 39, 5, 1, None, VARIANT),
+    Spec("JG", 39, 6, 1, None, VARIANT),
+    Spec("JGE", 39, 7, 1, None, VARIANT),
+    Spec("JNE", 39, 8, 1, None, VARIANT),
+    Spec("JLE", 39, 9, 1, None, VARIANT),
+    Spec("JAN", 40, 0, 1, "A", VARIANT),
+    Spec("JAZ", 40, 1, 1, "A", VARIANT),
+    Spec("JAP", 40, 2, 1, "A", VARIANT),
+    Spec("JANN", 40, 3, 1, "A", VARIANT),
+    Spec("JANZ", 40, 4, 1, "A", VARIANT),
+    Spec("JANP", 40, 5, 1, "A", VARIANT),
+    Spec("J1N", 41, 0, 1, "1", VARIANT),
+    Spec("J1Z", 41, 1, 1, "1", VARIANT),
+    Spec("J1P", 41, 2, 1, "1", VARIANT),
+    Spec("J1NN", 41, 3, 1, "1", VARIANT),
+    Spec("J1NZ", 41, 4, 1, "1", VARIANT),
+    Spec("J1NP", 41, 5, 1, "1", VARIANT),
+    Spec("J2N", 42, 0, 1, "2", VARIANT),
+    Spec("J2Z", 42, 1, 1, "2", VARIANT),
+    Spec("J2P", 42, 2, 1, "2", VARIANT),
+    Spec("J2NN", 42, 3, 1, "2", VARIANT),
+    Spec("J2NZ", 42, 4, 1, "2", VARIANT),
+    Spec("J2NP", 42, 5, 1, "2", VARIANT),
+    Spec("J3N", 43, 0, 1, "3", VARIANT),
+    Spec("J3Z", 43, 1, 1, "3", VARIANT),
+    Spec("J3P", 43, 2, 1, "3", VARIANT),
+    Spec("J3NN", 43, 3, 1, "3", VARIANT),
+    Spec("J3NZ", 43, 4, 1, "3", VARIANT),
+    Spec("J3NP", 43, 5, 1, "3", VARIANT),
+    Spec("J4N", 44, 0, 1, "4", VARIANT),
+    Spec("J4Z", 44, 1, 1, "4", VARIANT),
+    Spec("J4P", 44, 2, 1, "4", VARIANT),
+    Spec("J4NN", 44, 3, 1, "4", VARIANT),
+    Spec("J4NZ", 44, 4, 1, "4", VARIANT),
+    Spec("J4NP", 44, 5, 1, "4", VARIANT),
+    Spec("J5N", 45, 0, 1, "5", VARIANT),
+    Spec("J5Z", 45, 1, 1, "5", VARIANT),
+    Spec("J5P", 45, 2, 1, "5", VARIANT),
+    Spec("J5NN", 45, 3, 1, "5", VARIANT),
+    Spec("J5NZ", 45, 4, 1, "5", VARIANT),
+    Spec("J5NP", 45, 5, 1, "5", VARIANT),
+    Spec("J6N", 46, 0, 1, "6", VARIANT),
+    Spec("J6Z", 46, 1, 1, "6", VARIANT),
+    Spec("J6P", 46, 2, 1, "6", VARIANT),
+    Spec("J6NN", 46, 3, 1, "6", VARIANT),
+    Spec("J6NZ", 46, 4, 1, "6", VARIANT),
+    Spec("J6NP", 46, 5, 1, "6", VARIANT),
+    Spec("JXN", 47, 0, 1, "X", VARIANT),
+    Spec("JXZ", 47, 1, 1, "X", VARIANT),
+    Spec("JXP", 47, 2, 1, "X", VARIANT),
+    Spec("JXNN", 47, 3, 1, "X", VARIANT),
+    Spec("JXNZ", 47, 4, 1, "X", VARIANT),
+    Spec("JXNP", 47, 5, 1, "X", VARIANT),
+    # Address transfer operators (C 48-55)
+    Spec("INCA", 48, 0, 1, "A", VARIANT),
+    Spec("DECA", 48, 1, 1, "A", VARIANT),
+    Spec("ENTA", 48, 2, 1, "A", VARIANT),
+    Spec("ENNA", 48, 3, 1, "A", VARIANT),
+    Spec("INC1", 49, 0, 1, "1", VARIANT),
+    Spec("DEC1", 49, 1, 1, "1", VARIANT),
+    Spec("ENT1", 49, 2, 1, "1", VARIANT),
+    Spec("ENN1", 49, 3, 1, "1", VARIANT),
+    Spec("INC2", 50, 0, 1, "2", VARIANT),
+    Spec("DEC2", 50, 1, 1, "2", VARIANT),
+    Spec("ENT2", 50, 2, 1, "2", VARIANT),
+    Spec("ENN2", 50, 3, 1, "2", VARIANT),
+    Spec("INC3", 51, 0, 1, "3", VARIANT),
+    Spec("DEC3", 51, 1, 1, "3", VARIANT),
+    Spec("ENT3", 51, 2, 1, "3", VARIANT),
+    Spec("ENN3", 51, 3, 1, "3", VARIANT),
+    Spec("INC4", 52, 0, 1, "4", VARIANT),
+    Spec("DEC4", 52, 1, 1, "4", VARIANT),
+    Spec("ENT4", 52, 2, 1, "4", VARIANT),
+    Spec("ENN4", 52, 3, 1, "4", VARIANT),
+    Spec("INC5", 53, 0, 1, "5", VARIANT),
+    Spec("DEC5", 53, 1, 1, "5", VARIANT),
+    Spec("ENT5", 53, 2, 1, "5", VARIANT),
+    Spec("ENN5", 53, 3, 1, "5", VARIANT),
+    Spec("INC6", 54, 0, 1, "6", VARIANT),
+    Spec("DEC6", 54, 1, 1, "6", VARIANT),
+    Spec("ENT6", 54, 2, 1, "6", VARIANT),
+    Spec("ENN6", 54, 3, 1, "6", VARIANT),
+    Spec("INCX", 55, 0, 1, "X", VARIANT),
+    Spec("DECX", 55, 1, 1, "X", VARIANT),
+    Spec("ENTX", 55, 2, 1, "X", VARIANT),
+    Spec("ENNX", 55, 3, 1, "X", VARIANT),
+    # Comparison operators (C 56-63)
+    Spec("CMPA", 56, 5, 2, "A", FIELD),
+    Spec("CMP1", 57, 5, 2, "1", FIELD),
+    Spec("CMP2", 58, 5, 2, "2", FIELD),
+    Spec("CMP3", 59, 5, 2, "3", FIELD),
+    Spec("CMP4", 60, 5, 2, "4", FIELD),
+    Spec("CMP5", 61, 5, 2, "5", FIELD),
+    Spec("CMP6", 62, 5, 2, "6", FIELD),
+    Spec("CMPX", 63, 5, 2, "X", FIELD),
+)
+
+BY_MNEMONIC = {spec.mnemonic: spec for spec in INSTRUCTION_SET}
+
+
+def _by_code_and_field() -> tuple[Spec | None, ...]:
+    table: list[Spec | None] = [None] * (CODES * CODES)
+    for spec in INSTRUCTION_SET:
+        if spec.operand == VARIANT:
+            table[spec.code * CODES + spec.field] = spec
+        else:
+            # every F is the same instruction, F only modifies what it does
+            for field in range(CODES):
+                table[spec.code * CODES + field] = spec
+
+    return tuple(table)
+
+
+BY_CODE_AND_FIELD = _by_code_and_field()
+
+
+def _times() -> tuple[int, ...]:
+    # how long each (C, F) takes, 0 for those that are not an instruction
+    table = [0] * (CODES * CODES)
+    for i, spec in enumerate(BY_CODE_AND_FIELD):
+        if spec is not None:
+            field = i % CODES
+            table[i] = spec.time + (2 * field if spec.mnemonic == "MOVE" else 0)
+
+    return tuple(table)
+
+
+TIMES = _times()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import json
+from dataclasses import dataclass
+
+from mix_simulator.assembler import Assembler
+from mix_simulator.byte import BYTE_UPPER_LIMIT, Byte, bytes_to_int, int_to_bytes
+from mix_simulator.image import Image
+from mix_simulator.simulator import SimulatorState
+from mix_simulator.word import BYTES_IN_WORD, Word, pack_word, unpack_word
+
+
+@dataclass
+class ObjectModule:
+    """A separately assembled piece of a program, with locations relative to 0.
+
+    words:            the assembled words (packed with pack_word) by location
+    relocations:      locations of words whose address (0:2) is a location
+    word_relocations: locations of words (CON) whose whole value is a location
+    exports:          ENTRY symbols, mapped to their value and whether it is a location
+    externals:        EXTERN symbols, mapped to the words whose address the symbol is
+                      added to
+    start:            the address given to END, if there was one
+    """
+
+    words: dict[int, int]
+    relocations: list[int]
+    word_relocations: list[int]
+    exports: dict[str, tuple[int, bool]]
+    externals: dict[str, list[int]]
+    start: int | None
+
+    @property
+    def length(self) -> int:
+        return max(self.words, default=-1) + 1
+
+    @staticmethod
+    def assemble(mix_file: str) -> ObjectModule:
+        state = SimulatorState.initial_state()
+        assembler = Assembler(mix_file, state, relocatable=True)
+        assembler.parse_program()
+
+        exports = {}
+        for symbol in assembler.entries:
+            if symbol not in assembler.symbol_table:
+                raise ValueError(f"ENTRY {symbol} was never defined.")
+
+            relative = symbol in assembler.relative_symbols
+            exports[symbol] = (assembler.symbol_table[symbol], relative)
+
+        return ObjectModule(
+            words={i: pack_word(state.memory[i]) for i in assembler.assembled},
+            relocations=assembler.relocations,
+            word_relocations=assembler.word_relocations,
+            exports=exports,
+            externals={s: assembler.fixups[s] for s in assembler.externals},
+            start=assembler.entry_point,
+        )
+
+    @staticmethod
+    def read(filename: str) -> ObjectModule:
+        with open(filename, "r") as f:
+            data = json.load(f)
+
+        return ObjectModule(
+            # json object keys are always strings
+            words={int(loc): packed for loc, packed in data["words"].items()},
+            relocations=data["relocations"],
+            word_relocations=data["word_relocations"],
+            exports={s: (v, r) for s, (v, r) in data["exports"].items()},
+            externals=data["externals"],
+            start=data["start"],
+        )
+
+    def write(self, filename: str) -> None:
+        with open(filename, "w") as f:
+            json.dump(
+                {
+                    "words": self.words,
+                    "relocations": self.relocations,
+                    "word_relocations": self.word_relocations,
+                    "exports": self.exports,
+                    "externals": self.externals,
+                    "start": self.start,
+                },
+                f,
+            )
+
+
+def link(modules: list[ObjectModule], origin: int = 0) -> Image:
+    """Combine object modules into one executable image.
+
+    The modules are placed one after another starting at origin, and the program
+    starts at the END address of the first module that has one.
+    """
+    bases = []
+    base = origin
+    for module in modules:
+        bases.append(base)
+        base += module.length
+
+    # resolve every exported symbol to its final value
+    symbols: dict[str, int] = {}
+    for module, base in zip(modules, bases):
+        for symbol, (value, relative) in module.exports.items():
+            if symbol in symbols:
+                raise ValueError(f"{symbol} is exported by more than one module.")
+            symbols[symbol] = value + base if relative else value
+
+    words: dict[int, int] = {}
+    start = None
+    for module, base in zip(modules, bases):
+        cells = {loc: unpack_word(packed) for loc, packed in module.words.items()}
+
+        for loc in module.relocations:
+            word = cells[loc]
+            address = bytes_to_int((word.b1, word.b2), word.sign)
+            _set_address(word, address + base)
+
+        for loc in module.word_relocations:
+            word = cells[loc]
+            value = bytes_to_int(
+                (word.b1, word.b2, word.b3, word.b4, word.b5), word.sign
+            )
+            sign, bs = int_to_bytes(value + base, padding=BYTES_IN_WORD)
+            cells[loc] = Word(sign, *reversed(bs))
+
+        for symbol, locs in module.externals.items():
+            if symbol not in symbols:
+                raise ValueError(f"{symbol} is not exported by any module.")
+            for loc in locs:
+                # the address holds what the symbol is offset by, if anything
+                word = cells[loc]
+                offset = bytes_to_int((word.b1, word.b2), word.sign)
+                _set_address(word, symbols[symbol] + offset)
+
+        for loc, word in cells.items():
+            words[loc + base] = pack_word(word)
+
+        if start is None and module.start is not None:
+            start = module.start + base
+
+    if start is None:
+        raise ValueError("None of the modules has an END address to start from.")
+
+    return Image(words, start)
+
+
+def _set_address(word: Word, address: int) -> None:
+    ahi, alo = divmod(abs(address), BYTE_UPPER_LIMIT)
+    word.sign = address < 0
+    word.b1 = Byte(ahi)
+    word.b2 = Byte(alo)
@@ -0,0 +1,75 @@
+"""Generate load on a running "mixsim serve --socket PATH" and report its throughput.
+
+python -m mix_simulator.load PATH program.mix [--cards FILE] [--clients N]
+    [--requests N]
+"""
+
+from __future__ import annotations
+import json
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+
+from mix_simulator.service import Client
+
+
+def load(
+    path: str, source: str, cards: list[str], clients: int, requests: int
+) -> dict[str, object]:
+    """Have clients connections each register source and run it requests times, and
+    return the runs per second and the latency percentiles in ms."""
+
+    def client() -> list[float]:
+        connection = Client.connect(path)
+        try:
+            program = connection.register(source)
+            latencies = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                run = connection.run(program, cards)
+                latencies.append(time.perf_counter() - start)
+                if run.status != "ok":
+                    raise RuntimeError(f"The run failed with {run.error}")
+            return latencies
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        futures = [pool.submit(client) for _ in range(clients)]
+        latencies = [latency for future in futures for latency in future.result()]
+    seconds = time.perf_counter() - start
+
+    percentiles = quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "runs": len(latencies),
+        "seconds": seconds,
+        "runs_per_second": len(latencies) / seconds,
+        "latency_ms": {f"p{p}": percentiles[p - 1] * 1000 for p in (50, 90, 99)},
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = ArgumentParser(prog="python -m mix_simulator.load")
+    parser.add_argument("path", type=str, help="the socket of the service")
+    parser.add_argument("program", type=str, help="the MIXAL program to run")
+    parser.add_argument("--cards", type=str, help="file of cards to run it with")
+    parser.add_argument("--clients", type=int, default=4, help="default: 4")
+    parser.add_argument(
+        "--requests", type=int, default=1000, help="runs per client (default: 1000)"
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.program) as f:
+        source = f.read()
+    cards = []
+    if args.cards is not None:
+        with open(args.cards) as f:
+            cards = f.read().splitlines()
+
+    print(json.dumps(load(args.path, source, cards, args.clients, args.requests)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,597 @@
+from __future__ import annotations
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+
+import numpy as np
+from numpy.typing import NDArray
+
+from mix_simulator.batch import digest_devices
+from mix_simulator.comparison_indicator import ComparisonIndicator
+from mix_simulator.image import Image
+from mix_simulator.instruction_set import CODES, TIMES
+from mix_simulator.opcode import OpCode
+from mix_simulator.register import IndexRegister, WordRegister
+from mix_simulator.simulator import SimulatorState
+from mix_simulator.sink import DEFAULT_ALGORITHM
+from mix_simulator.sweep import Patch, RunResult, _to_bytes
+from mix_simulator.word import BYTES_IN_WORD, WORD_SIGN_BIT, unpack_word
+
+WORDS = 4000
+# how many patches a Lockstep runs at once in lockstep_sweep
+DEFAULT_LANES = 1024
+
+# the rows of the register arrays, in the order of the C codes of LDA to LDX
+ROWS = {"A": 0, "I1": 1, "I2": 2, "I3": 3, "I4": 4, "I5": 5, "I6": 6, "X": 7, "J": 8}
+A, I1, X, J = ROWS["A"], ROWS["I1"], ROWS["X"], ROWS["J"]
+# how many bytes each row holds
+WIDTHS = (5, 2, 2, 2, 2, 2, 2, 5, 2)
+
+WORD_MASK = (1 << 30) - 1
+DOUBLE_MASK = (1 << 60) - 1
+INDEX_LIMIT = 1 << 12
+
+# the comparison indicator is kept as -1, 0 or 1
+LESS, EQUAL, GREATER = -1, 0, 1
+INDICATORS = {
+    LESS: ComparisonIndicator.LESS,
+    EQUAL: ComparisonIndicator.EQUAL,
+    GREATER: ComparisonIndicator.GREATER,
+}
+
+Lanes = NDArray[np.intp]
+Values = NDArray[np.int64]
+Signs = NDArray[np.bool_]
+
+
+class Lockstep:
+    """Many machines (lanes) running one program, each from its own initial state.
+
+    Memory is a (lanes, 4000) array of magnitudes and one of signs, and the registers
+    are (9, lanes) arrays, so an instruction is executed for all the lanes at its
+    location with a handful of vectorized operations. When lanes branch apart, the
+    group with the lowest program counter runs first, which lets groups that took
+    different ways around a piece of code catch up with each other again. Lanes whose
+    copy of an instruction was changed by the program are split off into a group of
+    their own.
+
+    Execution matches Simulator for everything but I/O: a lane that reaches IN, OUT,
+    IOC, JBUS or JRED stops with an error, as does a lane that would raise one in the
+    simulator. Negative addresses are an error too, rather than counting back from the
+    end of memory.
+    """
+
+    lanes: int
+    sign: Signs
+    magnitude: NDArray[np.int32]
+    register_sign: Signs
+    register: Values
+    overflow: Signs
+    comparison: NDArray[np.int8]
+    program_counter: Values
+    clock: Values
+    instructions: Values
+    running: Signs
+    errors: list[str | None]
+
+    def __init__(self, image: Image, patches: Sequence[Patch]) -> None:
+        lanes = self.lanes = len(patches)
+        self.sign = np.zeros((lanes, WORDS), np.bool_)
+        self.magnitude = np.zeros((lanes, WORDS), np.int32)
+        for loc, packed in image.words.items():
+            self.sign[:, loc] = bool(packed & WORD_SIGN_BIT)
+            self.magnitude[:, loc] = packed & WORD_MASK
+
+        self.register_sign = np.zeros((len(ROWS), lanes), np.bool_)
+        self.register = np.zeros((len(ROWS), lanes), np.int64)
+        self.overflow = np.zeros(lanes, np.bool_)
+        self.comparison = np.full(lanes, LESS, np.int8)
+        self.program_counter = np.full(lanes, image.start, np.int64)
+        self.clock = np.zeros(lanes, np.int64)
+        self.instructions = np.zeros(lanes, np.int64)
+        self.running = np.ones(lanes, np.bool_)
+        self.errors = [None] * lanes
+
+        for lane, patch in enumerate(patches):
+            try:
+                self._apply(lane, patch)
+            except ValueError as e:
+                self._fail(np.array([lane]), f"ValueError: {e}")
+
+    def run(self) -> list[RunResult]:
+        """Run every lane until it halts or fails, returning the results by lane."""
+        while True:
+            active = np.flatnonzero(self.running)
+            if not len(active):
+                break
+
+            counters = self.program_counter[active]
+            location = int(counters.min())
+            self._step(active[counters == location], location)
+
+        return [self.result(lane) for lane in range(self.lanes)]
+
+    def result(self, lane: int) -> RunResult:
+        error = self.errors[lane]
+        return RunResult(
+            "ok" if error is None else "error",
+            int(self.instructions[lane]),
+            int(self.clock[lane]),
+            error=error,
+        )
+
+    def state(self, lane: int) -> SimulatorState:
+        """The state of a lane as that of a simulator, with the standard devices."""
+        state = SimulatorState.initial_state()
+        for loc in np.flatnonzero(self.magnitude[lane] | self.sign[lane]):
+            packed = int(self.magnitude[lane, loc])
+            if self.sign[lane, loc]:
+                packed |= WORD_SIGN_BIT
+            state.memory[int(loc)] = unpack_word(packed)
+
+        for name, row in ROWS.items():
+            word = unpack_word(int(self.register[row, lane]))
+            sign = bool(self.register_sign[row, lane])
+            # registers are updated with their bytes in little endian order
+            bs = (word.b5, word.b4, word.b3, word.b2, word.b1)
+            register = getattr(state, f"r{name}")
+            if isinstance(register, WordRegister):
+                register.update(sign, *bs)
+            elif isinstance(register, IndexRegister):
+                register.update(sign, *bs[:2])
+            else:
+                register.update(*bs[:2])
+
+        state.overflow = bool(self.overflow[lane])
+        state.comparison_indicator = INDICATORS[int(self.comparison[lane])]
+        state.program_counter = int(self.program_counter[lane])
+        state.clock = int(self.clock[lane])
+        state.instructions = int(self.instructions[lane])
+        return state
+
+    def _apply(self, lane: int, patch: Patch) -> None:
+        """The same changes as Machine._apply, to a single lane."""
+        for loc, value in patch.memory.items():
+            if not 0 <= loc < WORDS:
+                raise ValueError(f"{loc} is not a memory location")
+            _to_bytes(value, BYTES_IN_WORD)
+            self.sign[lane, loc] = value < 0
+            self.magnitude[lane, loc] = abs(value)
+
+        for name, value in patch.registers.items():
+            if name not in ROWS:
+                raise ValueError(f"{name} is not a register, use one of {tuple(ROWS)}")
+            row = ROWS[name]
+            sign, _ = _to_bytes(value, WIDTHS[row])
+            if row == J and sign:
+                raise ValueError("J can not be negative")
+            self.register_sign[row, lane] = sign
+            self.register[row, lane] = abs(value)
+
+    def _fail(self, lanes: Lanes, error: str) -> None:
+        self.running[lanes] = False
+        for lane in lanes:
+            self.errors[lane] = error
+
+    def _step(self, lanes: Lanes, location: int) -> None:
+        """Execute the instruction at location for lanes, which are all there."""
+        if not 0 <= location < WORDS:
+            self._fail(lanes, _memory_error(location))
+            return
+
+        sign = self.sign[lanes, location]
+        magnitude = self.magnitude[lanes, location]
+        # the rest of the lanes get their turn at the next step
+        lanes = lanes[(sign == sign[0]) & (magnitude == magnitude[0])]
+
+        word = int(magnitude[0])
+        address = -(word >> 18) if sign[0] else word >> 18
+        index = (word >> 12) & 63
+        field = (word >> 6) & 63
+        opcode = word & 63
+
+        self.program_counter[lanes] = location + 1
+        if opcode == OpCode.CONV and field == 2:
+            # HLT
+            self.running[lanes] = False
+        else:
+            self._execute(lanes, address, index, field, opcode)
+            lanes = lanes[self.running[lanes]]
+
+        self.clock[lanes] += TIMES[opcode * CODES + field]
+        self.instructions[lanes] += 1
+
+    def _execute(
+        self, lanes: Lanes, address: int, index: int, field: int, opcode: int
+    ) -> None:
+        if opcode == OpCode.NOP:
+            return
+
+        if OpCode.JBUS <= opcode <= OpCode.JRED:
+            self._fail(lanes, f"ValueError: {OpCode(opcode).name} is not supported")
+        elif opcode == OpCode.JMP:
+            self._jump(lanes, address, index, field)
+        elif OpCode.JA <= opcode <= OpCode.JX:
+            self._jump_register(lanes, address, index, field, opcode - OpCode.JA)
+        elif OpCode.ATA <= opcode <= OpCode.ATX:
+            self._address_transfer(lanes, address, index, field, opcode - OpCode.ATA)
+        elif OpCode.CMPA <= opcode <= OpCode.CMPX:
+            self._compare(lanes, address, index, field, opcode - OpCode.CMPA)
+        elif opcode == OpCode.SH:
+            self._shift(lanes, address, index, field)
+        elif opcode == OpCode.MOVE:
+            self._move(lanes, address, index, field)
+        elif opcode == OpCode.CONV:
+            self._convert(lanes, field)
+        else:
+            # everything else reads or writes the word at M
+            m = self._address(lanes, address, index)
+            if m is None:
+                return
+            lanes, m = self._cells(lanes, m)
+            if OpCode.ADD <= opcode <= OpCode.DIV:
+                self._arithmetic(lanes, m, field, opcode)
+            elif OpCode.LDA <= opcode <= OpCode.LDXN:
+                row = (opcode - OpCode.LDA) % 8
+                self._load(lanes, m, field, row, opcode >= OpCode.LDAN)
+            else:
+                self._store(lanes, m, field, opcode)
+
+    def _address(self, lanes: Lanes, address: int, index: int) -> Values | None:
+        """M for each of lanes, or None if the index is not 0-6, failing the lanes."""
+        if index == 0:
+            return np.full(len(lanes), address, np.int64)
+        if index > 6:
+            self._fail(
+                lanes, f"ValueError: Index must be value in range 0-6. Got {index}"
+            )
+            return None
+
+        return address + self._value(index, lanes)
+
+    def _cells(self, lanes: Lanes, m: Values) -> tuple[Lanes, Values]:
+        """The lanes whose M is in memory with their M, failing the others."""
+        ok = (m >= 0) & (m < WORDS)
+        for lane, cell in zip(lanes[~ok], m[~ok]):
+            self._fail(np.array([lane]), _memory_error(int(cell)))
+
+        return lanes[ok], m[ok]
+
+    def _value(self, row: int, lanes: Lanes) -> Values:
+        """The signed value of a register."""
+        value = self.register[row, lanes]
+        return np.where(self.register_sign[row, lanes], -value, value)
+
+    def _set(self, row: int, lanes: Lanes, sign: Signs, value: Values) -> None:
+        self.register_sign[row, lanes] = sign
+        self.register[row, lanes] = value
+
+    def _memory_field(
+        self, lanes: Lanes, m: Values, field: int
+    ) -> tuple[Signs, Values]:
+        """The sign and magnitude of the field (L:R) of the words at M."""
+        return _field(self.sign[lanes, m], self.magnitude[lanes, m], field)
+
+    def _load(
+        self, lanes: Lanes, m: Values, field: int, row: int, negative: bool
+    ) -> None:
+        sign, value = self._memory_field(lanes, m, field)
+        if I1 <= row < X:
+            bad = value >= INDEX_LIMIT
+            if bad.any():
+                self._fail(
+                    lanes[bad],
+                    "ValueError: The LDi instruction is undefined if it would result "
+                    "in setting bytes 1, 2 or 3 to anything but zero.",
+                )
+                lanes, sign, value = lanes[~bad], sign[~bad], value[~bad]
+
+        self._set(row, lanes, ~sign if negative else sign, value)
+
+    def _store(self, lanes: Lanes, m: Values, field: int, opcode: int) -> None:
+        lo, hi = divmod(field, 8)
+        if hi > BYTES_IN_WORD:
+            self._fail(lanes, f"ValueError: {field} is not a valid field to store to")
+            return
+
+        if opcode == OpCode.STZ:
+            sign = np.zeros(len(lanes), np.bool_)
+            value = np.zeros(len(lanes), np.int64)
+        else:
+            row = J if opcode == OpCode.STJ else opcode - OpCode.STA
+            sign = self.register_sign[row, lanes]
+            value = self.register[row, lanes]
+
+        first = max(lo, 1)
+        if hi >= first:
+            # the low bytes of the register go to bytes L-R of the word
+            shift = 6 * (BYTES_IN_WORD - hi)
+            mask = ((1 << (6 * (hi - first + 1))) - 1) << shift
+            magnitude = self.magnitude[lanes, m].astype(np.int64)
+            self.magnitude[lanes, m] = (magnitude & ~mask) | ((value << shift) & mask)
+        if lo == 0:
+            self.sign[lanes, m] = sign
+
+    def _arithmetic(self, lanes: Lanes, m: Values, field: int, opcode: int) -> None:
+        sign, value = self._memory_field(lanes, m, field)
+        v = np.where(sign, -value, value)
+        a = self._value(A, lanes)
+
+        if opcode == OpCode.ADD or opcode == OpCode.SUB:
+            result = a + v if opcode == OpCode.ADD else a - v
+            self.overflow[lanes[np.abs(result) > WORD_MASK]] = True
+            self._set(A, lanes, result < 0, np.abs(result) & WORD_MASK)
+        elif opcode == OpCode.MUL:
+            product = a * v
+            magnitude = np.abs(product)
+            # A gets the high bytes and X the low bytes
+            self._set(A, lanes, product < 0, magnitude >> 30)
+            self._set(X, lanes, product < 0, magnitude & WORD_MASK)
+        else:
+            zero = v == 0
+            if zero.any():
+                self._fail(
+                    lanes[zero], "ZeroDivisionError: integer division or modulo by zero"
+                )
+                lanes, sign, v, a = lanes[~zero], sign[~zero], v[~zero], a[~zero]
+
+            ax = (self.register[A, lanes] << 30) + self.register[X, lanes]
+            ax = np.where(a < 0, -ax, ax)
+            quotient = np.abs(np.floor_divide(ax, v))
+            remainder = np.abs(np.mod(ax, v))
+            sign = sign != self.register_sign[A, lanes]
+
+            self.overflow[lanes[quotient > WORD_MASK]] = True
+            self._set(A, lanes, sign, quotient & WORD_MASK)
+            self._set(X, lanes, sign, remainder)
+
+    def _address_transfer(
+        self, lanes: Lanes, address: int, index: int, field: int, row: int
+    ) -> None:
+        if field > 3:
+            self._fail(
+                lanes,
+                f"ValueError: {field} is not a valid op variant for an address "
+                "transfer operator.",
+            )
+            return
+
+        m = self._address(lanes, address, index)
+        if m is None:
+            return
+
+        limit = 1 << (6 * WIDTHS[row])
+        if field >= 2:
+            # ENT and ENN
+            magnitude = np.abs(m)
+            bad = magnitude >= limit
+            if bad.any():
+                self._fail(lanes[bad], "ValueError: M does not fit in the register")
+                lanes, m, magnitude = lanes[~bad], m[~bad], magnitude[~bad]
+            self._set(row, lanes, (m < 0) != (field == 3), magnitude)
+        else:
+            # INC and DEC
+            result = self._value(row, lanes) + (m if field == 0 else -m)
+            magnitude = np.abs(result)
+            self.overflow[lanes[magnitude >= limit]] = True
+            self._set(row, lanes, result < 0, magnitude & (limit - 1))
+
+    def _compare(
+        self, lanes: Lanes, address: int, index: int, field: int, row: int
+    ) -> None:
+        # an equal comparison always occurs when F is (0:0)
+        if field == 0:
+            self.comparison[lanes] = EQUAL
+            return
+
+        m = self._address(lanes, address, index)
+        if m is None:
+            return
+
+        lanes, m = self._cells(lanes, m)
+        sign, value = _field(
+            self.register_sign[row, lanes], self.register[row, lanes], field
+        )
+        left = np.where(sign, -value, value)
+        sign, value = self._memory_field(lanes, m, field)
+        right = np.where(sign, -value, value)
+        self.comparison[lanes] = np.sign(left - right)
+
+    def _jump_to(self, lanes: Lanes, address: int, index: int, save: bool) -> None:
+        m = self._address(lanes, address, index)
+        if m is None:
+            return
+
+        if save:
+            # the program counter already holds the location of the next instruction
+            positive = np.zeros(len(lanes), np.bool_)
+            self._set(J, lanes, positive, self.program_counter[lanes])
+        self.program_counter[lanes] = m
+
+    def _jump(self, lanes: Lanes, address: int, index: int, field: int) -> None:
+        comparison = self.comparison[lanes]
+        overflow = self.overflow[lanes]
+        match field:
+            case 0 | 1:
+                jump = np.ones(len(lanes), np.bool_)
+            case 2 | 3:
+                # JOV and JNOV both leave the overflow toggle off
+                jump = overflow if field == 2 else ~overflow
+                self.overflow[lanes] = False
+            case 4:
+                jump = comparison == LESS
+            case 5:
+                jump = comparison == EQUAL
+            case 6:
+                jump = comparison == GREATER
+            case 7:
+                jump = comparison != LESS
+            case 8:
+                jump = comparison != EQUAL
+            case 9:
+                jump = comparison != GREATER
+            case _:
+                return
+
+        # JSJ does not update J
+        self._jump_to(lanes[jump], address, index, field != 1)
+
+    def _jump_register(
+        self, lanes: Lanes, address: int, index: int, field: int, row: int
+    ) -> None:
+        value = self._value(row, lanes)
+        match field:
+            case 0:
+                jump = value < 0
+            case 1:
+                jump = value == 0
+            case 2:
+                jump = value > 0
+            case 3:
+                jump = value >= 0
+            case 4:
+                jump = value != 0
+            case 5:
+                jump = value <= 0
+            case _:
+                return
+
+        self._jump_to(lanes[jump], address, index, True)
+
+    def _shift(self, lanes: Lanes, address: int, index: int, field: int) -> None:
+        m = self._address(lanes, address, index)
+        if m is None:
+            return
+
+        negative = m < 0
+        for lane, amount in zip(lanes[negative], m[negative]):
+            self._fail(
+                np.array([lane]),
+                f"ValueError: Cannot shift by a negative amount ({amount})",
+            )
+        lanes, m = lanes[~negative], m[~negative]
+
+        # the signs of A and X stay as they are, so only the magnitudes are shifted
+        a = self.register[A, lanes].astype(np.uint64)
+        if field == 0 or field == 1:
+            bits = (6 * np.minimum(m, 5)).astype(np.uint64)
+            a = (a << bits) & WORD_MASK if field == 0 else a >> bits
+            self.register[A, lanes] = a
+            return
+        if field > 5:
+            return
+
+        ax = (a << np.uint64(30)) | self.register[X, lanes].astype(np.uint64)
+        if field == 2 or field == 3:
+            bits = (6 * np.minimum(m, 10)).astype(np.uint64)
+            ax = (ax << bits) & DOUBLE_MASK if field == 2 else ax >> bits
+        else:
+            # SLC and SRC rotate AX, a right rotation being a left one the other way
+            bits = (6 * (m % 10)).astype(np.uint64)
+            if field == 5:
+                bits = (np.uint64(60) - bits) % np.uint64(60)
+            ax = ((ax << bits) | (ax >> (np.uint64(60) - bits))) & DOUBLE_MASK
+
+        self.register[A, lanes] = ax >> np.uint64(30)
+        self.register[X, lanes] = ax & WORD_MASK
+
+    def _convert(self, lanes: Lanes, field: int) -> None:
+        a = self.register[A, lanes]
+        if field == 0:
+            # NUM, from the last digit of each byte of AX
+            number = np.zeros(len(lanes), np.int64)
+            for register in (a, self.register[X, lanes]):
+                for shift in range(24, -1, -6):
+                    number = number * 10 + ((register >> shift) & 63) % 10
+            self.register[A, lanes] = number & WORD_MASK
+        elif field == 1:
+            # CHAR, the character code of each digit d being 30 + d
+            codes = np.zeros((2, len(lanes)), np.int64)
+            for digit in range(10):
+                code = 30 + (a // 10 ** (9 - digit)) % 10
+                codes[digit // 5] = (codes[digit // 5] << 6) | code
+            self.register[A, lanes] = codes[0]
+            self.register[X, lanes] = codes[1]
+
+    def _move(self, lanes: Lanes, address: int, index: int, field: int) -> None:
+        # if F = 0, nothing happens
+        if field == 0:
+            return
+
+        m = self._address(lanes, address, index)
+        if m is None:
+            return
+
+        # the words are moved from M to the address in rI1
+        target = self._value(I1, lanes)
+        moving = m != target
+        source: Values = m[moving]
+        lanes, target = lanes[moving], target[moving]
+
+        ok = (np.minimum(source, target) >= 0) & (
+            np.maximum(source, target) + field <= WORDS
+        )
+        for lane, start, end in zip(lanes[~ok], source[~ok], target[~ok]):
+            self._fail(
+                np.array([lane]),
+                f"IndexError: Moving {field} words from {start} to {end} is outside "
+                "of memory",
+            )
+        lanes, source, target = lanes[ok], source[ok], target[ok]
+
+        rows = lanes[:, None]
+        offsets = np.arange(field)
+        sources = source[:, None] + offsets
+        targets = target[:, None] + offsets
+        # every word is read before any is written, which copies overlapping ranges
+        # the same way as the simulator (that copies in the safe direction)
+        sign, magnitude = self.sign[rows, sources], self.magnitude[rows, sources]
+        self.sign[rows, targets] = sign
+        self.magnitude[rows, targets] = magnitude
+
+
+def _field(
+    sign: Signs, magnitude: NDArray[np.integer], field: int
+) -> tuple[Signs, Values]:
+    """The sign and magnitude of the field (L:R) of words (or registers)."""
+    lo, hi = divmod(field, 8)
+    first = max(lo, 1)
+    hi = min(hi, BYTES_IN_WORD)
+    if hi < first:
+        value = np.zeros(len(magnitude), np.int64)
+    else:
+        bits = 6 * (hi - first + 1)
+        value = (magnitude.astype(np.int64) >> (6 * (BYTES_IN_WORD - hi))) & (
+            (1 << bits) - 1
+        )
+
+    return (sign if lo == 0 else np.zeros_like(sign)), value
+
+
+def _memory_error(cell: int) -> str:
+    if cell < 0:
+        return f"IndexError: Index {cell} is not a memory index"
+    return f"IndexError: Index {cell} is larger than max memory index {WORDS - 1}"
+
+
+def lockstep_sweep(
+    image: Image,
+    patches: Iterable[Patch],
+    lanes: int = DEFAULT_LANES,
+    algorithm: str = DEFAULT_ALGORITHM,
+) -> Iterator[RunResult]:
+    """Run image once for every patch, on a Lockstep of (up to) lanes patches at a time,
+    yielding the results in the order of the patches.
+
+    The runs that reach HLT report the digests of the (empty) output of the same units
+    as sweep does, so that the results of both can be compared.
+    """
+    devices = digest_devices(algorithm)
+    digests = devices.digests(algorithm)
+    devices.close()
+
+    patches = iter(patches)
+    while group := list(islice(patches, lanes)):
+        for result in Lockstep(image, group).run():
+            if result.status == "ok":
+                result.digests = dict(digests)
+            yield result
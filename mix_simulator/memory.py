@@ -3,10 +3,18 @@ from mix_simulator.word import Word
 
 
 class Memory:
-    """4000 (default) words of storage, each word with five bytes and a sign."""
+    """4000 (default) words of storage, each word with five bytes and a sign.
+
+    When dirty is a set, the cells that are assigned (or written by a block) are added
+    to it, so that they can be reset later. Instructions that change a word in place
+    assign it back to its cell for this reason.
+    """
+
+    dirty: set[int] | None
 
     def __init__(self, words: int = 4000) -> None:
         self.words = words
+        self.dirty = None
         self.cells = [
             Word(sign=False, b1=Byte(0), b2=Byte(0), b3=Byte(0), b4=Byte(0), b5=Byte(0))
             for _ in range(words)
@@ -15,7 +23,7 @@ class Memory:
     def __getitem__(self, cell: int) -> Word:
         if cell >= self.words:
             raise IndexError(
-                f"Index {cell} is larger than max memory index {self.words-1}"
+                f"Index {cell} is larger than max memory index {self.words - 1}"
             )
 
         return self.cells[cell]
@@ -23,7 +31,29 @@ class Memory:
     def __setitem__(self, cell: int, word: Word) -> None:
         if cell >= self.words:
             raise IndexError(
-                f"Index {cell} is larger than max memory index {self.words-1}"
+                f"Index {cell} is larger than max memory index {self.words - 1}"
             )
 
         self.cells[cell] = word
+        if self.dirty is not None:
+            self.dirty.add(cell)
+
+    def read_block(self, start: int, count: int) -> list[Word]:
+        """The words in cells start to start + count - 1, in a single slice."""
+        if start < 0 or start + count > self.words:
+            raise IndexError(
+                f"Block {start}-{start + count - 1} is outside of memory (0-{self.words - 1})"
+            )
+
+        return self.cells[start : start + count]
+
+    def write_block(self, start: int, words: list[Word]) -> None:
+        """Replace the cells from start onwards with words, in a single slice."""
+        if start < 0 or start + len(words) > self.words:
+            raise IndexError(
+                f"Block {start}-{start + len(words) - 1} is outside of memory (0-{self.words - 1})"
+            )
+
+        self.cells[start : start + len(words)] = words
+        if self.dirty is not None:
+            self.dirty.update(range(start, start + len(words)))
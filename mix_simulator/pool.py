@@ -0,0 +1,138 @@
+from __future__ import annotations
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from mix_simulator.batch import Job, Quota, Result, program_image
+from mix_simulator.card import CardReader
+from mix_simulator.devices import CARD_READER
+from mix_simulator.sink import DEFAULT_ALGORITHM
+from mix_simulator.sweep import Machine, Patch, RunResult
+
+# how many instructions a job of priority 1 executes before the next job gets a turn
+DEFAULT_QUANTUM = 1000
+# how many jobs run at once
+DEFAULT_SLOTS = 64
+
+
+@dataclass
+class _Entry:
+    job: Job
+    priority: int
+    quota: Quota
+    machine: Machine | None = None
+
+
+class MachinePool:
+    """Runs many jobs in one process, on up to slots machines at a time.
+
+    The jobs that are running take turns, round robin, each executing quantum
+    instructions times its priority in a turn, so that no job holds up the others for
+    long. A job that goes over its quota fails with QuotaExceeded. Machines are kept
+    when their job is done and loaded with the image of the next job, which only
+    resets the memory cells that either image or the last run touched.
+    """
+
+    slots: int
+    quantum: int
+    algorithm: str
+    waiting: deque[_Entry]
+    # the machines that are free
+    machines: list[Machine]
+
+    def __init__(
+        self,
+        slots: int = DEFAULT_SLOTS,
+        quantum: int = DEFAULT_QUANTUM,
+        algorithm: str = DEFAULT_ALGORITHM,
+    ) -> None:
+        self.slots = slots
+        self.quantum = quantum
+        self.algorithm = algorithm
+        self.waiting = deque()
+        self.machines = []
+
+    def submit(self, job: Job, priority: int = 1, quota: Quota | None = None) -> None:
+        """Queue a job to run once there is a free slot."""
+        if priority < 1:
+            raise ValueError(f"Priority must be at least 1. Got {priority}")
+
+        self.waiting.append(_Entry(job, priority, Quota() if quota is None else quota))
+
+    def run(self) -> Iterator[Result]:
+        """Run the jobs that were submitted, yielding their results as they finish."""
+        running: deque[_Entry] = deque()
+        while self.waiting or running:
+            while self.waiting and len(running) < self.slots:
+                entry = self.waiting.popleft()
+                failed = self._start(entry)
+                if failed is None:
+                    running.append(entry)
+                else:
+                    yield self._finish(entry, failed)
+            if not running:
+                # the last jobs all failed to start
+                continue
+
+            entry = running.popleft()
+            result = self._turn(entry)
+            if result is None:
+                running.append(entry)
+            else:
+                yield result
+
+    def _start(self, entry: _Entry) -> RunResult | None:
+        """Load the job onto a free machine, or return why it could not be."""
+        job = entry.job
+        try:
+            image = program_image(job.program)
+        except Exception as e:
+            return RunResult("error", 0, 0, error=f"{type(e).__name__}: {e}")
+
+        if self.machines:
+            machine = self.machines.pop()
+            machine.load(image)
+        else:
+            machine = Machine(image, self.algorithm)
+        entry.machine = machine
+
+        machine.start(Patch())
+        if job.cards is not None:
+            try:
+                reader = CardReader(open(job.cards))
+            except Exception as e:
+                return machine.result(e)
+            machine.simulator.state.devices[CARD_READER] = reader
+
+        return None
+
+    def _turn(self, entry: _Entry) -> Result | None:
+        """Run a job for a turn, returning its result if it is done."""
+        machine = entry.machine
+        assert machine is not None
+        state = machine.simulator.state
+        quota = entry.quota
+
+        limit = quota.limit(state, self.quantum * entry.priority)
+        try:
+            if not machine.simulator.run_slice(limit):
+                quota.check(state)
+                return None
+            state.devices.flush()
+            run = machine.result()
+        except Exception as e:
+            run = machine.result(e)
+
+        return self._finish(entry, run)
+
+    def _finish(self, entry: _Entry, run: RunResult) -> Result:
+        """Free the machine of the job and return its result."""
+        machine = entry.machine
+        if machine is not None:
+            entry.machine = None
+            try:
+                machine.simulator.state.devices.close()
+            finally:
+                self.machines.append(machine)
+
+        return Result.of(entry.job, run)
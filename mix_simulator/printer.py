@@ -0,0 +1,44 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+from mix_simulator.device import CharacterDevice
+from mix_simulator.sink import Sink
+
+if TYPE_CHECKING:
+    from mix_simulator.simulator import SimulatorState
+
+
+class LinePrinter(CharacterDevice):
+    """The line printer (unit 18), which prints 24 words (120 characters) per line.
+
+    Each line is translated in one go and written to a buffered sink. The sink is
+    flushed at HLT, and its output is submitted when the printer is told to skip to the
+    next page (IOC 0).
+    """
+
+    BLOCK_SIZE = 24
+    OUTPUT = True
+
+    lines_on_page: int
+
+    def __init__(self, sink: Sink | None = None) -> None:
+        super().__init__(sink=sink)
+        self.lines_on_page = 0
+
+    def write(self, state: SimulatorState, address: int) -> None:
+        super().write(state, address)
+        self.lines_on_page += 1
+
+    def control(self, state: SimulatorState, m: int) -> None:
+        # skip to the top of the next page, unless we are already there
+        if m != 0:
+            super().control(state, m)
+
+        if self.lines_on_page:
+            self.sink.write("\f")
+            self.lines_on_page = 0
+        self.sink.submit()
+
+    def reset(self) -> None:
+        super().reset()
+        self.lines_on_page = 0
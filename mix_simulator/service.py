@@ -0,0 +1,338 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import socket
+import sys
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict
+from functools import partial
+from typing import Any, TextIO
+
+from mix_simulator.assembler import Assembler
+from mix_simulator.batch import Quota
+from mix_simulator.card import CardReader
+from mix_simulator.devices import CARD_READER
+from mix_simulator.image import Image
+from mix_simulator.pool import DEFAULT_QUANTUM
+from mix_simulator.simulator import SimulatorState
+from mix_simulator.sink import DEFAULT_ALGORITHM
+from mix_simulator.sweep import Machine, Patch, RunResult
+
+# how many programs the service keeps
+DEFAULT_PROGRAMS = 256
+# how many machines each worker process keeps loaded
+WORKER_MACHINES = 16
+
+# JSON-RPC 2.0 error codes, and one of our own for a program that is not registered
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UNKNOWN_PROGRAM = -32001
+
+
+class ServiceError(Exception):
+    """A JSON-RPC error, with its code."""
+
+    code: int
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def assemble(source: str) -> Image:
+    """The image of a MIXAL program, given as text."""
+    state = SimulatorState.initial_state()
+    Assembler("<source>", state).parse_lines(source.splitlines())
+    return Image.from_state(state)
+
+
+class Registry:
+    """The images of the programs that were registered, by program id, keeping the
+    capacity most recently used ones."""
+
+    capacity: int
+    images: OrderedDict[str, Image]
+
+    def __init__(self, capacity: int = DEFAULT_PROGRAMS) -> None:
+        self.capacity = capacity
+        self.images = OrderedDict()
+
+    def register(self, source: str) -> str:
+        """Assemble a program, unless it is already registered, and return its id.
+        The id is a digest of the source, so it is the same for every client."""
+        program = hashlib.sha256(source.encode()).hexdigest()[:16]
+        if program in self.images:
+            self.images.move_to_end(program)
+        else:
+            self.images[program] = assemble(source)
+            if len(self.images) > self.capacity:
+                self.images.popitem(last=False)
+
+        return program
+
+    def __getitem__(self, program: str) -> Image:
+        try:
+            self.images.move_to_end(program)
+        except KeyError:
+            raise ServiceError(
+                UNKNOWN_PROGRAM, f"Program {program} is not registered"
+            ) from None
+
+        return self.images[program]
+
+
+class _NotLoaded(Exception):
+    """Raised by a worker that was asked to run a program it has no machine for,
+    without being sent the image of the program."""
+
+
+# the machines of a worker process, by program id
+_machines: OrderedDict[str, Machine] = OrderedDict()
+
+
+def _machine(program: str, image: Image | None, algorithm: str) -> Machine:
+    """A machine of this worker with the program loaded, preferably one that already
+    has. Raises _NotLoaded if none has and image is None."""
+    machine = _machines.pop(program, None)
+    if machine is None:
+        if image is None:
+            raise _NotLoaded(program)
+        if len(_machines) < WORKER_MACHINES:
+            machine = Machine(image, algorithm)
+        else:
+            _, machine = _machines.popitem(last=False)
+            machine.load(image)
+    _machines[program] = machine
+
+    return machine
+
+
+def _run(
+    program: str, image: Image | None, cards: list[str], quota: Quota, algorithm: str
+) -> RunResult:
+    machine = _machine(program, image, algorithm)
+    state = machine.simulator.state
+    try:
+        machine.start(Patch())
+        state.devices[CARD_READER] = CardReader(cards)
+        quota.run(machine.simulator, DEFAULT_QUANTUM)
+        return machine.result()
+    except Exception as e:
+        return machine.result(e)
+    finally:
+        state.devices.close()
+
+
+class Service:
+    """Runs programs for clients that send JSON-RPC 2.0 requests, one per line.
+
+    "register" takes {"source": MIXAL} and assembles the program into the registry,
+    returning {"program": ID}. "run" takes {"program": ID, "cards": [LINE, ...],
+    "max_instructions": N, "max_time": N} (all but the id are optional) and returns the
+    RunResult of running the program on digest devices, on a pool of worker processes.
+    Each worker keeps the machines of the programs it ran last, so running a program
+    again only resets the memory cells that the last run changed. Only the id of the
+    program is sent to a worker, and its image only if the worker has no machine for
+    it yet.
+    """
+
+    registry: Registry
+    algorithm: str
+    executor: Executor
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        programs: int = DEFAULT_PROGRAMS,
+        algorithm: str = DEFAULT_ALGORITHM,
+    ) -> None:
+        self.registry = Registry(programs)
+        self.algorithm = algorithm
+        self.executor = ProcessPoolExecutor(workers)
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle(self, line: str) -> str | None:
+        """The response to a request, or None if the request is a notification."""
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                raise ServiceError(PARSE_ERROR, str(e)) from None
+            if not isinstance(request, dict) or not isinstance(
+                request.get("method"), str
+            ):
+                raise ServiceError(INVALID_REQUEST, "Not a JSON-RPC request")
+
+            request_id = request.get("id")
+            params = request.get("params", {})
+            if not isinstance(params, dict):
+                raise ServiceError(INVALID_PARAMS, "params must be an object")
+            result = await self.call(request["method"], params)
+            if "id" not in request:
+                return None
+            response: dict[str, Any] = {"result": result}
+        except ServiceError as e:
+            response = {"error": {"code": e.code, "message": str(e)}}
+        except Exception as e:
+            message = f"{type(e).__name__}: {e}"
+            response = {"error": {"code": INTERNAL_ERROR, "message": message}}
+
+        return json.dumps({"jsonrpc": "2.0", "id": request_id, **response})
+
+    async def call(self, method: str, params: dict[str, Any]) -> object:
+        match method:
+            case "register":
+                try:
+                    return {"program": self.registry.register(params["source"])}
+                except (KeyError, ValueError) as e:
+                    message = f"{type(e).__name__}: {e}"
+                    raise ServiceError(INVALID_PARAMS, message) from None
+            case "run":
+                try:
+                    image = self.registry[params["program"]]
+                    cards = [str(card) for card in params.get("cards", [])]
+                    quota = Quota(
+                        params.get("max_instructions"), params.get("max_time")
+                    )
+                except KeyError as e:
+                    raise ServiceError(INVALID_PARAMS, f"Missing {e}") from None
+                loop = asyncio.get_running_loop()
+                run = partial(_run, params["program"])
+                try:
+                    result = await loop.run_in_executor(
+                        self.executor, run, None, cards, quota, self.algorithm
+                    )
+                except _NotLoaded:
+                    # the worker has not run the program yet, send it the image too
+                    result = await loop.run_in_executor(
+                        self.executor, run, image, cards, quota, self.algorithm
+                    )
+                return asdict(result)
+            case _:
+                raise ServiceError(METHOD_NOT_FOUND, f"No method {method}")
+
+    async def serve(
+        self,
+        readline: Callable[[], Awaitable[str]],
+        write: Callable[[str], Awaitable[None]],
+    ) -> None:
+        """Answer requests until readline returns "". Requests are handled
+        concurrently, so the responses may come back in another order."""
+
+        async def respond(line: str) -> None:
+            response = await self.handle(line)
+            if response is not None:
+                await write(response + "\n")
+
+        async with asyncio.TaskGroup() as tasks:
+            while line := await readline():
+                if line.strip():
+                    tasks.create_task(respond(line))
+
+    async def serve_stdio(self) -> None:
+        """Answer requests from stdin on stdout."""
+
+        async def readline() -> str:
+            return await asyncio.to_thread(sys.stdin.readline)
+
+        async def write(text: str) -> None:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        await self.serve(readline, write)
+
+    async def serve_socket(self, path: str) -> None:
+        """Answer requests from any number of clients on a Unix socket."""
+
+        async def connection(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            async def readline() -> str:
+                return (await reader.readline()).decode()
+
+            async def write(text: str) -> None:
+                writer.write(text.encode())
+                await writer.drain()
+
+            try:
+                await self.serve(readline, write)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_unix_server(connection, path)
+        async with server:
+            await server.serve_forever()
+
+
+class Client:
+    """A client of the service, which sends one request at a time."""
+
+    reader: TextIO
+    writer: TextIO
+    next_id: int
+
+    def __init__(self, reader: TextIO, writer: TextIO) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    @staticmethod
+    def connect(path: str) -> Client:
+        """A client of the service on the Unix socket at path."""
+        sock = socket.socket(socket.AF_UNIX)
+        sock.connect(path)
+        stream = sock.makefile("rw")
+        # the file holds its own reference to the socket
+        sock.close()
+        return Client(stream, stream)
+
+    def close(self) -> None:
+        self.writer.close()
+        self.reader.close()
+
+    def call(self, method: str, **params: object) -> Any:
+        """Send a request and return its result, raising ServiceError if it failed."""
+        self.next_id += 1
+        request = {"jsonrpc": "2.0", "id": self.next_id, "method": method}
+        self.writer.write(json.dumps({**request, "params": params}) + "\n")
+        self.writer.flush()
+
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("The service closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            error = response["error"]
+            raise ServiceError(error["code"], error["message"])
+
+        return response["result"]
+
+    def register(self, source: str) -> str:
+        program: str = self.call("register", source=source)["program"]
+        return program
+
+    def run(
+        self, program: str, cards: list[str] | None = None, quota: Quota | None = None
+    ) -> RunResult:
+        quota = Quota() if quota is None else quota
+        result = self.call(
+            "run",
+            program=program,
+            cards=[] if cards is None else cards,
+            max_instructions=quota.instructions,
+            max_time=quota.time,
+        )
+        # json object keys are always strings
+        result["digests"] = {
+            int(unit): digest for unit, digest in result["digests"].items()
+        }
+        return RunResult(**result)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+from collections.abc import Iterator, Mapping
+from multiprocessing.shared_memory import SharedMemory
+
+from mix_simulator.image import Image
+
+# each word (and the start) is stored as a signed 64 bit integer
+ITEM_SIZE = 8
+
+
+class SharedWords(Mapping[int, int]):
+    """The packed words of an image, read from shared memory, as a read-only mapping
+    like Image.words (which leaves out the words that are +0)."""
+
+    packed: memoryview
+    locations: list[int]
+
+    def __init__(self, packed: memoryview) -> None:
+        self.packed = packed
+        self.locations = [loc for loc, word in enumerate(packed) if word]
+
+    def __getitem__(self, loc: int) -> int:
+        word = self.packed[loc] if 0 <= loc < len(self.packed) else 0
+        if not word:
+            raise KeyError(loc)
+        return word
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.locations)
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+
+class SharedImage:
+    """An image published in shared memory, which other processes attach to by name.
+
+    The start and the words up to the last one that is not +0 are stored packed, one
+    after the other, so an image is published once however many processes use it.
+    Those that attach only read it: a machine keeps its own memory, which it resets
+    from the shared words. The process that published the image unlinks it when it
+    closes it, once the others are done with it.
+    """
+
+    memory: SharedMemory
+    image: Image
+    owner: bool
+
+    def __init__(self, memory: SharedMemory, owner: bool = False) -> None:
+        self.memory = memory
+        self.owner = owner
+        assert memory.buf is not None
+        packed = memory.buf.toreadonly().cast("q")
+        self.image = Image(SharedWords(packed[1:]), packed[0])
+        self._packed = packed
+
+    @staticmethod
+    def publish(image: Image) -> SharedImage:
+        size = max(image.words, default=-1) + 1
+        memory = SharedMemory(create=True, size=(size + 1) * ITEM_SIZE)
+        assert memory.buf is not None
+        with memory.buf.cast("q") as packed:
+            packed[0] = image.start
+            for loc, word in image.words.items():
+                packed[loc + 1] = word
+
+        return SharedImage(memory, owner=True)
+
+    @staticmethod
+    def attach(name: str) -> SharedImage:
+        return SharedImage(SharedMemory(name))
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self) -> None:
+        """Detach from the image, and unlink it if this process published it."""
+        words = self.image.words
+        assert isinstance(words, SharedWords)
+        # the views must be released before the memory can be closed
+        words.packed.release()
+        self._packed.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
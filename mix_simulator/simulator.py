@@ -1,12 +1,23 @@
 from __future__ import annotations
-from argparse import ArgumentParser
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
 from mix_simulator.byte import Byte
 from mix_simulator.comparison_indicator import ComparisonIndicator
+from mix_simulator.devices import Devices
 from mix_simulator.memory import Memory
+from mix_simulator.opcode import OpCode
 from mix_simulator.register import IndexRegister, JumpRegister, WordRegister
 
+if TYPE_CHECKING:
+    from mix_simulator.instruction import Instruction
+
+IMAGE_SUFFIX = ".mixi"
+# how many instructions resume_async executes before letting other tasks run
+DEFAULT_SLICE = 1000
+# a limit on instructions that is never reached
+FOREVER = 1 << 62
+
 
 @dataclass
 class SimulatorState:
@@ -23,9 +34,20 @@ class SimulatorState:
     overflow: bool
     comparison_indicator: ComparisonIndicator
     program_counter: int
+    # the simulated time in u
+    clock: int
+    # the number of instructions executed
+    instructions: int
+    devices: Devices
+    # the instructions decoded from the words executed so far, bound to this state,
+    # by the sign and bytes of the word (not the Word, which a program can change)
+    decoded: dict[tuple[bool, int, int, int, int, int], Instruction] = field(
+        default_factory=dict, compare=False, repr=False
+    )
 
     @staticmethod
-    def initial_state() -> SimulatorState:
+    def initial_state(devices: Devices | None = None) -> SimulatorState:
+        """A cleared machine, attached to devices (the standard units by default)."""
         return SimulatorState(
             memory=Memory(),
             rA=WordRegister(False, Byte(0), Byte(0), Byte(0), Byte(0), Byte(0)),
@@ -40,43 +62,156 @@ class SimulatorState:
             overflow=False,
             comparison_indicator=ComparisonIndicator.LESS,
             program_counter=0,
+            clock=0,
+            instructions=0,
+            devices=Devices.standard() if devices is None else devices,
         )
 
 
 class Simulator:
-    def __init__(self) -> None:
-        self.state = SimulatorState.initial_state()
+    """Runs MIX programs on its own state.
 
-    def run(self, filename: str) -> None:
+    Simulators share no mutable state with each other (caches included), so separate
+    simulators can run on separate threads, in parallel on a free-threaded build. A
+    single simulator is not safe to use from more than one thread at a time.
+    """
+
+    # whether to skip over loops that wait for a busy I/O unit (see _fast_forward)
+    fast_forward: bool
+
+    def __init__(
+        self, fast_forward: bool = True, devices: Devices | None = None
+    ) -> None:
+        self.state = SimulatorState.initial_state(devices)
+        self.fast_forward = fast_forward
+
+    def load(self, filename: str) -> None:
+        """Assemble a MIXAL program, or load a linked image (.mixi), into memory."""
         # defer import to avoid circular import
         from mix_simulator.assembler import Assembler
+        from mix_simulator.image import Image
+
+        if filename.endswith(IMAGE_SUFFIX):
+            Image.read(filename).load(self.state)
+        else:
+            Assembler(filename, self.state).parse_program()
+
+    def run(self, filename: str) -> None:
+        self.load(filename)
+        self.resume()
+
+    def resume(self) -> None:
+        """Run from the current program counter until a HLT instruction."""
+        try:
+            self.run_slice(FOREVER)
+        finally:
+            # output is written out even if the program fails
+            self.state.devices.flush()
+
+    async def run_async(self, filename: str, slice_size: int = DEFAULT_SLICE) -> None:
+        self.load(filename)
+        await self.resume_async(slice_size)
+
+    async def resume_async(self, slice_size: int = DEFAULT_SLICE) -> None:
+        """Like resume, but as a coroutine that lets other tasks run every slice_size
+        instructions. When an IN or OUT would have to wait on the host (see
+        Device.ready), the wait happens on a thread while other tasks run."""
+        # only the async API needs asyncio, which is slow to import
+        import asyncio
+
+        # defer import to avoid circular import
         from mix_simulator.instruction import Instruction
 
-        assembler = Assembler(filename, self.state)
-        instructions = assembler.parse_program()
-        assembler.write_program_to_memory(instructions)
+        state = self.state
+        devices = state.devices
+        try:
+            while not self.run_slice(slice_size, blocking=False):
+                location = state.program_counter
+                instruction = Instruction.from_word(state.memory[location], state)
+                opcode = instruction.opcode
+                if opcode is OpCode.IN or opcode is OpCode.OUT:
+                    device = devices[instruction.field]
+                    if not device.ready(opcode is OpCode.OUT):
+                        await asyncio.to_thread(device.wait, opcode is OpCode.OUT)
+                        continue
+                await asyncio.sleep(0)
+        finally:
+            await asyncio.to_thread(devices.flush)
+
+    def run_slice(self, limit: int, blocking: bool = True) -> bool:
+        """Execute up to limit instructions, returning whether a HLT was executed.
+        Unlike resume, this leaves the output of the units buffered.
 
-        # load instruction from memory
-        word = self.state.memory[self.state.program_counter]
-        instruction = Instruction.from_word(word, self.state)
-        self.state.program_counter += 1
+        Unless blocking, stop before an IN or OUT whose unit is not ready, so that the
+        program counter points at it.
+        """
+        # defer import to avoid circular import
+        from mix_simulator.instruction import Instruction
+
+        state = self.state
+        memory = state.memory
+        devices = state.devices
+        waits_at = () if blocking else (OpCode.IN, OpCode.OUT)
+        for _ in range(limit):
+            location = state.program_counter
+            instruction = Instruction.from_word(memory[location], state)
+            opcode = instruction.opcode
+            if opcode is OpCode.CONV and instruction.field == 2:
+                # HLT
+                state.program_counter += 1
+                state.clock += instruction.time
+                state.instructions += 1
+                return True
+            if opcode in waits_at and not devices[instruction.field].ready(
+                opcode is OpCode.OUT
+            ):
+                return False
 
-        # run until we reach HALT instruction
-        while not (instruction.opcode.value == 5 and instruction.field == 2):
+            state.program_counter += 1
             instruction.execute()
-            word = self.state.memory[self.state.program_counter]
-            instruction = Instruction.from_word(word, self.state)
-            self.state.program_counter += 1
+            state.clock += instruction.time
+            state.instructions += 1
+            if (opcode is OpCode.JBUS or opcode is OpCode.JRED) and self.fast_forward:
+                self._fast_forward(instruction, location)
+            # only look for I/O units that finished once the first of them is due
+            if state.clock >= devices.next_event:
+                devices.complete(state.clock)
 
+        return False
 
-def execute() -> int:
-    parser = ArgumentParser()
-    parser.add_argument("filename", type=str)
-    args = parser.parse_args()
+    def _fast_forward(self, instruction: Instruction, location: int) -> None:
+        """Skip the rest of a loop that waits for a busy unit, just counting its time.
+
+        The loops are "JBUS *(U)" and "JRED *+2(U)" followed by "JMP *-1", where
+        instruction (at location) is the JBUS or JRED that was just executed.
+        """
+        from mix_simulator.instruction import Instruction
 
-    Simulator().run(args.filename)
-    return 0
+        device = self.state.devices[instruction.field]
+        if not device.busy:
+            return
 
+        if instruction.opcode is OpCode.JBUS:
+            # JBUS jumped back to itself
+            if self.state.program_counter != location:
+                return
+            instructions = 1
+            period = instruction.time
+        else:
+            # JRED went on to a JMP back to it
+            jump = Instruction.from_word(self.state.memory[location + 1], self.state)
+            if (
+                jump.opcode is not OpCode.JMP
+                or jump.field > 1
+                or jump._get_address() != location
+            ):
+                return
+            instructions = 2
+            period = instruction.time + jump.time
 
-if __name__ == "__main__":
-    execute()
+        # every iteration that starts before the unit is ready loops again, skip all
+        # but the one that is underway
+        began = self.state.clock - instruction.time
+        iterations = -((began - device.ready_at) // period)
+        self.state.clock += (iterations - 1) * period
+        self.state.instructions += (iterations - 1) * instructions
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import hashlib
+import sys
+from functools import partial
+from typing import TYPE_CHECKING, TextIO
+
+from mix_simulator.writer import DEFAULT_QUEUE_SIZE, Writer
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+DEFAULT_THRESHOLD = 1 << 16
+DEFAULT_ALGORITHM = "sha256"
+
+
+class Sink:
+    """Where the output of a device goes.
+
+    Output is buffered and handed to _write in large chunks, either when the buffer
+    reaches threshold characters or when the sink is submitted or flushed. Flushing
+    also waits for the output to be written, for sinks that write in the background.
+    """
+
+    threshold: int
+    buffer: list[str]
+    size: int
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD) -> None:
+        self.threshold = threshold
+        self.buffer = []
+        self.size = 0
+
+    def write(self, text: str) -> None:
+        self.buffer.append(text)
+        self.size += len(text)
+
+        if self.size >= self.threshold:
+            self.submit()
+
+    def submit(self) -> None:
+        if self.buffer:
+            self._write("".join(self.buffer))
+            self.buffer.clear()
+            self.size = 0
+
+    def flush(self) -> None:
+        self.submit()
+
+    def close(self) -> None:
+        self.flush()
+
+    def reset(self) -> None:
+        """Discard the output that was not submitted, to start over."""
+        self.buffer.clear()
+        self.size = 0
+
+    def ready(self) -> bool:
+        """Whether a submit would be done without waiting on the host."""
+        return True
+
+    def wait(self) -> None:
+        """Wait on the host until the sink is ready."""
+
+    def _write(self, text: str) -> None:
+        raise NotImplementedError
+
+
+class StreamSink(Sink):
+    """Writes to a text stream, by default whatever sys.stdout is when flushed."""
+
+    stream: TextIO | None
+
+    def __init__(
+        self, stream: TextIO | None = None, threshold: int = DEFAULT_THRESHOLD
+    ) -> None:
+        super().__init__(threshold)
+        self.stream = stream
+
+    def _write(self, text: str) -> None:
+        stream = sys.stdout if self.stream is None else self.stream
+        stream.write(text)
+        stream.flush()
+
+
+class FileSink(StreamSink):
+    """Writes to a file on the host."""
+
+    def __init__(self, filename: str, threshold: int = DEFAULT_THRESHOLD) -> None:
+        super().__init__(open(filename, "w"), threshold)
+
+    def close(self) -> None:
+        super().close()
+        if self.stream is not None:
+            self.stream.close()
+
+
+class MemorySink(Sink):
+    """Keeps everything that was written in memory."""
+
+    chunks: list[str]
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD) -> None:
+        super().__init__(threshold)
+        self.chunks = []
+
+    def getvalue(self) -> str:
+        self.flush()
+        return "".join(self.chunks)
+
+    def _write(self, text: str) -> None:
+        self.chunks.append(text)
+
+
+class BackgroundSink(Sink):
+    """Hands the chunks for another sink to a writer thread, so the program keeps
+    running while they are written. Submitting only blocks once queue_size chunks are
+    waiting to be written."""
+
+    sink: Sink
+    writer: Writer
+
+    def __init__(
+        self,
+        sink: Sink,
+        threshold: int = DEFAULT_THRESHOLD,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        super().__init__(threshold)
+        self.sink = sink
+        self.writer = Writer(queue_size)
+
+    def flush(self) -> None:
+        self.submit()
+        self.writer.join()
+
+    def close(self) -> None:
+        try:
+            self.submit()
+            self.writer.close()
+        finally:
+            self.sink.close()
+
+    def ready(self) -> bool:
+        return not self.writer.full()
+
+    def wait(self) -> None:
+        self.writer.join()
+
+    def _write(self, text: str) -> None:
+        self.writer.submit(partial(self.sink._write, text))
+
+
+class NullSink(Sink):
+    """Discards everything that is written."""
+
+    def write(self, text: str) -> None:
+        pass
+
+    def _write(self, text: str) -> None:
+        pass
+
+
+class DigestSink(Sink):
+    """Feeds everything that is written (as UTF-8) into a hash from hashlib and counts
+    its bytes, instead of keeping it. Only the first keep lines are kept, e.g. to see
+    where output that does not match what was expected goes wrong."""
+
+    hash: _Hash
+    bytes_written: int
+    keep: int
+    head: str
+
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM, keep: int = 0) -> None:
+        super().__init__()
+        self.hash = hashlib.new(algorithm)
+        self.bytes_written = 0
+        self.keep = keep
+        self.head = ""
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.hash.update(data)
+        self.bytes_written += len(data)
+
+        if self.head.count("\n") < self.keep:
+            self.head += text
+
+    @property
+    def lines(self) -> list[str]:
+        """The first keep lines that were written."""
+        return self.head.splitlines()[: self.keep]
+
+    def reset(self) -> None:
+        super().reset()
+        self.hash = hashlib.new(self.hash.name)
+        self.bytes_written = 0
+        self.head = ""
+
+    def report(self) -> str:
+        return f"{self.hash.name}:{self.hash.hexdigest()} {self.bytes_written} bytes"
+
+    def _write(self, text: str) -> None:
+        pass
+
+
+def open_sink(name: str) -> Sink:
+    """The sink for a command line argument: "-" for stdout, "null" to discard, or a
+    file name, which is written in the background."""
+    match name:
+        case "-":
+            return StreamSink()
+        case "null":
+            return NullSink()
+        case _:
+            return BackgroundSink(FileSink(name))
@@ -0,0 +1,71 @@
+"""Run a program on many simulators at once, one per thread, and report how the
+throughput scales with the threads.
+
+python -m mix_simulator.stress program.mix [--threads N] [--runs N]
+
+Simulators share no mutable state, so on a free-threaded build (python3.13t) the runs
+per second should grow close to linearly with the threads. With the GIL they stay
+flat.
+"""
+
+from __future__ import annotations
+import json
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+
+from mix_simulator.batch import program_image
+from mix_simulator.image import Image
+from mix_simulator.sweep import Machine, Patch
+
+
+def stress(image: Image, threads: int, runs: int) -> float:
+    """The runs per second of threads threads, each running image runs times on a
+    machine of its own."""
+
+    def run() -> None:
+        machine = Machine(image)
+        for _ in range(runs):
+            result = machine.run(Patch())
+            if result.status != "ok":
+                raise RuntimeError(f"The run failed with {result.error}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for future in [pool.submit(run) for _ in range(threads)]:
+            future.result()
+
+    return threads * runs / (time.perf_counter() - start)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = ArgumentParser(prog="python -m mix_simulator.stress")
+    parser.add_argument("program", type=str, help="a program that reads no cards")
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="the most threads to try (default: one per core)",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=10, help="runs per thread (default: 10)"
+    )
+    args = parser.parse_args(argv)
+
+    # sys._is_gil_enabled only exists from 3.13 on
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    image = program_image(args.program)
+    base = None
+    threads = 1
+    while threads <= args.threads:
+        rate = stress(image, threads, args.runs)
+        base = rate if base is None else base
+        report = {"threads": threads, "runs_per_second": rate, "speedup": rate / base}
+        print(json.dumps({**report, "gil": gil}), flush=True)
+        threads *= 2
+
+
+if __name__ == "__main__":
+    main()
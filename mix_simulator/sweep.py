@@ -0,0 +1,270 @@
+from __future__ import annotations
+import json
+import os
+from collections import deque
+from collections.abc import Generator, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+
+from mix_simulator.batch import Result, digest_devices
+from mix_simulator.byte import Byte, int_to_bytes
+from mix_simulator.card import CardReader
+from mix_simulator.comparison_indicator import ComparisonIndicator
+from mix_simulator.devices import CARD_READER, Devices
+from mix_simulator.image import Image
+from mix_simulator.shared import SharedImage
+from mix_simulator.simulator import Simulator
+from mix_simulator.sink import DEFAULT_ALGORITHM
+from mix_simulator.word import BYTES_IN_WORD, Word, unpack_word
+
+REGISTERS = ("A", "X", "I1", "I2", "I3", "I4", "I5", "I6", "J")
+# how many patches a worker is handed at a time
+CHUNK_SIZE = 64
+# how many chunks per worker sweep hands out before it waits for the first one
+CHUNKS_AHEAD = 2
+
+
+@dataclass
+class Patch:
+    """Changes to the state a program starts in: words of memory by location and
+    registers by name (A, X, I1-I6 or J), given as integer values."""
+
+    memory: dict[int, int] = field(default_factory=dict)
+    registers: dict[str, int] = field(default_factory=dict)
+
+    @staticmethod
+    def from_json(line: str) -> Patch:
+        data = json.loads(line)
+        # json object keys are always strings
+        memory = {int(loc): value for loc, value in data.get("memory", {}).items()}
+        return Patch(memory, data.get("registers", {}))
+
+
+@dataclass
+class RunResult:
+    """The status ("ok" or "error"), instruction count and time in u of a run, and the
+    digests of its output (see Devices.digests)."""
+
+    status: str
+    instructions: int
+    time: int
+    digests: dict[int, str] = field(default_factory=dict)
+    error: str | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+class Machine:
+    """A simulator with an image loaded, which is reset to that image before each run.
+
+    Memory keeps track of the cells that change, so resetting only restores those
+    (including the ones the last patch changed) rather than all of memory. The
+    digest devices are made once and reset too.
+    """
+
+    image: Image
+    algorithm: str
+    simulator: Simulator
+    devices: Devices
+    # the reader of the devices, which a run may have swapped for one with its cards
+    card_reader: CardReader
+
+    def __init__(self, image: Image, algorithm: str = DEFAULT_ALGORITHM) -> None:
+        self.image = image
+        self.algorithm = algorithm
+        self.devices = digest_devices(algorithm)
+        self.simulator = Simulator(devices=self.devices)
+        image.load(self.simulator.state)
+        self.simulator.state.memory.dirty = set()
+        card_reader = self.devices[CARD_READER]
+        assert isinstance(card_reader, CardReader)
+        self.card_reader = card_reader
+
+    def run(self, patch: Patch) -> RunResult:
+        state = self.simulator.state
+        try:
+            self.start(patch)
+            self.simulator.resume()
+            return self.result()
+        except Exception as e:
+            return self.result(e)
+        finally:
+            state.devices.close()
+
+    def load(self, image: Image) -> None:
+        """Switch to another image, for the runs from now on."""
+        memory = self.simulator.state.memory
+        assert memory.dirty is not None
+        # the cells of either image may differ from the other, so they are reset too
+        memory.dirty.update(self.image.words)
+        memory.dirty.update(image.words)
+        self.image = image
+
+    def start(self, patch: Patch) -> None:
+        """Reset to the image and apply patch, ready to run from the start of the image.
+        Raises ValueError if the patch can not be applied."""
+        self._reset()
+        self._apply(patch)
+
+    def result(self, error: Exception | None = None) -> RunResult:
+        """The result of the run so far, which failed with error if it is given."""
+        state = self.simulator.state
+        if error is None:
+            try:
+                digests = state.devices.digests(self.algorithm)
+            except Exception as e:
+                error = e
+            else:
+                return RunResult("ok", state.instructions, state.clock, digests)
+
+        return RunResult(
+            "error",
+            state.instructions,
+            state.clock,
+            error=f"{type(error).__name__}: {error}",
+        )
+
+    def _reset(self) -> None:
+        state = self.simulator.state
+        memory = state.memory
+        assert memory.dirty is not None
+        for cell in memory.dirty:
+            memory.cells[cell] = unpack_word(self.image.words.get(cell, 0))
+        memory.dirty.clear()
+
+        for register in (
+            state.rA,
+            state.rX,
+            state.rI1,
+            state.rI2,
+            state.rI3,
+            state.rI4,
+            state.rI5,
+            state.rI6,
+        ):
+            register.update(False)
+        state.rJ.update()
+        state.overflow = False
+        state.comparison_indicator = ComparisonIndicator.LESS
+        state.program_counter = self.image.start
+        state.clock = 0
+        state.instructions = 0
+        # a program that changes its own code may have decoded any number of words
+        state.decoded.clear()
+        self.devices[CARD_READER] = self.card_reader
+        self.devices.reset()
+        state.devices = self.devices
+
+    def _apply(self, patch: Patch) -> None:
+        state = self.simulator.state
+        for loc, value in patch.memory.items():
+            if not 0 <= loc < state.memory.words:
+                raise ValueError(f"{loc} is not a memory location")
+            sign, bs = _to_bytes(value, BYTES_IN_WORD)
+            state.memory[loc] = Word(sign, *reversed(bs))
+
+        for name, value in patch.registers.items():
+            if name not in REGISTERS:
+                raise ValueError(f"{name} is not a register, use one of {REGISTERS}")
+
+            register = getattr(state, f"r{name}")
+            sign, bs = _to_bytes(value, register.BYTES)
+            if name == "J":
+                if sign:
+                    raise ValueError("J can not be negative")
+                register.update(*bs)
+            else:
+                register.update(sign, *bs)
+
+
+def _to_bytes(value: int, count: int) -> tuple[bool, tuple[Byte, ...]]:
+    """The sign and little endian bytes of value, which must fit in count bytes."""
+    sign, bs = int_to_bytes(value, padding=count)
+    if len(bs) > count:
+        raise ValueError(f"{value} does not fit in {count} bytes")
+
+    return sign, bs
+
+
+# the image and machine of a worker process, set up by _start_worker
+_shared: SharedImage | None = None
+_machine: Machine | None = None
+
+
+def _start_worker(name: str, algorithm: str) -> None:
+    global _shared, _machine
+    # the worker keeps the image attached until it exits
+    _shared = SharedImage.attach(name)
+    _machine = Machine(_shared.image, algorithm)
+
+
+def _run_patches(patches: list[Patch]) -> list[RunResult]:
+    assert _machine is not None
+    return [_machine.run(patch) for patch in patches]
+
+
+def sweep(
+    image: Image,
+    patches: Iterable[Patch],
+    workers: int | None = None,
+    algorithm: str = DEFAULT_ALGORITHM,
+) -> Generator[RunResult, None, None]:
+    """Run image once for every patch, on a pool of workers (one per core by default)
+    that each load image once, yielding the results in the order of the patches.
+    The image is published to the workers in shared memory (see SharedImage).
+
+    Patches are handed out CHUNK_SIZE at a time, and only CHUNKS_AHEAD chunks per
+    worker are out at once, so patches are read lazily and a sweep of any size runs
+    in constant memory.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    patches = iter(patches)
+    shared = SharedImage.publish(image)
+    try:
+        with ProcessPoolExecutor(
+            workers, initializer=_start_worker, initargs=(shared.name, algorithm)
+        ) as pool:
+            chunks: deque[Future[list[RunResult]]] = deque()
+            try:
+                while True:
+                    while len(chunks) < workers * CHUNKS_AHEAD and (
+                        chunk := list(islice(patches, CHUNK_SIZE))
+                    ):
+                        chunks.append(pool.submit(_run_patches, chunk))
+                    if not chunks:
+                        break
+                    yield from chunks.popleft().result()
+            finally:
+                # the results were not all wanted, drop the chunks that did not start
+                for future in chunks:
+                    future.cancel()
+    finally:
+        shared.close()
+
+
+def summarize(results: Iterable[RunResult | Result]) -> dict[str, object]:
+    """The number of runs (or jobs) and errors, and the least, mean and most
+    instructions and time of the runs that reached HLT."""
+    runs = errors = 0
+    instructions = []
+    times = []
+    for result in results:
+        runs += 1
+        if result.status == "ok":
+            instructions.append(result.instructions)
+            times.append(result.time)
+        else:
+            errors += 1
+
+    summary: dict[str, object] = {"runs": runs, "errors": errors}
+    for name, values in (("instructions", instructions), ("time", times)):
+        if values:
+            summary[name] = {
+                "min": min(values),
+                "mean": sum(values) / len(values),
+                "max": max(values),
+            }
+
+    return summary
@@ -0,0 +1,167 @@
+from __future__ import annotations
+import hashlib
+import os
+from functools import partial
+from io import BufferedRandom
+from struct import Struct
+from typing import TYPE_CHECKING
+
+from mix_simulator.device import Device
+from mix_simulator.word import pack_word, unpack_word
+from mix_simulator.writer import DEFAULT_QUEUE_SIZE, Writer
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+    from mix_simulator.simulator import SimulatorState
+
+
+class Tape(Device):
+    """A magnetic tape unit (units 0-7), which reads and writes blocks of 100 words.
+
+    Blocks are kept packed (see pack_word), so that words stored on the tape can not
+    change along with memory. Writing a block erases everything after it on the tape.
+    IOC 0 rewinds the tape, IOC M skips M blocks forward (or -M back if M < 0).
+    """
+
+    BLOCK_SIZE = 100
+
+    blocks: list[list[int]]
+    position: int
+
+    def __init__(self) -> None:
+        self.blocks = []
+        self.position = 0
+
+    def read(self, state: SimulatorState, address: int) -> None:
+        if self.position >= len(self.blocks):
+            raise ValueError(f"No block to read at position {self.position} of tape")
+
+        words = [unpack_word(packed) for packed in self.blocks[self.position]]
+        state.memory.write_block(address, words)
+        self.position += 1
+
+    def write(self, state: SimulatorState, address: int) -> None:
+        words = state.memory.read_block(address, self.BLOCK_SIZE)
+        del self.blocks[self.position :]
+        self.blocks.append([pack_word(word) for word in words])
+        self.position += 1
+
+    @property
+    def length(self) -> int:
+        """The number of blocks on the tape."""
+        return len(self.blocks)
+
+    def control(self, state: SimulatorState, m: int) -> None:
+        if m == 0:
+            self.position = 0
+        else:
+            self.position = min(max(self.position + m, 0), self.length)
+
+    def reset(self) -> None:
+        super().reset()
+        self.blocks = []
+        self.position = 0
+
+    def digest(self, algorithm: str) -> _Hash:
+        """A hash (from hashlib) of the blocks on the tape, as they are laid out in a
+        tape file."""
+        digest = hashlib.new(algorithm)
+        for block in self.blocks:
+            digest.update(BLOCK.pack(*block))
+
+        return digest
+
+
+# a block on a tape file is 100 packed words of 4 bytes each, most significant first
+BLOCK = Struct(f">{Tape.BLOCK_SIZE}I")
+
+
+class FileTape(Tape):
+    """A tape unit whose blocks are kept in a file on the host, BLOCK.size bytes each.
+
+    Since every block has the same size, block n starts at byte n * BLOCK.size, so
+    skipping is a seek rather than reading past blocks, and a tape can be far larger
+    than memory. A block is read with a single readinto of a buffer that is allocated
+    once. Blocks are written by a writer thread, up to queue_size of them behind the
+    program, which waits for them before reading. Missing files are created as an
+    empty tape.
+    """
+
+    file: BufferedRandom
+    buffer: bytearray
+    blocks_on_tape: int
+    writer: Writer
+
+    def __init__(self, filename: str, queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        self.file = open(filename, "r+b" if os.path.exists(filename) else "w+b")
+        size = os.fstat(self.file.fileno()).st_size
+        if size % BLOCK.size:
+            self.file.close()
+            raise ValueError(
+                f"{filename} is not a tape, its size is not a multiple of {BLOCK.size}"
+            )
+
+        self.blocks_on_tape = size // BLOCK.size
+        self.buffer = bytearray(BLOCK.size)
+        self.position = 0
+        self.writer = Writer(queue_size)
+
+    @property
+    def length(self) -> int:
+        return self.blocks_on_tape
+
+    def read(self, state: SimulatorState, address: int) -> None:
+        if self.position >= self.blocks_on_tape:
+            raise ValueError(f"No block to read at position {self.position} of tape")
+
+        self.writer.join()
+        self.file.seek(self.position * BLOCK.size)
+        self.file.readinto(self.buffer)
+        words = [unpack_word(packed) for packed in BLOCK.unpack(self.buffer)]
+        state.memory.write_block(address, words)
+        self.position += 1
+
+    def write(self, state: SimulatorState, address: int) -> None:
+        words = state.memory.read_block(address, self.BLOCK_SIZE)
+        block = BLOCK.pack(*[pack_word(word) for word in words])
+
+        # writing a block erases the rest of the tape
+        erase = self.position + 1 < self.blocks_on_tape
+        self.writer.submit(partial(self._write_block, self.position, block, erase))
+        self.position += 1
+        self.blocks_on_tape = self.position
+
+    def ready(self, output: bool) -> bool:
+        return not self.writer.full() if output else self.writer.idle()
+
+    def wait(self, output: bool) -> None:
+        self.writer.join()
+
+    def digest(self, algorithm: str) -> _Hash:
+        self.writer.join()
+        self.file.flush()
+
+        digest = hashlib.new(algorithm)
+        self.file.seek(0)
+        for _ in range(self.blocks_on_tape):
+            self.file.readinto(self.buffer)
+            digest.update(self.buffer)
+
+        return digest
+
+    def flush(self) -> None:
+        self.writer.join()
+        self.file.flush()
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        finally:
+            self.file.close()
+
+    def _write_block(self, position: int, block: bytes, erase: bool) -> None:
+        self.file.seek(position * BLOCK.size)
+        self.file.write(block)
+        if erase:
+            self.file.truncate()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+from mix_simulator.device import CharacterDevice
+
+if TYPE_CHECKING:
+    from mix_simulator.simulator import SimulatorState
+
+
+class Typewriter(CharacterDevice):
+    """The typewriter terminal (unit 19), which types or reads a line of 14 words
+    (70 characters)."""
+
+    BLOCK_SIZE = 14
+    INPUT = True
+    OUTPUT = True
+
+
+class PaperTape(CharacterDevice):
+    """The paper tape (unit 20), a line of 14 words (70 characters) per block.
+
+    IOC 0 rewinds the input tape, which needs a seekable source.
+    """
+
+    BLOCK_SIZE = 14
+    INPUT = True
+    OUTPUT = True
+
+    def control(self, state: SimulatorState, m: int) -> None:
+        if m != 0 or self.source is None:
+            super().control(state, m)
+        else:
+            self.source.seek(0)
@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from re import match
+
+from mix_simulator.assembler import Assembler, Tokens, tokenize
+from mix_simulator.image import Image
+from mix_simulator.simulator import Simulator, SimulatorState
+from mix_simulator.word import pack_word
+
+DIRECTIVES = ("EQU", "ORIG", "CON", "END", "ENTRY", "EXTERN")
+
+
+class IncrementalAssembler:
+    """Keeps an assembled image up to date as its MIXAL source is edited.
+
+    Every distinct line is only tokenized once. When an edit only changes instructions
+    (or ALF words) in place, keeping their labels, the layout and symbol table of the
+    program can not have changed, so just those lines are re-encoded against the symbol
+    table of the previous assembly. Any other edit reassembles the whole program from
+    the cached tokens.
+    """
+
+    mix_file: str
+    tokens: dict[str, Tokens]
+    lines: list[str]
+    locations: list[int]
+    here: dict[int, tuple[list[int], list[int]]]
+    symbol_table: dict[str, int]
+    literal_pool: dict[int, int]
+    image: Image
+    incremental: bool
+
+    def __init__(self, mix_file: str) -> None:
+        self.mix_file = mix_file
+        self.tokens = {}
+        self.lines = []
+        # the location counter at the start of each line
+        self.locations = []
+        # the lines each local symbol "dH" is defined on, and the values it gets there
+        self.here = {}
+        self.symbol_table = {}
+        self.literal_pool = {}
+        self.image = Image({}, 0)
+        # whether the last update avoided reassembling the whole program
+        self.incremental = False
+        # scratch memory that changed lines are re-encoded into
+        self._scratch = SimulatorState.initial_state()
+
+    def update(self) -> set[int]:
+        """Bring the image up to date with the source, returning the changed locations."""
+        lines = self._read()
+
+        words = None
+        if len(lines) == len(self.lines):
+            changed = [n for n, line in enumerate(lines) if line != self.lines[n]]
+            words = self._reassemble_lines(lines, changed)
+
+        self.incremental = words is not None
+        if words is None:
+            return self._assemble(lines)
+
+        self.lines = lines
+        updated = set()
+        image_words = dict(self.image.words)
+        for loc, packed in words.items():
+            if image_words.get(loc, 0) != packed:
+                updated.add(loc)
+            if packed:
+                image_words[loc] = packed
+            else:
+                image_words.pop(loc, None)
+        self.image = Image(image_words, self.image.start)
+
+        return updated
+
+    def _read(self) -> list[str]:
+        with open(self.mix_file, "r") as f:
+            # ignore comments (start with *) and empty lines
+            return [
+                line.rstrip() for line in f if line.strip() and not line.startswith("*")
+            ]
+
+    def _tokenize(self, line: str) -> Tokens:
+        if line not in self.tokens:
+            self.tokens[line] = tokenize(line)
+        return self.tokens[line]
+
+    def _assemble(self, lines: list[str]) -> set[int]:
+        state = SimulatorState.initial_state()
+        assembler = Assembler(self.mix_file, state)
+        locations = []
+        here: dict[int, tuple[list[int], list[int]]] = defaultdict(lambda: ([], []))
+
+        for n, line in enumerate(lines):
+            tokens = self._tokenize(line)
+            locations.append(assembler.word)
+            assembler.process_tokens(line, tokens)
+
+            loc = tokens[0]
+            if loc is not None and match(r"^[0-9]H$", loc):
+                definitions, values = here[int(loc[0])]
+                definitions.append(n)
+                values.append(assembler.here[int(loc[0])])
+
+        assembler.finish()
+
+        # only keep what is needed to re-encode a line later on
+        self.lines = lines
+        self.locations = locations
+        self.here = dict(here)
+        self.symbol_table = assembler.symbol_table
+        self.literal_pool = assembler.literal_pool
+        # forget lines that are no longer in the program
+        self.tokens = {line: self.tokens[line] for line in lines}
+
+        image = Image.from_state(state)
+        old = self.image.words
+        updated = {
+            loc
+            for loc in old.keys() | image.words.keys()
+            if old.get(loc) != image.words.get(loc)
+        }
+        self.image = image
+
+        return updated
+
+    def _reassemble_lines(
+        self, lines: list[str], changed: list[int]
+    ) -> dict[int, int] | None:
+        words = {}
+        for n in changed:
+            old, new = self._tokenize(self.lines[n]), self._tokenize(lines[n])
+
+            # the edit may have moved or redefined something
+            if old[0] != new[0] or old[1] in DIRECTIVES or new[1] in DIRECTIVES:
+                return None
+
+            assembler = Assembler(self.mix_file, self._scratch)
+            assembler.symbol_table = self.symbol_table
+            assembler.here = self._here_before(n)
+            assembler.word = self.locations[n]
+            assembler.process_tokens(lines[n], new)
+
+            # every symbol should already be known, otherwise let a full reassembly
+            # report the error
+            if assembler.fixups or assembler.pending:
+                return None
+
+            for d, chain in assembler.future_here.items():
+                value = self._here_after(d, n)
+                if value is None:
+                    return None
+                for i in chain:
+                    assembler.patch_address(i, value)
+
+            # a new literal would need to extend the literal pool
+            for value, chain in assembler.literals.items():
+                if value not in self.literal_pool:
+                    return None
+                for i in chain:
+                    assembler.patch_address(i, self.literal_pool[value])
+
+            loc = self.locations[n]
+            words[loc] = pack_word(self._scratch.memory[loc])
+
+        return words
+
+    def _here_before(self, n: int) -> dict[int, int]:
+        here = {}
+        for d, (definitions, values) in self.here.items():
+            i = bisect_left(definitions, n)
+            if i:
+                here[d] = values[i - 1]
+        return here
+
+    def _here_after(self, d: int, n: int) -> int | None:
+        if d not in self.here:
+            return None
+
+        definitions, values = self.here[d]
+        i = bisect_right(definitions, n)
+        return values[i] if i < len(values) else None
+
+
+def watch(mix_file: str, interval: float = 0.5, run: bool = True) -> None:
+    """Reassemble (and rerun) a program every time its source file is saved."""
+    assembler = IncrementalAssembler(mix_file)
+    mtime: int | None = None
+
+    while True:
+        current: int | None
+        try:
+            current = os.stat(mix_file).st_mtime_ns
+        except FileNotFoundError:
+            # an editor that saves by renaming a new file over the old one can leave no
+            # file behind for a moment, so look again on the next poll
+            current = mtime
+
+        if current != mtime:
+            mtime = current
+            began = time.perf_counter()
+
+            try:
+                updated = assembler.update()
+            except FileNotFoundError:
+                # the file went away again since it was stat'ed
+                mtime = None
+            except ValueError as e:
+                print(f"error: {e}", file=sys.stderr)
+            else:
+                elapsed = (time.perf_counter() - began) * 1000
+                action = "patched" if assembler.incremental else "reassembled"
+                print(
+                    f"{action} {len(updated)} words in {elapsed:.1f} ms",
+                    file=sys.stderr,
+                )
+
+                if run:
+                    simulator = Simulator()
+                    assembler.image.load(simulator.state)
+                    try:
+                        simulator.resume()
+                    except Exception as e:
+                        print(f"error: {e}", file=sys.stderr)
+
+        time.sleep(interval)
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Tuple
 
-from mix_simulator.byte import Byte
+from mix_simulator.byte import BIT_MASK, BITS_IN_BYTE, Byte
 
 BYTES_IN_WORD = 5
 
@@ -53,3 +53,21 @@ class Word:
 
     def compare_fields(self, lo: int, hi: int) -> Tuple[bool, Tuple[Byte, ...]]:
         return self.load_fields(lo, hi)
+
+
+WORD_SIGN_BIT = 1 << (BYTES_IN_WORD * BITS_IN_BYTE)
+
+
+def pack_word(word: Word) -> int:
+    """Packs a word into a single integer, with the sign as the highest (31st) bit."""
+    packed = WORD_SIGN_BIT if word.sign else 0
+    for i, b in enumerate((word.b5, word.b4, word.b3, word.b2, word.b1)):
+        packed |= b.val << (BITS_IN_BYTE * i)
+
+    return packed
+
+
+def unpack_word(packed: int) -> Word:
+    """Inverse of pack_word."""
+    bs = [Byte((packed >> (BITS_IN_BYTE * i)) & BIT_MASK) for i in range(4, -1, -1)]
+    return Word(bool(packed & WORD_SIGN_BIT), *bs)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+import json
+import os
+import socket
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict
+from threading import Event, Thread
+
+from mix_simulator.batch import Job, Quota, Result, run_job
+from mix_simulator.sink import DEFAULT_ALGORITHM
+
+# how many jobs go in a shard
+DEFAULT_SHARD_SIZE = 64
+# how many seconds a worker holds a shard without renewing its lease
+DEFAULT_LEASE = 60.0
+# how many seconds a worker waits before looking for shards again
+DEFAULT_POLL = 1.0
+
+PENDING = "pending"
+LEASED = "leased"
+RESULTS = "results"
+TMP = "tmp"
+
+
+class WorkQueue:
+    """Batch jobs queued in a directory that every node can reach, such as a network
+    file system, standing in for a distributed queue.
+
+    Jobs are submitted in shards: JSON lines manifests in pending/. A worker claims a
+    shard by renaming it into leased/, which only one worker can do, and holds it for
+    lease seconds from the last time it renewed the lease (the modification time of
+    the file). Once the shard is done, its results go in results/ and the lease is
+    removed. A shard whose lease ran out, because its worker crashed, is put back in
+    pending/ by reclaim for another worker to run. If the first worker finishes after
+    all, the shard just has its results written twice.
+
+    Files are written to tmp/ and renamed into place, so no one sees them half written.
+    """
+
+    root: str
+    lease: float
+
+    def __init__(self, root: str, lease: float = DEFAULT_LEASE) -> None:
+        self.root = root
+        self.lease = lease
+        for directory in (PENDING, LEASED, RESULTS, TMP):
+            os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+    def submit(self, jobs: Iterable[Job], shard_size: int = DEFAULT_SHARD_SIZE) -> int:
+        """Write the jobs to pending/ in shards of shard_size, returning how many."""
+        # shards are named after the submission, so that submissions never collide
+        submission = uuid.uuid4().hex[:8]
+        jobs = list(jobs)
+        shards = 0
+        for start in range(0, len(jobs), shard_size):
+            lines = []
+            for job in jobs[start : start + shard_size]:
+                cards = None if job.cards is None else os.path.abspath(job.cards)
+                program = os.path.abspath(job.program)
+                lines.append(json.dumps(asdict(Job(program, cards))) + "\n")
+            shard = f"{submission}-{shards:05d}.jsonl"
+            self._write(os.path.join(PENDING, shard), "".join(lines))
+            shards += 1
+
+        return shards
+
+    def claim(self) -> str | None:
+        """Lease a pending shard, returning its name, or None if there are none."""
+        for shard in sorted(os.listdir(self._path(PENDING))):
+            pending = self._path(PENDING, shard)
+            try:
+                # the lease starts before the rename, which keeps the modification
+                # time, so reclaim never sees the shard leased with an old one
+                os.utime(pending)
+                os.rename(pending, self._path(LEASED, shard))
+            except FileNotFoundError:
+                # another worker claimed it first
+                continue
+            return shard
+
+        return None
+
+    def jobs(self, shard: str) -> list[Job]:
+        with open(self._path(LEASED, shard), "r") as f:
+            return [Job(**json.loads(line)) for line in f if line.strip()]
+
+    def renew(self, shard: str) -> None:
+        """Extend the lease of a shard by another lease seconds."""
+        try:
+            os.utime(self._path(LEASED, shard))
+        except FileNotFoundError:
+            # it was reclaimed, the results will still be kept
+            pass
+
+    def complete(self, shard: str, results: Iterable[Result]) -> None:
+        """Write the results of a shard and give up its lease."""
+        self._write(
+            os.path.join(RESULTS, shard),
+            "".join(result.to_json() + "\n" for result in results),
+        )
+        try:
+            os.remove(self._path(LEASED, shard))
+        except FileNotFoundError:
+            pass
+
+    def reclaim(self) -> int:
+        """Put the shards whose lease ran out back in pending/, returning how many."""
+        reclaimed = 0
+        now = time.time()
+        for shard in os.listdir(self._path(LEASED)):
+            leased = self._path(LEASED, shard)
+            try:
+                if now - os.stat(leased).st_mtime <= self.lease:
+                    continue
+                if os.path.exists(self._path(RESULTS, shard)):
+                    os.remove(leased)
+                else:
+                    os.rename(leased, self._path(PENDING, shard))
+                    reclaimed += 1
+            except FileNotFoundError:
+                # it was completed or reclaimed in the meantime
+                continue
+
+        return reclaimed
+
+    def done(self) -> bool:
+        """Whether every shard that was submitted has its results."""
+        return not os.listdir(self._path(PENDING)) and not os.listdir(
+            self._path(LEASED)
+        )
+
+    def results(self) -> Iterator[Result]:
+        """The results of the shards that are done so far."""
+        for shard in sorted(os.listdir(self._path(RESULTS))):
+            with open(self._path(RESULTS, shard), "r") as f:
+                for line in f:
+                    yield Result.from_json(line)
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _write(self, name: str, text: str) -> None:
+        tmp = self._path(TMP, f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4()}")
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, self._path(name))
+
+
+def _heartbeat(queue: WorkQueue, shard: str, stop: Event) -> None:
+    """Renew the lease of a shard every third of the lease, until stop is set."""
+    while not stop.wait(queue.lease / 3):
+        queue.renew(shard)
+
+
+def work(
+    queue: WorkQueue,
+    algorithm: str = DEFAULT_ALGORITHM,
+    poll: float = DEFAULT_POLL,
+    quota: Quota | None = None,
+) -> int:
+    """Run shards from queue until every shard is done, returning how many this
+    worker ran. While a shard runs its lease is renewed in the background, so a job
+    that might not halt needs a quota. While other workers hold the last shards, this
+    worker waits to reclaim any of theirs whose lease runs out."""
+    shards = 0
+    while True:
+        shard = queue.claim()
+        if shard is None:
+            if queue.reclaim():
+                continue
+            if queue.done():
+                return shards
+            time.sleep(poll)
+            continue
+
+        try:
+            jobs = queue.jobs(shard)
+        except FileNotFoundError:
+            # the lease ran out before the shard was read, another worker runs it
+            continue
+
+        stop = Event()
+        thread = Thread(target=_heartbeat, args=(queue, shard, stop), daemon=True)
+        thread.start()
+        try:
+            results = [run_job(job, algorithm, quota) for job in jobs]
+        finally:
+            stop.set()
+            thread.join()
+        queue.complete(shard, results)
+        shards += 1
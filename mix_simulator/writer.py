@@ -0,0 +1,79 @@
+from collections.abc import Callable
+from queue import Queue
+from threading import Thread
+
+DEFAULT_QUEUE_SIZE = 64
+
+# what the writer thread is handed: a write to carry out, or None to stop
+Write = Callable[[], None] | None
+
+
+class Writer:
+    """A thread that carries out writes to the host while the program keeps running.
+
+    Writes are queued in order, up to queue_size of them, so submit only blocks when
+    the thread has fallen that far behind. The thread is started by the first submit.
+    If a write fails, the error is raised by the next submit, join or close and the
+    writes queued after it are dropped.
+    """
+
+    queue_size: int
+    writes: Queue[Write] | None
+    thread: Thread | None
+    error: Exception | None
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self.writes = None
+        self.thread = None
+        self.error = None
+
+    def submit(self, write: Callable[[], None]) -> None:
+        self._raise()
+        if self.writes is None:
+            self.writes = Queue(self.queue_size)
+            self.thread = Thread(target=self._run, args=(self.writes,), daemon=True)
+            self.thread.start()
+
+        self.writes.put(write)
+
+    def full(self) -> bool:
+        """Whether a submit would block until the thread has caught up."""
+        return self.writes is not None and self.writes.full()
+
+    def idle(self) -> bool:
+        """Whether every write that was submitted has been carried out."""
+        return self.writes is None or not self.writes.unfinished_tasks
+
+    def join(self) -> None:
+        """Wait until every write that was submitted has been carried out."""
+        if self.writes is not None:
+            self.writes.join()
+        self._raise()
+
+    def close(self) -> None:
+        """Carry out the remaining writes and stop the thread."""
+        if self.writes is not None and self.thread is not None:
+            self.writes.put(None)
+            self.thread.join()
+            self.writes = None
+            self.thread = None
+        self._raise()
+
+    def _raise(self) -> None:
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def _run(self, writes: Queue[Write]) -> None:
+        while True:
+            write = writes.get()
+            try:
+                if write is None:
+                    return
+                if self.error is None:
+                    write()
+            except Exception as e:
+                self.error = e
+            finally:
+                writes.task_done()
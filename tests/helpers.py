@@ -0,0 +1,49 @@
+"""Programs and temporary files shared by the tests that run whole programs."""
+
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+# print the first card
+ECHO = """        ORIG    100
+START   IN      1000(16)
+        JBUS    *(16)
+        OUT     1000(18)
+        HLT
+        END     START
+"""
+
+# count 1000 down to 0 in 1000, then print 1000-1015
+COUNT = """        ORIG    100
+START   LDA     1000
+        JAZ     *+2
+        JMP     *+2
+        ENTA    1000
+LOOP    DECA    1
+        STA     1000
+        JAP     LOOP
+        OUT     1000(18)
+        HLT
+        END     START
+"""
+
+# never halts
+FOREVER = """        ORIG    100
+START   JMP     *
+        END     START
+"""
+
+
+def temporary_directory(test: TestCase) -> str:
+    """A directory that is removed once the test is done."""
+    directory = TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return directory.name
+
+
+def write(directory: str, name: str, text: str) -> str:
+    """Write a file in directory, returning its path."""
+    filename = path.join(directory, name)
+    with open(filename, "w") as f:
+        f.write(text)
+    return filename
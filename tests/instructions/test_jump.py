@@ -258,3 +258,22 @@ class TestJump(TestCase):
 
         self.assertEqual(expected, STATE.program_counter)
         self.assertEqual(j, STATE.rJ)
+
+    def test_execute_jred(self) -> None:
+        # devices finish their work straight away, so they are always ready
+        instruction = Instruction(2000, 0, 16, OpCode.JRED, STATE)
+        expected = 2000
+        j = JumpRegister(Byte(15), Byte(40))
+
+        instruction.execute()
+
+        self.assertEqual(expected, STATE.program_counter)
+        self.assertEqual(j, STATE.rJ)
+
+    def test_execute_jbus(self) -> None:
+        instruction = Instruction(2000, 0, 16, OpCode.JBUS, STATE)
+        expected = 1000
+
+        instruction.execute()
+
+        self.assertEqual(expected, STATE.program_counter)
@@ -1,10 +1,10 @@
 from unittest import TestCase
 from unittest.mock import mock_open, patch
 
-from mix_simulator.byte import Byte
+from mix_simulator.byte import Byte, bytes_to_int
 from mix_simulator.assembler import Assembler
 from mix_simulator.simulator import SimulatorState
-from mix_simulator.word import Word
+from mix_simulator.word import Word, pack_word
 
 from parameterized import parameterized  # type: ignore
 
@@ -59,8 +59,149 @@ EXIT        HLT"""
 
         assembler = Assembler("maximum.mix", state)
         with patch("builtins.open", mock_open(read_data=program)):
-            instructions = assembler.parse_program()
-            assembler.write_program_to_memory(instructions)
+            assembler.parse_program()
 
         for i, word in enumerate(expected):
             self.assertEqual(word, state.memory[i])
+
+    def test_assemble_future_references(self) -> None:
+        program = """            ORIG    100
+START       JMP     LATER
+2H          J1Z     2F
+            JMP     2B
+2H          NOP
+LATER       JMP     2B
+            HLT"""
+        state = SimulatorState.initial_state()
+
+        assembler = Assembler("future.mix", state)
+        with patch("builtins.open", mock_open(read_data=program)):
+            assembler.parse_program()
+
+        self.assertEqual(
+            Word(False, Byte(1), Byte(40), Byte(0), Byte(0), Byte(39)),
+            state.memory[100],
+        )
+        self.assertEqual(
+            Word(False, Byte(1), Byte(39), Byte(0), Byte(1), Byte(41)),
+            state.memory[101],
+        )
+        self.assertEqual(
+            Word(False, Byte(1), Byte(37), Byte(0), Byte(0), Byte(39)),
+            state.memory[102],
+        )
+        self.assertEqual(
+            Word(False, Byte(1), Byte(39), Byte(0), Byte(0), Byte(39)),
+            state.memory[104],
+        )
+        self.assertEqual({}, assembler.fixups)
+        self.assertEqual({}, assembler.future_here)
+
+    def test_assemble_future_expressions(self) -> None:
+        program = """            ORIG    100
+START       LDA     BUF+1
+            LDA     -BUF
+            LDA     BUF,IDX(FLD)
+2H          JMP     2F+1
+            JMP     LATER-2B
+2H          NOP
+LATER       JMP     LATER+1
+BUF         EQU     1000
+IDX         EQU     2
+FLD         EQU     1:5"""
+        state = SimulatorState.initial_state()
+
+        assembler = Assembler("future.mix", state)
+        with patch("builtins.open", mock_open(read_data=program)):
+            assembler.parse_program()
+
+        def parts(word: Word) -> tuple[int, int, int]:
+            address = bytes_to_int((word.b1, word.b2), word.sign)
+            return address, word.b3.val, word.b4.val
+
+        self.assertEqual((1001, 0, 5), parts(state.memory[100]))
+        self.assertEqual((-1000, 0, 5), parts(state.memory[101]))
+        self.assertEqual((1000, 2, 13), parts(state.memory[102]))
+        self.assertEqual((106, 0, 0), parts(state.memory[103]))
+        # 2B is the definition before the expression, not the one after it
+        self.assertEqual((3, 0, 0), parts(state.memory[104]))
+        self.assertEqual((107, 0, 0), parts(state.memory[106]))
+        self.assertEqual({}, assembler.pending)
+
+    @parameterized.expand(
+        [
+            ("            JMP     NOWHERE",),
+            ("            JMP     3F",),
+            ("            JMP     3B",),
+            ("            JMP     NOWHERE+1",),
+            ("            JMP     *,NOWHERE",),
+            ("            JMP     3F-1",),
+            ("            LDA     =NOWHERE=",),
+        ]
+    )
+    def test_assemble_undefined_symbol(self, program: str) -> None:
+        assembler = Assembler("undefined.mix", SimulatorState.initial_state())
+
+        with patch("builtins.open", mock_open(read_data=program)):
+            with self.assertRaises(ValueError):
+                assembler.parse_program()
+
+    def test_assemble_literal_pool(self) -> None:
+        program = """            ORIG    100
+START       LDA     =1=
+            LDX     =2=
+            ADD     =1=
+            HLT
+            END     START"""
+        state = SimulatorState.initial_state()
+
+        assembler = Assembler("literals.mix", state, listing=True)
+        with patch("builtins.open", mock_open(read_data=program)):
+            assembler.parse_program()
+
+        # the pool follows the last assembled word, one word per distinct literal
+        self.assertEqual({1: 104, 2: 105}, assembler.literal_pool)
+        self.assertEqual(
+            Word(False, Byte(0), Byte(0), Byte(0), Byte(0), Byte(1)), state.memory[104]
+        )
+        self.assertEqual(
+            Word(False, Byte(0), Byte(0), Byte(0), Byte(0), Byte(2)), state.memory[105]
+        )
+        self.assertEqual(
+            104, bytes_to_int((state.memory[100].b1, state.memory[100].b2))
+        )
+        self.assertEqual(
+            105, bytes_to_int((state.memory[101].b1, state.memory[101].b2))
+        )
+        self.assertEqual(
+            104, bytes_to_int((state.memory[102].b1, state.memory[102].b2))
+        )
+
+        listing = assembler.format_listing()
+        self.assertEqual("0104: + 0000 00 00 01  =1=", listing[-2])
+        self.assertEqual("0105: + 0000 00 00 02  =2=", listing[-1])
+
+    def test_assemble_future_literals(self) -> None:
+        program = """            ORIG    100
+START       LDA     =BUF=
+            ADD     =BUF+1=
+            LDX     =1000=
+            HLT
+BUF         EQU     1000
+            END     START"""
+        state = SimulatorState.initial_state()
+
+        assembler = Assembler("literals.mix", state)
+        with patch("builtins.open", mock_open(read_data=program)):
+            assembler.parse_program()
+
+        # =BUF= is interned once BUF is defined, along with the equal =1000=
+        self.assertEqual({1000: 104, 1001: 105}, assembler.literal_pool)
+        self.assertEqual(
+            [104, 105, 104],
+            [
+                bytes_to_int((state.memory[i].b1, state.memory[i].b2))
+                for i in range(100, 103)
+            ],
+        )
+        self.assertEqual(1001, pack_word(state.memory[105]))
@@ -0,0 +1,99 @@
+import json
+from hashlib import sha256
+from os import path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mix_simulator.batch import (
+    Job,
+    Quota,
+    find_jobs,
+    program_image,
+    read_manifest,
+    run_batch,
+    run_job,
+)
+from mix_simulator.devices import Devices
+from tests.helpers import ECHO, FOREVER, temporary_directory, write
+
+
+class TestBatch(TestCase):
+    def setUp(self) -> None:
+        self.directory = temporary_directory(self)
+        self.program = write(self.directory, "echo.mix", ECHO)
+        self.cards = write(self.directory, "echo.cards", "HELLO\n")
+
+    def test_run_job(self) -> None:
+        result = run_job(Job(self.program, self.cards))
+
+        self.assertEqual("ok", result.status)
+        self.assertEqual(4, result.instructions)
+        line = ("HELLO" + " " * 115 + "\n").encode()
+        self.assertEqual(
+            f"sha256:{sha256(line).hexdigest()} 121 bytes", result.digests[18]
+        )
+
+    def test_only_digest_devices(self) -> None:
+        # once the program is assembled, each job runs on the digested units alone,
+        # without building the standard ones
+        program_image(self.program)
+        with patch.object(Devices, "standard", side_effect=AssertionError):
+            result = run_job(Job(self.program, self.cards))
+
+        self.assertEqual("ok", result.status)
+
+    def test_no_cards(self) -> None:
+        result = run_job(Job(self.program))
+
+        self.assertEqual("error", result.status)
+        self.assertEqual("ValueError: CardReader has no more cards", result.error)
+
+    def test_missing_cards(self) -> None:
+        cards = path.join(self.directory, "missing.cards")
+        result = run_job(Job(self.program, cards))
+
+        self.assertEqual("error", result.status)
+        self.assertRegex(str(result.error), "^FileNotFoundError")
+
+    def test_quota(self) -> None:
+        forever = write(self.directory, "forever.mix", FOREVER)
+        jobs = [Job(forever), Job(self.program, self.cards)]
+        results = list(run_batch(jobs, workers=2, quota=Quota(instructions=5000)))
+
+        results.sort(key=lambda result: result.program)
+        self.assertEqual(["ok", "error"], [result.status for result in results])
+        self.assertEqual(
+            (5000, "QuotaExceeded: More than 5000 instructions"),
+            (results[1].instructions, results[1].error),
+        )
+
+        result = run_job(Job(forever), quota=Quota(time=10000))
+        self.assertEqual("QuotaExceeded: More than 10000u", result.error)
+
+    def test_manifest(self) -> None:
+        manifest = write(
+            self.directory,
+            "jobs.jsonl",
+            '{"program": "echo.mix", "cards": "echo.cards"}\n\n{"program": "echo.mix"}\n',
+        )
+
+        self.assertEqual(
+            [Job(self.program, self.cards), Job(self.program)], read_manifest(manifest)
+        )
+
+    def test_find_jobs(self) -> None:
+        self.assertEqual(
+            [Job(self.program)], find_jobs([path.join(self.directory, "*.mix")])
+        )
+        with self.assertRaises(ValueError):
+            find_jobs([path.join(self.directory, "*.mixi")])
+
+    def test_run_batch(self) -> None:
+        jobs = [Job(self.program, self.cards)] * 3 + [Job(self.program)]
+        results = list(run_batch(jobs, workers=2))
+
+        statuses = sorted(result.status for result in results)
+        self.assertEqual(["error", "ok", "ok", "ok"], statuses)
+        # the digests are keyed by unit, which JSON makes a string
+        ok = next(result for result in results if result.status == "ok")
+        self.assertIn("18", json.loads(ok.to_json())["digests"])
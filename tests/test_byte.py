@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import Tuple
 from unittest import TestCase
 
 from mix_simulator.byte import Byte, bytes_to_int, int_to_bytes
@@ -22,19 +22,19 @@ class TestByte(TestCase):
 
     @parameterized.expand(
         [
-            (3241, 0, (False, [Byte(41), Byte(50)])),
-            (-3241, 0, (True, [Byte(41), Byte(50)])),
+            (3241, 0, (False, (Byte(41), Byte(50)))),
+            (-3241, 0, (True, (Byte(41), Byte(50)))),
             (
                 1_073_741_823,
                 0,
-                (False, [Byte(63), Byte(63), Byte(63), Byte(63), Byte(63)]),
+                (False, (Byte(63), Byte(63), Byte(63), Byte(63), Byte(63))),
             ),
-            (3241, 5, (False, [Byte(41), Byte(50), Byte(0), Byte(0), Byte(0)])),
-            (-3241, 5, (True, [Byte(41), Byte(50), Byte(0), Byte(0), Byte(0)])),
+            (3241, 5, (False, (Byte(41), Byte(50), Byte(0), Byte(0), Byte(0)))),
+            (-3241, 5, (True, (Byte(41), Byte(50), Byte(0), Byte(0), Byte(0)))),
         ]
     )
     def test_int_to_bytes(
-        self, test_input: int, padding: int, expected: List[Byte]
+        self, test_input: int, padding: int, expected: Tuple[bool, Tuple[Byte, ...]]
     ) -> None:
         esign, edata = expected
 
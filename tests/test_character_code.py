@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from mix_simulator.byte import Byte
+from mix_simulator.character_code import (
+    alphabet,
+    bytes_to_text,
+    codes_to_text,
+    text_to_bytes,
+    text_to_codes,
+    text_to_words,
+    words_to_text,
+)
+
+
+class TestCharacterCode(TestCase):
+    def test_alphabet(self) -> None:
+        codes = text_to_codes(alphabet)
+
+        self.assertEqual(bytes(range(len(alphabet))), codes)
+        self.assertEqual(alphabet, codes_to_text(codes))
+
+    def test_greek_letters(self) -> None:
+        self.assertEqual([Byte(10), Byte(20), Byte(21)], text_to_bytes("ΔΣΠ"))
+        self.assertEqual("ΔΣΠ", bytes_to_text([Byte(10), Byte(20), Byte(21)]))
+
+    def test_unknown_character(self) -> None:
+        with self.assertRaises(ValueError):
+            text_to_codes("MIXal")
+
+    def test_unknown_code(self) -> None:
+        # there are no characters for codes 56-63
+        for code in (56, 63):
+            with self.assertRaises(ValueError):
+                codes_to_text(bytes([0, code]))
+
+    def test_words(self) -> None:
+        words = text_to_words("PRIME NUMBERS", 3)
+
+        self.assertEqual("PRIME NUMBERS  ", words_to_text(words))
+        with self.assertRaises(ValueError):
+            text_to_words("TOO LONG", 1)
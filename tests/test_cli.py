@@ -0,0 +1,114 @@
+import json
+import subprocess
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+from os import path
+from unittest import TestCase
+
+from mix_simulator import cli, service, workqueue
+from mix_simulator.cli import execute
+from tests.helpers import temporary_directory, write
+
+# print HELLO, after counting down from the value in 1000
+PROGRAM = """        ORIG    100
+START   LD1     1000
+        J1Z     *+3
+        DEC1    1
+        J1P     *-1
+        OUT     MSG(18)
+        JBUS    *(18)
+        HLT
+MSG     ALF     HELLO
+        END     START
+"""
+
+
+class TestCli(TestCase):
+    def setUp(self) -> None:
+        self.directory = temporary_directory(self)
+        self.program = write(self.directory, "hello.mix", PROGRAM)
+
+    def _execute(self, *argv: str) -> list[str]:
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            self.assertEqual(0, execute(list(argv)))
+        return stdout.getvalue().splitlines()
+
+    def test_run(self) -> None:
+        # "run" can be left out
+        for argv in (["run", self.program], [self.program]):
+            self.assertEqual(
+                ["HELLO"], [line.rstrip() for line in self._execute(*argv)]
+            )
+
+    def test_listing(self) -> None:
+        lines = self._execute("run", self.program, "--listing")
+
+        self.assertEqual(len(PROGRAM.splitlines()), len(lines))
+        self.assertEqual("0100: + 1000 00 05 09  START   LD1     1000", lines[1])
+
+    def test_digest(self) -> None:
+        lines = self._execute(self.program, "--digest", "--keep-lines", "1")
+
+        # the card punch, which is digested too, punched nothing
+        self.assertRegex(lines[0], "^unit 17: sha256:[0-9a-f]{64} 0 bytes$")
+        self.assertRegex(lines[1], "^unit 18: sha256:[0-9a-f]{64} 121 bytes$")
+        self.assertEqual("  HELLO", lines[2].rstrip())
+
+    def test_batch(self) -> None:
+        [line] = self._execute("batch", self.program, "--workers", "1")
+        result = json.loads(line)
+
+        self.assertEqual(("ok", 5), (result["status"], result["instructions"]))
+        self.assertIn("18", result["digests"])
+
+    def test_sweep(self) -> None:
+        patches = write(
+            self.directory,
+            "patches.jsonl",
+            '{"memory": {"1000": 2}}\n{"memory": {"1000": 4}}\n',
+        )
+        lines = self._execute(
+            "sweep", self.program, "--patches", patches, "--workers", "1", "--runs"
+        )
+
+        self.assertEqual(
+            [9, 13], [json.loads(line)["instructions"] for line in lines[:2]]
+        )
+        summary = json.loads(lines[2])
+        self.assertEqual({"min": 9, "mean": 11, "max": 13}, summary["instructions"])
+
+    def test_worker_and_reduce(self) -> None:
+        queue = path.join(self.directory, "queue")
+        [line] = self._execute("batch", self.program, self.program, "--queue", queue)
+        self.assertEqual({"jobs": 2, "shards": 1}, json.loads(line))
+
+        [line] = self._execute("worker", queue, "--max-instructions", "3")
+        self.assertEqual({"shards": 1}, json.loads(line))
+
+        lines = self._execute("reduce", queue, "--runs")
+        self.assertEqual(
+            ["QuotaExceeded: More than 3 instructions"] * 2,
+            [json.loads(line)["error"] for line in lines[:2]],
+        )
+        self.assertEqual({"runs": 2, "errors": 2}, json.loads(lines[2]))
+
+    def test_defaults(self) -> None:
+        # the defaults are repeated so the modules are not imported for the help
+        self.assertEqual(workqueue.DEFAULT_SHARD_SIZE, cli.DEFAULT_SHARD_SIZE)
+        self.assertEqual(workqueue.DEFAULT_LEASE, cli.DEFAULT_LEASE)
+        self.assertEqual(service.DEFAULT_PROGRAMS, cli.DEFAULT_PROGRAMS)
+
+    def test_startup_imports(self) -> None:
+        # running a program does not wait on importing the other commands' modules
+        code = "import sys, mix_simulator.cli; print(sorted(sys.modules))"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=path.dirname(path.dirname(path.abspath(__file__))),
+        ).stdout
+        for module in ("asyncio", "concurrent", "mix_simulator.batch"):
+            self.assertNotIn(f"'{module}'", output)
@@ -0,0 +1,454 @@
+import os
+from collections.abc import Iterator
+from hashlib import sha256
+from io import StringIO
+from mmap import mmap
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from mix_simulator.byte import Byte
+from mix_simulator.card import CardPunch, CardReader
+from mix_simulator.devices import NEVER
+from mix_simulator.character_code import char_to_byte
+from mix_simulator.device import Device
+from mix_simulator.disk import FileDisk
+from mix_simulator.instruction import Instruction
+from mix_simulator.opcode import OpCode
+from mix_simulator.simulator import Simulator, SimulatorState
+from mix_simulator.sink import MemorySink, NullSink
+from mix_simulator.tape import BLOCK, FileTape, Tape
+from mix_simulator.printer import LinePrinter
+from mix_simulator.typewriter import PaperTape
+from mix_simulator.word import Word, pack_word
+
+
+def text(s: str) -> Word:
+    return Word(False, *(char_to_byte(c) for c in s))
+
+
+class TestDevices(TestCase):
+    def setUp(self) -> None:
+        self.state = SimulatorState.initial_state()
+
+    def test_standard_units(self) -> None:
+        for unit in range(21):
+            self.assertIsInstance(self.state.devices[unit], Device)
+
+    def test_unknown_unit(self) -> None:
+        with self.assertRaises(ValueError):
+            self.state.devices[21] = Device()
+        with self.assertRaises(ValueError):
+            Instruction(1000, 0, 21, OpCode.IN, self.state).execute()
+
+
+class TestTape(TestCase):
+    def setUp(self) -> None:
+        self.state = SimulatorState.initial_state()
+        for i in range(300):
+            self.state.memory[i] = Word(
+                False, *(Byte(0),) * 3, *(Byte(b) for b in divmod(i, 64))
+            )
+
+    def out(self, address: int) -> None:
+        Instruction(address, 0, 2, OpCode.OUT, self.state).execute()
+
+    def into(self, address: int) -> None:
+        Instruction(address, 0, 2, OpCode.IN, self.state).execute()
+
+    def test_round_trip(self) -> None:
+        self.out(0)
+        self.out(100)
+        Instruction(0, 0, 2, OpCode.IOC, self.state).execute()
+        self.into(1000)
+        self.into(1100)
+
+        for i in range(200):
+            self.assertEqual(self.state.memory[i], self.state.memory[1000 + i])
+
+        # the words on tape don't change along with memory
+        self.state.memory[0].sign = True
+        Instruction(0, 0, 2, OpCode.IOC, self.state).execute()
+        self.into(2000)
+        self.assertFalse(self.state.memory[2000].sign)
+        self.assertIsNot(self.state.memory[2000], self.state.memory[1000])
+
+    def test_skip(self) -> None:
+        for address in (0, 100, 200):
+            self.out(address)
+
+        # skip back two blocks, then forward one
+        self.state.rI1.update(True, Byte(2), Byte(0))
+        Instruction(0, 1, 2, OpCode.IOC, self.state).execute()
+        Instruction(1, 0, 2, OpCode.IOC, self.state).execute()
+        self.into(1000)
+
+        self.assertEqual(self.state.memory[200], self.state.memory[1000])
+
+    def test_write_truncates(self) -> None:
+        self.out(0)
+        self.out(100)
+        Instruction(0, 0, 2, OpCode.IOC, self.state).execute()
+        self.out(200)
+
+        # the second block was erased
+        with self.assertRaises(ValueError):
+            self.into(1000)
+
+    def test_read_past_end(self) -> None:
+        with self.assertRaises(ValueError):
+            self.into(1000)
+
+    def test_digest(self) -> None:
+        self.out(0)
+        self.out(100)
+        tape = self.state.devices[2]
+        assert isinstance(tape, Tape)
+
+        # the same as hashing the blocks laid out in a tape file
+        words = [pack_word(self.state.memory[i]) for i in range(200)]
+        expected = sha256(BLOCK.pack(*words[:100]) + BLOCK.pack(*words[100:]))
+        self.assertEqual(expected.hexdigest(), tape.digest("sha256").hexdigest())
+
+
+class TestFileTape(TestTape):
+    """The same behaviour as an in-memory tape, but kept in a file."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "work.tape")
+        self.state.devices[2] = FileTape(self.filename)
+
+    def tearDown(self) -> None:
+        self.state.devices.close()
+        self.directory.cleanup()
+
+    def test_layout(self) -> None:
+        for address in (0, 100, 200):
+            self.out(address)
+        self.state.devices.flush()
+        self.assertEqual(3 * BLOCK.size, os.path.getsize(self.filename))
+
+        # erasing the rest of the tape shortens the file
+        Instruction(0, 0, 2, OpCode.IOC, self.state).execute()
+        self.out(0)
+        self.state.devices.flush()
+        self.assertEqual(BLOCK.size, os.path.getsize(self.filename))
+
+    def test_reopen(self) -> None:
+        self.out(100)
+        self.state.devices.close()
+
+        self.state.devices[2] = FileTape(self.filename)
+        self.into(1000)
+        self.assertEqual(self.state.memory[100], self.state.memory[1000])
+
+    def test_not_a_tape(self) -> None:
+        with open(self.filename, "wb") as f:
+            f.write(b"not a tape")
+
+        with self.assertRaises(ValueError):
+            FileTape(self.filename)
+
+
+class TestDisk(TestCase):
+    def setUp(self) -> None:
+        self.state = SimulatorState.initial_state()
+        self.state.memory[0] = Word(True, Byte(1), Byte(2), Byte(3), Byte(4), Byte(5))
+
+    def test_round_trip(self) -> None:
+        # write block 7, then read it back from the same place
+        self.state.rX.update(False, Byte(7), Byte(0), Byte(0), Byte(0), Byte(0))
+        Instruction(0, 0, 8, OpCode.OUT, self.state).execute()
+        Instruction(0, 0, 8, OpCode.IOC, self.state).execute()
+        Instruction(1000, 0, 8, OpCode.IN, self.state).execute()
+
+        self.assertEqual(self.state.memory[0], self.state.memory[1000])
+
+    def test_unwritten_block(self) -> None:
+        self.state.memory[1000] = Word(True, *(Byte(1),) * 5)
+        Instruction(1000, 0, 9, OpCode.IN, self.state).execute()
+
+        self.assertEqual(0, pack_word(self.state.memory[1000]))
+
+    def test_seek_m(self) -> None:
+        with self.assertRaises(ValueError):
+            Instruction(1, 0, 8, OpCode.IOC, self.state).execute()
+
+
+class TestFileDisk(TestDisk):
+    """The same behaviour as an in-memory disk, but mapped from a file."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "hash.disk")
+        self.disk = FileDisk(self.filename, cache_blocks=2)
+        self.state.devices[8] = self.disk
+        self.state.devices[9] = FileDisk(os.path.join(self.directory.name, "9.disk"))
+
+    def tearDown(self) -> None:
+        self.state.devices.close()
+        self.directory.cleanup()
+
+    def seek(self, block: int) -> None:
+        self.state.rX.update(False, Byte(block), Byte(0), Byte(0), Byte(0), Byte(0))
+
+    def test_extend(self) -> None:
+        self.seek(3)
+        Instruction(0, 0, 8, OpCode.OUT, self.state).execute()
+        self.state.devices.flush()
+        self.assertEqual(4 * BLOCK.size, os.path.getsize(self.filename))
+
+        # the blocks in between hold +0
+        self.state.memory[1000] = self.state.memory[0]
+        self.seek(1)
+        Instruction(1000, 0, 8, OpCode.IN, self.state).execute()
+        self.assertEqual(0, pack_word(self.state.memory[1000]))
+
+    def test_extend_geometrically(self) -> None:
+        with patch("mix_simulator.disk.mmap", wraps=mmap) as remap:
+            for block in range(10):
+                self.seek(block)
+                Instruction(0, 0, 8, OpCode.OUT, self.state).execute()
+
+        # the file doubles in size rather than growing a block at a time
+        self.assertEqual(5, remap.call_count)
+        self.assertEqual(16 * BLOCK.size, os.path.getsize(self.filename))
+
+    def test_cache(self) -> None:
+        for block in (0, 0, 1, 0, 2):
+            self.seek(block)
+            Instruction(1000, 0, 8, OpCode.IN, self.state).execute()
+
+        # 1 was evicted when 2 was read, since 0 was used more recently
+        self.assertEqual([0, 2], list(self.disk.cache.blocks))
+
+        # a block read from the cache is a copy
+        self.seek(2)
+        Instruction(1000, 0, 8, OpCode.IN, self.state).execute()
+        Instruction(1100, 0, 8, OpCode.IN, self.state).execute()
+        self.assertIsNot(self.state.memory[1000], self.state.memory[1100])
+
+    def test_write_invalidates_cache(self) -> None:
+        Instruction(1000, 0, 8, OpCode.IN, self.state).execute()
+        Instruction(0, 0, 8, OpCode.OUT, self.state).execute()
+        Instruction(1000, 0, 8, OpCode.IN, self.state).execute()
+
+        self.assertEqual(self.state.memory[0], self.state.memory[1000])
+
+    def test_shared_file(self) -> None:
+        Instruction(0, 0, 8, OpCode.OUT, self.state).execute()
+
+        # another simulation of the same disk sees the block straight away
+        state = SimulatorState.initial_state()
+        state.devices[8] = FileDisk(self.filename)
+        Instruction(1000, 0, 8, OpCode.IN, state).execute()
+        state.devices.close()
+
+        self.assertEqual(self.state.memory[0], state.memory[1000])
+
+
+class TestCharacterDevices(TestCase):
+    def setUp(self) -> None:
+        self.state = SimulatorState.initial_state()
+
+    def test_card_reader(self) -> None:
+        self.state.devices[16] = CardReader(StringIO("HELLO WORLD\n"))
+        Instruction(1000, 0, 16, OpCode.IN, self.state).execute()
+
+        self.assertEqual(text("HELLO"), self.state.memory[1000])
+        self.assertEqual(text(" WORL"), self.state.memory[1001])
+        self.assertEqual(text("D    "), self.state.memory[1002])
+        self.assertEqual(text("     "), self.state.memory[1015])
+
+        # out of cards
+        with self.assertRaises(ValueError):
+            Instruction(1000, 0, 16, OpCode.IN, self.state).execute()
+
+    def test_card_file(self) -> None:
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "deck.cards")
+            with open(filename, "w") as f:
+                f.write("CARD\n" * 1000)
+
+            cards = open(filename)
+            reader = CardReader(cards, read_ahead=10)
+            self.state.devices[16] = reader
+            Instruction(1000, 0, 16, OpCode.IN, self.state).execute()
+            self.state.devices.close()
+
+            self.assertTrue(cards.closed)
+            self.assertEqual(text("CARD "), self.state.memory[1000])
+
+    def test_card_iterator(self) -> None:
+        cards = (f"CARD {n}" for n in range(1000))
+        reader = CardReader(cards, read_ahead=10)
+        self.state.devices[16] = reader
+        for _ in range(3):
+            Instruction(1000, 0, 16, OpCode.IN, self.state).execute()
+
+        self.assertEqual(text("CARD "), self.state.memory[1000])
+        self.assertEqual(text("2    "), self.state.memory[1001])
+
+        # only a bounded number of cards is read ahead
+        assert reader.cards is not None
+        self.assertLessEqual(reader.cards.qsize(), 10)
+        reader.close()
+
+    def test_cards_are_read_lazily(self) -> None:
+        # nothing is read from the source until the program reads a card
+        def cards() -> Iterator[str]:
+            raise AssertionError("read before IN")
+            yield ""
+
+        self.state.devices[16] = CardReader(cards())
+        self.state.devices.close()
+
+    def test_bad_card(self) -> None:
+        self.state.devices[16] = CardReader(["GOOD", "bad", "GOOD"])
+        Instruction(1000, 0, 16, OpCode.IN, self.state).execute()
+        with self.assertRaises(ValueError):
+            Instruction(1000, 0, 16, OpCode.IN, self.state).execute()
+        with self.assertRaises(ValueError):
+            Instruction(1000, 0, 16, OpCode.IN, self.state).execute()
+
+    def test_card_too_long(self) -> None:
+        self.state.devices[16] = CardReader(StringIO("X" * 81))
+        with self.assertRaises(ValueError):
+            Instruction(1000, 0, 16, OpCode.IN, self.state).execute()
+
+    def test_unknown_character(self) -> None:
+        self.state.devices[16] = CardReader(StringIO("hello"))
+        with self.assertRaises(ValueError):
+            Instruction(1000, 0, 16, OpCode.IN, self.state).execute()
+
+    def test_card_punch(self) -> None:
+        sink = MemorySink()
+        self.state.devices[17] = CardPunch(sink=sink)
+        self.state.memory[1000] = text("PUNCH")
+        Instruction(1000, 0, 17, OpCode.OUT, self.state).execute()
+
+        self.assertEqual("PUNCH" + " " * 75 + "\n", sink.getvalue())
+
+        with self.assertRaises(ValueError):
+            Instruction(1000, 0, 17, OpCode.IN, self.state).execute()
+
+    def test_paper_tape_rewind(self) -> None:
+        self.state.devices[20] = PaperTape(StringIO("FIRST\nSECOND\n"))
+        Instruction(1000, 0, 20, OpCode.IN, self.state).execute()
+        Instruction(0, 0, 20, OpCode.IOC, self.state).execute()
+        Instruction(2000, 0, 20, OpCode.IN, self.state).execute()
+
+        self.assertEqual(text("FIRST"), self.state.memory[2000])
+
+    def test_reset_rewinds(self) -> None:
+        source = StringIO("FIRST\nSECOND\n")
+        self.state.devices[20] = PaperTape(source)
+        Instruction(1000, 0, 20, OpCode.IN, self.state).execute()
+        self.state.devices.reset()
+        Instruction(2000, 0, 20, OpCode.IN, self.state).execute()
+
+        self.assertFalse(source.closed)
+        self.assertEqual(text("FIRST"), self.state.memory[2000])
+
+
+class TestTiming(TestCase):
+    def setUp(self) -> None:
+        self.simulator = Simulator()
+        self.state = self.simulator.state
+        self.printer = LinePrinter(NullSink())
+        self.printer.latency = 100
+        self.printer.transfer = 20
+        self.state.devices[18] = self.printer
+
+    def test_busy(self) -> None:
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+        self.assertTrue(self.printer.busy)
+        self.assertEqual(120, self.state.devices.next_event)
+
+        self.state.program_counter = 5
+        Instruction(2000, 0, 18, OpCode.JBUS, self.state).execute()
+        self.assertEqual(2000, self.state.program_counter)
+
+        self.state.devices.complete(119)
+        self.assertTrue(self.printer.busy)
+        self.state.devices.complete(120)
+        self.assertFalse(self.printer.busy)
+        self.assertEqual(NEVER, self.state.devices.next_event)
+
+        Instruction(3000, 0, 18, OpCode.JRED, self.state).execute()
+        self.assertEqual(3000, self.state.program_counter)
+
+    def test_wait_for_busy_unit(self) -> None:
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+        self.state.clock = 10
+
+        # the second line waits for the first, IOC only takes the latency
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+        self.assertEqual(120, self.state.clock)
+        Instruction(0, 0, 18, OpCode.IOC, self.state).execute()
+        self.assertEqual(240, self.state.clock)
+        self.assertEqual(340, self.printer.ready_at)
+
+    def test_run(self) -> None:
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "busy.mix")
+            with open(filename, "w") as f:
+                f.write(
+                    " ORIG 100\nSTART OUT 1000(18)\n JBUS *(18)\n HLT\n END START\n"
+                )
+            self.simulator.run(filename)
+
+        # OUT (1u), then JBUS (1u) until the printer is done at 120, then HLT (10u)
+        self.assertEqual(121 + 10, self.state.clock)
+
+    def run_program(self, program: str, fast_forward: bool) -> tuple[int, int]:
+        """The clock and number of instructions after running program."""
+        simulator = Simulator(fast_forward)
+        printer = LinePrinter(NullSink())
+        printer.latency = 10000
+        printer.transfer = 7
+        simulator.state.devices[18] = printer
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "wait.mix")
+            with open(filename, "w") as f:
+                f.write(program)
+            simulator.run(filename)
+
+        return simulator.state.clock, simulator.state.instructions
+
+    def test_fast_forward_jbus(self) -> None:
+        program = " ORIG 100\nSTART OUT 1000(18)\n JBUS *(18)\n HLT\n END START\n"
+        clock, instructions = self.run_program(program, fast_forward=True)
+
+        self.assertEqual((10008 + 10, 10009), (clock, instructions))
+        self.assertEqual(
+            self.run_program(program, fast_forward=False), (clock, instructions)
+        )
+
+    def test_fast_forward_jred(self) -> None:
+        program = (
+            " ORIG 100\nSTART OUT 1000(18)\n JRED *+2(18)\n JMP *-1\n HLT\n END START\n"
+        )
+        clock, instructions = self.run_program(program, fast_forward=True)
+
+        # 5003 iterations of JRED and JMP (2u) take the clock to 10007
+        self.assertEqual(
+            (1 + 5003 * 2 + 1 + 10, 1 + 5003 * 2 + 1 + 1), (clock, instructions)
+        )
+        self.assertEqual(
+            self.run_program(program, fast_forward=False), (clock, instructions)
+        )
+
+    def test_no_fast_forward_for_other_loops(self) -> None:
+        # the loop also counts in rA, so every iteration has to run
+        program = (
+            " ORIG 100\nSTART OUT 1000(18)\nWAIT INCA 1\n JBUS WAIT(18)\n HLT\n"
+            " END START\n"
+        )
+        self.assertEqual(
+            self.run_program(program, fast_forward=False),
+            self.run_program(program, fast_forward=True),
+        )
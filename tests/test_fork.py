@@ -0,0 +1,64 @@
+import os
+from os import path
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from mix_simulator.batch import Job, Result, run_job
+from mix_simulator.fork import fork_batch
+from tests.helpers import COUNT, ECHO, temporary_directory, write
+
+
+@skipUnless(hasattr(os, "fork"), "needs os.fork")
+class TestForkBatch(TestCase):
+    def setUp(self) -> None:
+        self.directory = temporary_directory(self)
+        self.echo = write(self.directory, "echo.mix", ECHO)
+        self.count = write(self.directory, "count.mix", COUNT)
+        self.cards = write(self.directory, "echo.cards", "HELLO\n")
+
+    def test_results(self) -> None:
+        jobs = [
+            Job(self.echo, self.cards),
+            Job(self.count),
+            Job(self.echo),
+            Job(path.join(self.directory, "missing.mix")),
+        ] * 3
+        results = list(fork_batch(jobs, workers=2))
+
+        # the same as running each job on its own, on a fresh simulator
+        expected = [run_job(job) for job in jobs]
+
+        def key(result: Result) -> tuple[str, str, int]:
+            return result.program, str(result.cards), result.instructions
+
+        self.assertEqual(sorted(expected, key=key), sorted(results, key=key))
+
+    def test_missing_cards(self) -> None:
+        job = Job(self.echo, path.join(self.directory, "missing.cards"))
+        [result] = fork_batch([job])
+
+        self.assertEqual("error", result.status)
+        self.assertRegex(str(result.error), "^FileNotFoundError")
+
+    def test_close(self) -> None:
+        pids = []
+        fork = os.fork
+
+        def record() -> int:
+            pid = fork()
+            if pid:
+                pids.append(pid)
+            return pid
+
+        # other tests can leave children behind (the shared memory resource tracker),
+        # so only look at those of the batch
+        with patch("mix_simulator.fork.os.fork", side_effect=record):
+            results = fork_batch([Job(self.count)] * 8, workers=4)
+            self.assertEqual("ok", next(results).status)
+            # the children that are still running are waited for
+            results.close()
+
+        self.assertEqual(4, len(pids))
+        for pid in pids:
+            with self.assertRaises(ChildProcessError):
+                os.waitpid(pid, 0)
@@ -0,0 +1,99 @@
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from mix_simulator.image import Image
+from mix_simulator.linker import ObjectModule, link
+from mix_simulator.simulator import Simulator
+from mix_simulator.word import unpack_word
+
+MAIN = """        EXTERN  DOUBLE
+START   LDA     VALUE
+        JMP     DOUBLE
+        STA     RESULT
+        LD1     PTR
+        ENT2    DOUBLE+3
+        LD3     =START=
+        LDX     =0=
+        HLT
+VALUE   CON     21
+RESULT  CON     0
+PTR     CON     VALUE
+        END     START
+"""
+
+LIBRARY = """        ENTRY   DOUBLE
+DOUBLE  STJ     EXIT
+        STA     TEMP
+        ADD     TEMP
+EXIT    JMP     *
+TEMP    CON     0
+        END
+"""
+
+
+class TestLinker(TestCase):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        for name, source in (("main.mix", MAIN), ("library.mix", LIBRARY)):
+            with open(path.join(self.directory.name, name), "w") as f:
+                f.write(source)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _module(self, name: str) -> ObjectModule:
+        # assemble and round trip through an object file
+        module = ObjectModule.assemble(path.join(self.directory.name, f"{name}.mix"))
+        module.write(path.join(self.directory.name, f"{name}.mixo"))
+        return ObjectModule.read(path.join(self.directory.name, f"{name}.mixo"))
+
+    def test_assemble(self) -> None:
+        module = self._module("main")
+
+        self.assertEqual(13, module.length)
+        self.assertEqual(0, module.start)
+        self.assertEqual({"DOUBLE": [1, 4]}, module.externals)
+        self.assertEqual([0, 2, 3, 5, 6], sorted(module.relocations))
+        # CON VALUE and =START= in the literal pool, but not =0=
+        self.assertEqual([10, 12], sorted(module.word_relocations))
+
+        library = self._module("library")
+        self.assertEqual({"DOUBLE": (0, True)}, library.exports)
+        self.assertIsNone(library.start)
+
+    def test_link(self) -> None:
+        modules = [self._module("main"), self._module("library")]
+        image = link(modules, origin=100)
+
+        self.assertEqual(100, image.start)
+        # JMP DOUBLE points at the start of the library module
+        jump = unpack_word(image.words[101])
+        self.assertEqual((1, 49), (jump.b1.val, jump.b2.val))
+        # CON VALUE and =START= hold relocated locations, =0= still holds 0
+        self.assertEqual(108, image.words[110])
+        self.assertEqual(0, image.words[111])
+        self.assertEqual(100, image.words[112])
+
+        image_file = path.join(self.directory.name, "program.mixi")
+        image.write(image_file)
+        self.assertEqual(image, Image.read(image_file))
+
+        simulator = Simulator()
+        simulator.run(image_file)
+        self.assertEqual(42, int(simulator.state.rA))
+        self.assertEqual(108, int(simulator.state.rI1))
+        # ENT2 DOUBLE+3 is offset from the start of the library module
+        self.assertEqual(116, int(simulator.state.rI2))
+        self.assertEqual(100, int(simulator.state.rI3))
+
+    def test_assemble_extern_expression(self) -> None:
+        with open(path.join(self.directory.name, "main.mix"), "w") as f:
+            f.write(MAIN.replace("DOUBLE+3", "DOUBLE*3"))
+
+        with self.assertRaisesRegex(ValueError, "EXTERN DOUBLE"):
+            self._module("main")
+
+    def test_link_missing_symbol(self) -> None:
+        with self.assertRaises(ValueError):
+            link([self._module("main")])
@@ -0,0 +1,139 @@
+from importlib.util import find_spec
+from os import path
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipUnless
+
+from mix_simulator.batch import program_image
+from mix_simulator.image import Image
+from mix_simulator.sweep import Machine, Patch
+
+# a bit of everything, taking different branches (or failing) depending on 1000-1002
+PROGRAM = """        ORIG    100
+START   LDA     1000
+        LDX     1001
+        MUL     1002
+        STA     1010
+        STX     1011
+        LDA     1000
+        SRAX    3
+        DIV     1002(1:5)
+        STA     1012(0:3)
+        STX     1013
+        JOV     *+2
+        ENT2    7
+        LDA     1000
+        ADD     1001
+        SUB     1002(4:5)
+        SLC     7
+        CMPA    1001
+        JL      LESS
+        JG      MORE
+        STZ     1014
+        JMP     DONE
+LESS    CHAR
+        STA     1015
+        STX     1016
+        JMP     DONE
+MORE    NUM
+        STA     1017
+DONE    ENT1    1020
+        MOVE    1010(5)
+        LD1     1001(4:5)
+        LD3N    1000(5:5)
+        ENTA    0
+LOOP    INCA    3
+        DEC1    1
+        J1P     LOOP
+        STJ     1030
+        CMP3    1001(0:2)
+        JNE     *+2
+        INCX    1
+        LD4     1040,3
+        HLT
+        ORIG    1000
+        CON     123456789
+        CON     -20
+        CON     3
+        END     START
+"""
+
+
+@skipUnless(find_spec("numpy"), "numpy is not installed")
+class TestLockstep(TestCase):
+    def setUp(self) -> None:
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        filename = path.join(directory.name, "mixed.mix")
+        with open(filename, "w") as f:
+            f.write(PROGRAM)
+        self.image = program_image(filename)
+
+    def test_matches_simulator(self) -> None:
+        from mix_simulator.lockstep import Lockstep
+
+        random = Random(42)
+        patches = [Patch()]
+        for _ in range(200):
+            memory = {
+                loc: random.choice((0, 1, -1, 2**30 - 1, random.randint(-999, 999)))
+                for loc in (1000, 1001, 1002)
+            }
+            patches.append(Patch(memory, {"A": random.randint(-9, 9)}))
+        patches.append(Patch(registers={"J": -1}))
+
+        machine = Machine(self.image)
+        lockstep = Lockstep(self.image, patches)
+        results = lockstep.run()
+        statuses = set()
+        for lane, patch in enumerate(patches):
+            expected = machine.run(patch)
+            result = results[lane]
+            self.assertEqual(
+                (expected.status, expected.instructions, expected.time),
+                (result.status, result.instructions, result.time),
+                patch,
+            )
+            statuses.add(result.status)
+            if result.status != "ok":
+                continue
+
+            state = lockstep.state(lane)
+            simulated = machine.simulator.state
+            self.assertEqual(simulated.memory.cells, state.memory.cells, patch)
+            for name in ("A", "X", "I1", "I2", "I3", "I4", "I5", "I6", "J"):
+                register = f"r{name}"
+                self.assertEqual(
+                    getattr(simulated, register), getattr(state, register), patch
+                )
+            self.assertEqual(
+                (
+                    simulated.overflow,
+                    simulated.comparison_indicator,
+                    simulated.program_counter,
+                ),
+                (state.overflow, state.comparison_indicator, state.program_counter),
+                patch,
+            )
+
+        # the patches take the program both to HLT and to errors
+        self.assertEqual({"ok", "error"}, statuses)
+
+    def test_lockstep_sweep(self) -> None:
+        from mix_simulator.lockstep import lockstep_sweep
+
+        patches = [Patch(memory={1001: n}) for n in range(10)]
+        results = list(lockstep_sweep(self.image, patches, lanes=3))
+
+        machine = Machine(self.image)
+        self.assertEqual([machine.run(patch) for patch in patches], results)
+
+    def test_io(self) -> None:
+        from mix_simulator.lockstep import Lockstep
+
+        # OUT 1000(18)
+        image = Image({100: (1000 << 18) | (18 << 6) | 37}, 100)
+        [result] = Lockstep(image, [Patch()]).run()
+
+        self.assertEqual(("error", 0), (result.status, result.instructions))
+        self.assertEqual("ValueError: OUT is not supported", result.error)
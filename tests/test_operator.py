@@ -1,5 +1,12 @@
 from unittest import TestCase
 
+from mix_simulator.instruction_set import (
+    BY_CODE_AND_FIELD,
+    BY_MNEMONIC,
+    CODES,
+    INSTRUCTION_SET,
+    TIMES,
+)
 from mix_simulator.operator import Operator
 
 
@@ -10,3 +17,24 @@ class TestOperator(TestCase):
             actual = Operator.from_code_and_field(code, field)
 
             self.assertEqual(op, actual)
+
+    def test_field_specification(self) -> None:
+        # F is a field specification for LDA, so every F is still LDA
+        self.assertEqual(Operator("LDA"), Operator.from_code_and_field(8, 11))
+        # but it selects the instruction for jumps
+        self.assertEqual(Operator("JGE"), Operator.from_code_and_field(39, 7))
+
+        with self.assertRaises(ValueError):
+            Operator.from_code_and_field(39, 10)
+
+    def test_instruction_set(self) -> None:
+        self.assertEqual(len(INSTRUCTION_SET), len(Operator))
+        for spec in INSTRUCTION_SET:
+            self.assertEqual(spec, BY_CODE_AND_FIELD[spec.code * CODES + spec.field])
+            self.assertEqual(spec, BY_MNEMONIC[spec.mnemonic])
+
+    def test_times(self) -> None:
+        self.assertEqual(2, TIMES[BY_MNEMONIC["LDA"].code * CODES + 5])
+        # MOVE takes 2u more for every word it moves
+        self.assertEqual(1, TIMES[BY_MNEMONIC["MOVE"].code * CODES])
+        self.assertEqual(7, TIMES[BY_MNEMONIC["MOVE"].code * CODES + 3])
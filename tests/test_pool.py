@@ -0,0 +1,84 @@
+from os import path
+from unittest import TestCase
+
+from mix_simulator.batch import Job, Result, run_job
+from mix_simulator.pool import MachinePool, Quota
+from tests.helpers import COUNT, ECHO, FOREVER, temporary_directory, write
+
+
+class TestMachinePool(TestCase):
+    def setUp(self) -> None:
+        self.directory = temporary_directory(self)
+        self.echo = write(self.directory, "echo.mix", ECHO)
+        self.count = write(self.directory, "count.mix", COUNT)
+        self.forever = write(self.directory, "forever.mix", FOREVER)
+        self.cards = write(self.directory, "echo.cards", "HELLO\n")
+
+    def test_results(self) -> None:
+        jobs = [Job(self.echo, self.cards), Job(self.count), Job(self.echo)] * 3
+        pool = MachinePool(slots=2, quantum=100)
+        for job in jobs:
+            pool.submit(job)
+        results = list(pool.run())
+
+        self.assertEqual(len(jobs), len(results))
+        # the same as running each job on its own, on a fresh simulator
+        expected = [run_job(job) for job in jobs]
+
+        def key(result: Result) -> tuple[str, str, int]:
+            return result.program, str(result.cards), result.instructions
+
+        self.assertEqual(sorted(expected, key=key), sorted(results, key=key))
+        # both machines were kept for reuse
+        self.assertEqual(2, len(pool.machines))
+
+    def test_quota(self) -> None:
+        pool = MachinePool(slots=2, quantum=100)
+        pool.submit(Job(self.forever), quota=Quota(instructions=5000))
+        pool.submit(Job(self.count))
+        pool.submit(Job(self.forever), quota=Quota(time=10000))
+        results = list(pool.run())
+
+        # the runaway jobs did not hold up the other one
+        self.assertEqual(
+            [self.count, self.forever, self.forever],
+            [result.program for result in results],
+        )
+        self.assertEqual(
+            ("error", 5000, "QuotaExceeded: More than 5000 instructions"),
+            (results[1].status, results[1].instructions, results[1].error),
+        )
+        self.assertEqual("QuotaExceeded: More than 10000u", results[2].error)
+
+    def test_priority(self) -> None:
+        pool = MachinePool(quantum=10)
+        pool.submit(Job(self.count))
+        pool.submit(Job(write(self.directory, "count2.mix", COUNT)), priority=4)
+        results = list(pool.run())
+
+        self.assertTrue(results[0].program.endswith("count2.mix"))
+        with self.assertRaises(ValueError):
+            pool.submit(Job(self.count), priority=0)
+
+    def test_bad_jobs(self) -> None:
+        pool = MachinePool()
+        pool.submit(Job(path.join(self.directory, "missing.mix")))
+        pool.submit(Job(self.echo, path.join(self.directory, "missing.cards")))
+        pool.submit(Job(self.echo))
+        results = list(pool.run())
+
+        self.assertEqual(["error"] * 3, [result.status for result in results])
+        self.assertEqual("ValueError: CardReader has no more cards", results[2].error)
+
+    def test_last_job_fails_to_start(self) -> None:
+        pool = MachinePool(slots=1)
+        pool.submit(Job(self.echo))
+        pool.submit(Job(path.join(self.directory, "missing.mix")))
+        results = list(pool.run())
+
+        self.assertEqual(2, len(results))
+        self.assertTrue(str(results[1].error).startswith("FileNotFoundError"))
+
+        # and when every job fails to start
+        pool.submit(Job(path.join(self.directory, "missing.mix")))
+        self.assertEqual(["error"], [result.status for result in pool.run()])
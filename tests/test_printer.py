@@ -0,0 +1,68 @@
+from hashlib import md5
+from unittest import TestCase
+
+from mix_simulator.character_code import char_to_byte
+from mix_simulator.instruction import Instruction
+from mix_simulator.opcode import OpCode
+from mix_simulator.printer import LinePrinter
+from mix_simulator.simulator import SimulatorState
+from mix_simulator.sink import DigestSink, MemorySink, NullSink
+from mix_simulator.word import Word
+
+
+class TestLinePrinter(TestCase):
+    def setUp(self) -> None:
+        self.state = SimulatorState.initial_state()
+        self.sink = MemorySink()
+        self.state.devices[18] = LinePrinter(self.sink)
+
+        # "HELLO" followed by 23 blank words
+        self.state.memory[1000] = Word(False, *(char_to_byte(c) for c in "HELLO"))
+
+    def test_out(self) -> None:
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+
+        # nothing is written until the sink is flushed
+        self.assertEqual([], self.sink.chunks)
+        self.assertEqual("HELLO" + " " * 115 + "\n", self.sink.getvalue())
+
+    def test_page_eject(self) -> None:
+        # the printer starts at the top of a page
+        Instruction(0, 0, 18, OpCode.IOC, self.state).execute()
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+        Instruction(0, 0, 18, OpCode.IOC, self.state).execute()
+
+        # ejecting the page flushes the sink
+        self.assertEqual(["HELLO" + " " * 115 + "\n\f"], self.sink.chunks)
+
+    def test_threshold(self) -> None:
+        self.sink.threshold = 200
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+        self.assertEqual([], self.sink.chunks)
+
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+        self.assertEqual(1, len(self.sink.chunks))
+
+    def test_null_sink(self) -> None:
+        self.state.devices[18] = LinePrinter(NullSink())
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+        self.state.devices.flush()
+
+    def test_digest_sink(self) -> None:
+        sink = DigestSink("md5", keep=1)
+        self.state.devices[18] = LinePrinter(sink)
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+        Instruction(1000, 0, 18, OpCode.OUT, self.state).execute()
+
+        line = "HELLO" + " " * 115 + "\n"
+        self.assertEqual(md5((line * 2).encode()).hexdigest(), sink.hash.hexdigest())
+        self.assertEqual(242, sink.bytes_written)
+        self.assertEqual([line.rstrip("\n")], sink.lines)
+
+    def test_out_of_memory(self) -> None:
+        with self.assertRaises(IndexError):
+            Instruction(3990, 0, 18, OpCode.OUT, self.state).execute()
+
+    def test_no_input(self) -> None:
+        with self.assertRaises(ValueError):
+            Instruction(1000, 0, 18, OpCode.IN, self.state).execute()
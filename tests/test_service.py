@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from mix_simulator.batch import Job, Quota, run_job
+from mix_simulator.load import load
+from mix_simulator.service import (
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    UNKNOWN_PROGRAM,
+    Client,
+    Registry,
+    Service,
+    ServiceError,
+)
+from mix_simulator.sweep import RunResult
+from tests.helpers import ECHO, FOREVER, temporary_directory, write
+
+
+class TestRegistry(TestCase):
+    def test_lru(self) -> None:
+        registry = Registry(capacity=2)
+        echo = registry.register(ECHO)
+        forever = registry.register(FOREVER)
+        self.assertEqual(echo, registry.register(ECHO))
+        self.assertEqual(100, registry[echo].start)
+
+        # forever was used least recently
+        registry.register(ECHO.replace("1000", "2000"))
+        registry[echo]
+        with self.assertRaises(ServiceError) as cm:
+            registry[forever]
+        self.assertEqual(UNKNOWN_PROGRAM, cm.exception.code)
+
+    def test_assembly_error(self) -> None:
+        with self.assertRaises(ValueError):
+            Registry().register("        FOO     1\n")
+
+
+class TestService(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.directory = temporary_directory(self)
+        self.service = Service(workers=2)
+        self.addCleanup(self.service.close)
+
+    async def _serve(self) -> str:
+        path = os.path.join(self.directory, "mixsim.sock")
+        server = asyncio.create_task(self.service.serve_socket(path))
+        self.addCleanup(server.cancel)
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+        return path
+
+    async def test_run(self) -> None:
+        path = await self._serve()
+
+        def requests() -> list[RunResult]:
+            client = Client.connect(path)
+            try:
+                program = client.register(ECHO)
+                return [
+                    client.run(program, ["HELLO"]),
+                    client.run(program, ["WORLD"]),
+                    client.run(program),
+                    client.run(client.register(FOREVER), quota=Quota(time=1000)),
+                ]
+            finally:
+                client.close()
+
+        hello, world, nothing, forever = await asyncio.to_thread(requests)
+
+        # the same as running each job on its own, on a fresh simulator
+        echo = write(self.directory, "echo.mix", ECHO)
+        for run, cards in ((hello, "HELLO\n"), (world, "WORLD\n")):
+            expected = run_job(Job(echo, write(self.directory, "echo.cards", cards)))
+            self.assertEqual(
+                (expected.status, expected.instructions, expected.digests),
+                (run.status, run.instructions, run.digests),
+            )
+        self.assertEqual("ValueError: CardReader has no more cards", nothing.error)
+        self.assertEqual("QuotaExceeded: More than 1000u", forever.error)
+
+    async def test_image_sent_once(self) -> None:
+        service = Service(workers=1)
+        self.addCleanup(service.close)
+        program = service.registry.register(ECHO)
+        params = {"program": program, "cards": ["HELLO"]}
+
+        executor = service.executor
+        with patch.object(executor, "submit", wraps=executor.submit) as submit:
+            for _ in range(3):
+                result = await service.call("run", params)
+                assert isinstance(result, dict)
+                self.assertEqual("ok", result["status"])
+
+        # only the first run missed, and was sent again with the image
+        self.assertEqual(
+            [False, True, False, False],
+            [call.args[1] is not None for call in submit.call_args_list],
+        )
+
+    async def test_errors(self) -> None:
+        path = await self._serve()
+
+        def call(method: str, **params: object) -> int:
+            client = Client.connect(path)
+            try:
+                client.call(method, **params)
+            except ServiceError as e:
+                return e.code
+            finally:
+                client.close()
+            return 0
+
+        self.assertEqual(
+            UNKNOWN_PROGRAM, await asyncio.to_thread(call, "run", program="nope")
+        )
+        self.assertEqual(METHOD_NOT_FOUND, await asyncio.to_thread(call, "stop"))
+
+    async def test_handle(self) -> None:
+        response = await self.service.handle("{")
+        assert response is not None
+        self.assertEqual(PARSE_ERROR, json.loads(response)["error"]["code"])
+
+        # notifications are not answered
+        request = {"jsonrpc": "2.0", "method": "register", "params": {"source": ECHO}}
+        self.assertIsNone(await self.service.handle(json.dumps(request)))
+        self.assertEqual(1, len(self.service.registry.images))
+
+    async def test_load(self) -> None:
+        path = await self._serve()
+        report = await asyncio.to_thread(load, path, ECHO, ["HELLO"], 2, 5)
+        self.assertEqual(10, report["runs"])
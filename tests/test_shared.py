@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from mix_simulator.image import Image
+from mix_simulator.shared import SharedImage
+from mix_simulator.sweep import Machine, Patch
+
+# 100: LDA 1000, 101: HLT, 1000: 7
+IMAGE = Image({100: (1000 << 18) | (5 << 6) | 8, 101: (2 << 6) | 5, 1000: 7}, 100)
+
+
+class TestSharedImage(TestCase):
+    def test_attach(self) -> None:
+        shared = SharedImage.publish(IMAGE)
+        try:
+            attached = SharedImage.attach(shared.name)
+            try:
+                image = attached.image
+                self.assertEqual(IMAGE, image)
+                self.assertEqual([100, 101, 1000], list(image.words))
+                self.assertEqual(0, image.words.get(999, 0))
+                self.assertNotIn(4000, image.words)
+            finally:
+                attached.close()
+        finally:
+            shared.close()
+
+    def test_machine(self) -> None:
+        shared = SharedImage.publish(IMAGE)
+        try:
+            machine = Machine(shared.image)
+            first = machine.run(Patch(memory={1000: 3}))
+            self.assertEqual(("ok", 2), (first.status, first.instructions))
+            self.assertEqual(3, int(machine.simulator.state.rA))
+            # the patch of 1000 was undone from the shared words
+            machine.run(Patch())
+            self.assertEqual(7, int(machine.simulator.state.rA))
+        finally:
+            shared.close()
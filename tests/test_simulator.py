@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from mix_simulator.byte import int_to_bytes
+from mix_simulator.card import CardReader
+from mix_simulator.devices import CARD_READER, PRINTER
+from mix_simulator.printer import LinePrinter
+from mix_simulator.simulator import Simulator
+from mix_simulator.sink import MemorySink
+from tests.helpers import ECHO, temporary_directory, write
+
+# count down from 1000
+LOOP = """        ORIG    100
+START   ENT1    1000
+LOOP    DEC1    1
+        J1P     LOOP
+        HLT
+        END     START
+"""
+
+# add 1 to 1000 to A
+SUM = """        ORIG    100
+START   ENT1    1000
+LOOP    INCA    0,1
+        DEC1    1
+        J1P     LOOP
+        HLT
+        END     START
+"""
+
+
+class TestResumeAsync(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.directory = temporary_directory(self)
+
+    async def test_slices(self) -> None:
+        program = write(self.directory, "loop.mix", LOOP)
+        expected = Simulator()
+        expected.run(program)
+
+        ticks = 0
+        done = False
+
+        async def tick() -> None:
+            nonlocal ticks
+            while not done:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        async def run(simulator: Simulator) -> None:
+            await simulator.run_async(program, slice_size=100)
+
+        simulators = [Simulator(), Simulator()]
+        ticker = asyncio.create_task(tick())
+        await asyncio.gather(*(run(simulator) for simulator in simulators))
+        done = True
+        await ticker
+
+        # the ticker ran between the 21 slices of 2001 + 2 instructions each
+        self.assertGreaterEqual(ticks, 20)
+        for simulator in simulators:
+            self.assertEqual(expected.state.instructions, simulator.state.instructions)
+            self.assertEqual(expected.state.clock, simulator.state.clock)
+
+    async def test_wait_for_cards(self) -> None:
+        cards, typist = os.pipe()
+        simulator = Simulator()
+        printer = MemorySink()
+        simulator.state.devices[CARD_READER] = CardReader(os.fdopen(cards))
+        simulator.state.devices[PRINTER] = LinePrinter(printer)
+
+        task = asyncio.create_task(
+            simulator.run_async(write(self.directory, "echo.mix", ECHO))
+        )
+        # the event loop keeps running while the card reader waits for a card
+        await asyncio.sleep(0.05)
+        self.assertFalse(task.done())
+        self.assertEqual(0, simulator.state.instructions)
+
+        with os.fdopen(typist, "w") as f:
+            f.write("HELLO\n")
+        await task
+
+        self.assertEqual("HELLO" + " " * 115 + "\n", printer.getvalue())
+        simulator.state.devices.close()
+
+
+class TestThreads(TestCase):
+    def test_independent(self) -> None:
+        program = write(temporary_directory(self), "sum.mix", SUM)
+
+        def run(n: int) -> tuple[int, int]:
+            simulator = Simulator()
+            simulator.load(program)
+            simulator.state.rA.update(False, *int_to_bytes(n, padding=5)[1])
+            simulator.resume()
+            return int(simulator.state.rA), simulator.state.instructions
+
+        # switch threads as often as possible, so that any state the simulators
+        # shared would get mixed up
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(run, range(16)))
+
+        self.assertEqual(
+            [(n + 1000 * 1001 // 2, 1 + 3 * 1000 + 1) for n in range(16)], results
+        )
@@ -0,0 +1,55 @@
+import json
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import TestCase
+
+from mix_simulator.batch import program_image
+from mix_simulator.stress import main, stress
+from tests.helpers import temporary_directory, write
+
+LOOP = """        ORIG    100
+START   ENT1    100
+LOOP    DEC1    1
+        J1P     LOOP
+        HLT
+        END     START
+"""
+
+FAILS = """        ORIG    100
+START   IN      1000(16)
+        HLT
+        END     START
+"""
+
+
+class TestStress(TestCase):
+    def setUp(self) -> None:
+        self.directory = temporary_directory(self)
+
+    def test_stress(self) -> None:
+        image = program_image(write(self.directory, "loop.mix", LOOP))
+        self.assertGreater(stress(image, 2, 3), 0)
+
+    def test_failed_run(self) -> None:
+        # there are no cards to read
+        image = program_image(write(self.directory, "fails.mix", FAILS))
+        with self.assertRaises(RuntimeError):
+            stress(image, 1, 1)
+
+    def test_main(self) -> None:
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            main(
+                [
+                    write(self.directory, "loop.mix", LOOP),
+                    "--threads",
+                    "3",
+                    "--runs",
+                    "2",
+                ]
+            )
+        reports = [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+        # the threads double up to the most that were asked for
+        self.assertEqual([1, 2], [report["threads"] for report in reports])
+        self.assertEqual(1, reports[0]["speedup"])
@@ -0,0 +1,165 @@
+from itertools import count, islice
+from unittest import TestCase
+
+from mix_simulator.batch import program_image
+from mix_simulator.image import Image
+from mix_simulator.opcode import OpCode
+from mix_simulator.sweep import Machine, Patch, summarize, sweep
+from tests.helpers import temporary_directory, write
+
+# loop A + [1000] + [1001] times, keeping the count in 1001
+PROGRAM = """        ORIG    100
+START   ADD     1000
+        ADD     1001
+        STA     1001
+        LD1     1001
+LOOP    DEC1    1
+        J1P     LOOP
+        HLT
+        ORIG    1001
+        CON     5
+        END     START
+"""
+
+# add 0 + 1 + ... + 9 to A, by adding 1 to the address of the ENTA (64 ** 3 to the
+# word) each time around
+SELF_MODIFYING = """        ORIG    100
+START   ENT1    10
+        ENTX    0
+LOOP    ENTA    0
+        STX     SUM
+        ADD     SUM
+        STA     SUM
+        LDX     SUM
+        LDA     LOOP
+        ADD     ONE
+        STA     LOOP
+        DEC1    1
+        J1P     LOOP
+        LDA     SUM
+        HLT
+ONE     CON     262144
+SUM     CON     0
+        END     START
+"""
+
+# print a line and write a block to tape 0, then halt
+OUTPUT = """        ORIG    100
+START   OUT     1000(18)
+        OUT     1000(0)
+        HLT
+        END     START
+"""
+
+
+class TestSweep(TestCase):
+    def setUp(self) -> None:
+        self.directory = temporary_directory(self)
+        self.image = self._image("loop.mix", PROGRAM)
+
+    def _image(self, name: str, program: str) -> Image:
+        return program_image(write(self.directory, name, program))
+
+    def test_reset(self) -> None:
+        machine = Machine(self.image)
+        patch = Patch(memory={1000: 3})
+
+        # 4 instructions, 2 for each of the 8 iterations, then HLT
+        first = machine.run(patch)
+        self.assertEqual(("ok", 4 + 2 * 8 + 1), (first.status, first.instructions))
+        # the count left in 1001 and the patch of 1000 were both undone
+        self.assertEqual(first, machine.run(patch))
+        self.assertEqual(4 + 2 * 5 + 1, machine.run(Patch()).instructions)
+
+    def test_reset_devices(self) -> None:
+        machine = Machine(self._image("output.mix", OUTPUT))
+        devices = machine.devices
+
+        first = machine.run(Patch())
+        self.assertEqual({0, 17, 18, 19, 20}, set(first.digests))
+        # the output of the first run is not part of the digests of the second
+        self.assertEqual(first, machine.run(Patch()))
+        self.assertIs(devices, machine.simulator.state.devices)
+
+    def test_reset_decoded(self) -> None:
+        machine = Machine(self._image("self.mix", SELF_MODIFYING))
+        state = machine.simulator.state
+
+        first = machine.run(Patch())
+        self.assertEqual("ok", first.status)
+        self.assertEqual(45, int(state.rA))
+        # every version of the ENTA was decoded, each under its own value
+        self.assertEqual(
+            set(range(10)),
+            {
+                instruction.address
+                for instruction in state.decoded.values()
+                if instruction.opcode is OpCode.ATA
+            },
+        )
+
+        machine.start(Patch())
+        self.assertEqual({}, state.decoded)
+        self.assertEqual(first, machine.run(Patch()))
+
+    def test_reset_input(self) -> None:
+        program = """        ORIG    100
+START   IN      1000(19)
+        HLT
+        END     START
+"""
+        machine = Machine(self._image("typewriter.mix", program))
+
+        # the typewriter has nothing to read, every run, like a batch job
+        for _ in range(2):
+            self.assertEqual(
+                "ValueError: Typewriter has no more input", machine.run(Patch()).error
+            )
+
+    def test_registers(self) -> None:
+        machine = Machine(self.image)
+
+        self.assertEqual(
+            4 + 2 * 7 + 1, machine.run(Patch(registers={"A": 2})).instructions
+        )
+        self.assertEqual(4 + 2 * 5 + 1, machine.run(Patch()).instructions)
+
+    def test_bad_patch(self) -> None:
+        machine = Machine(self.image)
+
+        self.assertEqual("error", machine.run(Patch(registers={"Y": 1})).status)
+        self.assertEqual("error", machine.run(Patch(registers={"I1": 4096})).status)
+        self.assertEqual("error", machine.run(Patch(memory={4000: 1})).status)
+
+    def test_from_json(self) -> None:
+        self.assertEqual(
+            Patch({1000: -3}, {"A": 1}),
+            Patch.from_json('{"memory": {"1000": -3}, "registers": {"A": 1}}'),
+        )
+
+    def test_sweep(self) -> None:
+        patches = [Patch(memory={1000: n}) for n in range(100)]
+        results = list(sweep(self.image, patches, workers=2))
+
+        # in the order of the patches
+        self.assertEqual(
+            [4 + 2 * (n + 5) + 1 for n in range(100)],
+            [result.instructions for result in results],
+        )
+        summary = summarize(results)
+        self.assertEqual(100, summary["runs"])
+        self.assertEqual(
+            {"min": 15, "mean": 4 + 2 * 54.5 + 1, "max": 4 + 2 * 104 + 1},
+            summary["instructions"],
+        )
+
+    def test_sweep_is_lazy(self) -> None:
+        # patches are read as they are needed, so even endless ones can be swept
+        patches = (Patch(memory={1000: n % 10}) for n in count())
+        results = sweep(self.image, patches, workers=2)
+        self.addCleanup(results.close)
+
+        self.assertEqual(
+            [4 + 2 * (n % 10 + 5) + 1 for n in range(500)],
+            [result.instructions for result in islice(results, 500)],
+        )
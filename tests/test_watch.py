@@ -0,0 +1,129 @@
+import os
+from contextlib import redirect_stderr
+from io import StringIO
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from mix_simulator.image import Image
+from mix_simulator.simulator import SimulatorState
+from mix_simulator.assembler import Assembler
+from mix_simulator.watch import IncrementalAssembler, watch
+
+PROGRAM = """* sum the numbers 1 to 10
+        ORIG    100
+START   ENT1    10
+        ENTA    0
+2H      INC1    0
+        ADD     =1=
+        DEC1    1
+        J1P     2B
+        JMP     2F
+2H      HLT
+        END     START
+"""
+
+
+class TestIncrementalAssembler(TestCase):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.filename = path.join(self.directory.name, "program.mix")
+        self._write(PROGRAM)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _write(self, source: str) -> None:
+        with open(self.filename, "w") as f:
+            f.write(source)
+
+    def _assemble(self) -> Image:
+        state = SimulatorState.initial_state()
+        Assembler(self.filename, state).parse_program()
+        return Image.from_state(state)
+
+    def test_instruction_edit(self) -> None:
+        assembler = IncrementalAssembler(self.filename)
+        assembler.update()
+        self.assertFalse(assembler.incremental)
+
+        self._write(
+            PROGRAM.replace("DEC1    1", "DEC1    2").replace("ENTA    0", "ENTA    5")
+        )
+        updated = assembler.update()
+
+        self.assertTrue(assembler.incremental)
+        self.assertEqual({101, 104}, updated)
+        self.assertEqual(self._assemble(), assembler.image)
+
+    def test_local_symbol_and_literal_edit(self) -> None:
+        assembler = IncrementalAssembler(self.filename)
+        assembler.update()
+
+        self._write(
+            PROGRAM.replace("J1P     2B", "J1P     2F").replace(
+                "JMP     2F", "JMP     =1="
+            )
+        )
+        updated = assembler.update()
+
+        self.assertTrue(assembler.incremental)
+        self.assertEqual({105, 106}, updated)
+        self.assertEqual(self._assemble(), assembler.image)
+
+    def test_structural_edit(self) -> None:
+        assembler = IncrementalAssembler(self.filename)
+        assembler.update()
+
+        # a new line moves everything after it, and a new literal grows the pool
+        for source in (
+            PROGRAM.replace("        ENTA    0\n", "        ENTA    0\n        NOP\n"),
+            PROGRAM.replace("ADD     =1=", "ADD     =2="),
+            PROGRAM.replace("START   ENT1    10", "BEGIN   ENT1    10").replace(
+                "END     START", "END     BEGIN"
+            ),
+        ):
+            self._write(source)
+            assembler.update()
+
+            self.assertFalse(assembler.incremental)
+            self.assertEqual(self._assemble(), assembler.image)
+
+    def test_undefined_symbol(self) -> None:
+        assembler = IncrementalAssembler(self.filename)
+        assembler.update()
+
+        self._write(PROGRAM.replace("JMP     2F", "JMP     NOWHERE"))
+        with self.assertRaises(ValueError):
+            assembler.update()
+
+    def test_watch(self) -> None:
+        class Stop(Exception):
+            pass
+
+        polls = []
+
+        def sleep(interval: float) -> None:
+            polls.append(interval)
+            match len(polls):
+                case 1:
+                    # an editor saving by rename leaves no file for a moment
+                    os.remove(self.filename)
+                case 2:
+                    self._write(PROGRAM.replace("DEC1    1", "DEC1    2"))
+                case _:
+                    raise Stop()
+
+        stderr = StringIO()
+        with (
+            patch("mix_simulator.watch.time.sleep", side_effect=sleep),
+            redirect_stderr(stderr),
+            self.assertRaises(Stop),
+        ):
+            watch(self.filename, interval=0.01)
+
+        lines = stderr.getvalue().splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertRegex(lines[0], "^reassembled [0-9]+ words in")
+        self.assertRegex(lines[1], "^patched 1 words in")
@@ -2,7 +2,7 @@ from typing import Tuple
 from unittest import TestCase
 
 from mix_simulator.byte import Byte
-from mix_simulator.word import Word
+from mix_simulator.word import Word, pack_word, unpack_word
 
 from parameterized import parameterized  # type: ignore
 
@@ -24,3 +24,19 @@ class TestWord(TestCase):
         word = Word(True, Byte(1), Byte(16), Byte(3), Byte(5), Byte(4))
         actual = word.load_fields(*test_input)
         self.assertEqual(expected, actual)
+
+    @parameterized.expand(
+        [
+            (Word(False, Byte(0), Byte(0), Byte(0), Byte(0), Byte(0)), 0),
+            (Word(True, Byte(0), Byte(0), Byte(0), Byte(0), Byte(0)), 1 << 30),
+            (Word(False, Byte(0), Byte(0), Byte(0), Byte(0), Byte(1)), 1),
+            (Word(False, Byte(1), Byte(0), Byte(0), Byte(0), Byte(0)), 1 << 24),
+            (
+                Word(True, Byte(63), Byte(63), Byte(63), Byte(63), Byte(63)),
+                (1 << 31) - 1,
+            ),
+        ]
+    )
+    def test_pack_word(self, word: Word, expected: int) -> None:
+        self.assertEqual(expected, pack_word(word))
+        self.assertEqual(word, unpack_word(expected))
@@ -0,0 +1,120 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mix_simulator.batch import Job, Result, run_job
+from mix_simulator.sweep import summarize
+from mix_simulator.workqueue import WorkQueue, work
+from tests.helpers import COUNT, ECHO, temporary_directory, write
+
+
+class TestWorkQueue(TestCase):
+    def setUp(self) -> None:
+        self.directory = temporary_directory(self)
+        self.root = path.join(self.directory, "queue")
+        echo = write(self.directory, "echo.mix", ECHO)
+        count = write(self.directory, "count.mix", COUNT)
+        cards = write(self.directory, "echo.cards", "HELLO\n")
+        self.jobs = [Job(echo, cards), Job(count), Job(echo)] * 10
+
+    def test_claim(self) -> None:
+        queue = WorkQueue(self.root)
+        self.assertEqual(3, queue.submit(self.jobs, shard_size=12))
+
+        shards = [queue.claim() for _ in range(4)]
+        self.assertEqual(3, len(set(shards) - {None}))
+        self.assertIsNone(shards[3])
+        assert shards[2] is not None
+        self.assertEqual(self.jobs[24:], queue.jobs(shards[2]))
+
+        # the leases have not run out yet
+        self.assertEqual(0, queue.reclaim())
+        self.assertFalse(queue.done())
+
+    def test_lease(self) -> None:
+        queue = WorkQueue(self.root, lease=0.2)
+        queue.submit(self.jobs[:2])
+        shard = queue.claim()
+        assert shard is not None
+
+        # the worker renews its lease, then dies
+        time.sleep(0.12)
+        queue.renew(shard)
+        time.sleep(0.12)
+        self.assertEqual(0, queue.reclaim())
+        time.sleep(0.15)
+        self.assertEqual(1, queue.reclaim())
+
+        self.assertEqual(shard, queue.claim())
+        queue.complete(shard, [run_job(job) for job in queue.jobs(shard)])
+        self.assertTrue(queue.done())
+        self.assertEqual(2, len(list(queue.results())))
+
+    def test_claim_starts_lease(self) -> None:
+        queue = WorkQueue(self.root, lease=60)
+        queue.submit(self.jobs[:2])
+        [pending] = os.listdir(path.join(self.root, "pending"))
+        # submitted long before it is claimed
+        hour_ago = time.time() - 3600
+        os.utime(path.join(self.root, "pending", pending), (hour_ago, hour_ago))
+
+        # not even before the first renewal does reclaim take it for an old lease
+        with patch.object(queue, "renew"):
+            self.assertEqual(pending, queue.claim())
+        self.assertEqual(0, queue.reclaim())
+
+    def test_lost_shard(self) -> None:
+        queue = WorkQueue(self.root)
+        queue.submit(self.jobs[:2])
+
+        jobs = queue.jobs
+        lost: list[str] = []
+
+        def reclaimed(shard: str) -> list[Job]:
+            # the shard is reclaimed the first time, before this worker reads it
+            if not lost:
+                lost.append(shard)
+                os.rename(
+                    path.join(self.root, "leased", shard),
+                    path.join(self.root, "pending", shard),
+                )
+            return jobs(shard)
+
+        with patch.object(queue, "jobs", side_effect=reclaimed):
+            self.assertEqual(1, work(queue, poll=0.01))
+        self.assertEqual(1, len(lost))
+        self.assertTrue(queue.done())
+        self.assertEqual(2, len(list(queue.results())))
+
+    def test_workers(self) -> None:
+        # long enough that a heartbeat is never late, even on a loaded machine
+        queue = WorkQueue(self.root, lease=2.0)
+        self.assertEqual(8, queue.submit(self.jobs, shard_size=4))
+        # a worker claims a shard, then crashes
+        crashed = queue.claim()
+        assert crashed is not None
+
+        with ProcessPoolExecutor(2) as pool:
+            futures = [pool.submit(work, queue, poll=0.05) for _ in range(2)]
+            shards = sum(future.result() for future in futures)
+
+        # all 8 shards have results, and only 8 runs were made, so each shard was run
+        # exactly once: the crashed one after its lease ran out, by either worker
+        done = os.listdir(path.join(self.root, "results"))
+        self.assertEqual(8, len(done))
+        self.assertIn(crashed, done)
+        self.assertEqual(8, shards)
+        self.assertTrue(queue.done())
+        self.assertEqual([], os.listdir(path.join(self.root, "tmp")))
+        results = list(queue.results())
+        # the same as running each job on its own
+        expected = [run_job(job) for job in self.jobs]
+
+        def key(result: Result) -> tuple[str, str, int]:
+            return result.program, str(result.cards), result.instructions
+
+        self.assertEqual(sorted(expected, key=key), sorted(results, key=key))
+        self.assertEqual(summarize(expected), summarize(results))
@@ -0,0 +1,72 @@
+from functools import partial
+from threading import Event
+from unittest import TestCase
+
+from mix_simulator.sink import BackgroundSink, MemorySink
+from mix_simulator.writer import Writer
+
+
+class TestWriter(TestCase):
+    def test_order(self) -> None:
+        written: list[int] = []
+        writer = Writer(queue_size=2)
+        for n in range(100):
+            writer.submit(partial(written.append, n))
+        writer.join()
+
+        self.assertEqual(list(range(100)), written)
+        writer.close()
+
+    def test_backpressure(self) -> None:
+        # the thread is stuck on the first write, so one more fits in the queue
+        release = Event()
+
+        def wait() -> None:
+            release.wait()
+
+        writer = Writer(queue_size=1)
+        writer.submit(wait)
+        writer.submit(lambda: None)
+        self.assertTrue(writer.full())
+        self.assertFalse(writer.idle())
+
+        release.set()
+        writer.join()
+        self.assertTrue(writer.idle())
+        writer.close()
+        self.assertIsNone(writer.thread)
+
+    def test_error(self) -> None:
+        written: list[int] = []
+
+        def fail() -> None:
+            raise OSError("disk full")
+
+        writer = Writer()
+        writer.submit(fail)
+        writer.submit(partial(written.append, 1))
+        with self.assertRaises(OSError):
+            writer.join()
+
+        # the writes after the failed one were dropped
+        self.assertEqual([], written)
+        writer.close()
+
+
+class TestBackgroundSink(TestCase):
+    def test_flush(self) -> None:
+        memory = MemorySink()
+        sink = BackgroundSink(memory, threshold=10)
+        for _ in range(5):
+            sink.write("LINE\n")
+        sink.flush()
+
+        self.assertEqual(["LINE\nLINE\n"] * 2 + ["LINE\n"], memory.chunks)
+
+    def test_close(self) -> None:
+        memory = MemorySink()
+        sink = BackgroundSink(memory)
+        sink.write("LAST\n")
+        sink.close()
+
+        self.assertEqual("LAST\n", memory.getvalue())